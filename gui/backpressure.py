@@ -0,0 +1,168 @@
+import time
+from dataclasses import dataclass
+from PySide6.QtCore import QObject, Signal
+
+# --- BACKPRESSURE POLICY ---
+# When a processing tick plus the redraws in between cost more than the
+# tick interval, packets pile up and the next tick gets a bigger batch. The
+# policy watches how old the data is when a frame reaches the GUI (backlog)
+# and the duty cycle of the worker and the renderer, and steps through
+# LEVELS, each cheaper than the last. It only ever changes what is drawn
+# and computed on top of the signals: every packet is still routed,
+# processed and handed to the recorder.
+
+@dataclass(frozen=True)
+class DegradeLevel:
+    name: str
+    render_interval_ms: int # Shortest RenderScheduler interval
+    bin_pixels: int         # Screen pixels per min/max decimation bin
+    hrv_extended: bool      # Frequency-domain and nonlinear HRV
+    coalesce: int           # Worker ticks merged into one
+
+LEVELS = (
+    DegradeLevel("normal", 33, 1, True, 1),
+    DegradeLevel("reduced display", 66, 2, True, 1),
+    DegradeLevel("time-domain HRV only", 100, 2, False, 1),
+    DegradeLevel("coalesced ticks", 150, 4, False, 3),
+)
+
+@dataclass(frozen=True)
+class ModeChange:
+    wall_time: float
+    old: int
+    new: int
+    reason: str
+
+    def __str__(self):
+        direction = "degraded" if self.new > self.old else "recovered"
+        return f"Backpressure {direction}: {LEVELS[self.old].name} -> {LEVELS[self.new].name} ({self.reason})"
+
+class BackpressurePolicy(QObject):
+    """
+    Picks a DegradeLevel from per-frame observations.
+
+    Each call to observe() is one frame: `backlog_ms` is the age of its
+    oldest packet on arrival in the GUI, `duty` the fraction of wall time the
+    worker and the renderer spend (both hold the GIL, so their shares add).
+    Overloaded means backlog above `backlog_high_ms` or duty above 1.
+
+    Escalates one level after `escalate_after` overloaded frames in a row,
+    at most once per `settle_s` so the previous step can take effect.
+    Recovers one level after `recover_s` without overload and with backlog
+    below `backlog_low_ms` and duty below `duty_low`. Falling straight back
+    after a recovery doubles the recovery wait (up to `max_recover_s`), so a
+    load that only fits the degraded mode does not flip back and forth.
+    """
+    level_changed = Signal(object) # ModeChange
+
+    def __init__(self, backlog_high_ms=250.0, backlog_low_ms=120.0, duty_low=0.5, escalate_after=3,
+                 settle_s=1.0, recover_s=5.0, max_recover_s=60.0, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.backlog_high_ms = backlog_high_ms
+        self.backlog_low_ms = backlog_low_ms
+        self.duty_low = duty_low
+        self.escalate_after = escalate_after
+        self.settle_s = settle_s
+        self.base_recover_s = recover_s
+        self.max_recover_s = max_recover_s
+        self.clock = clock
+        self.history = [] # ModeChange log of this session
+        self.level = 0
+        self.reset()
+
+    def reset(self):
+        """Returns to normal (announced like any other change) and clears the timers."""
+        if self.level:
+            self._change(self.clock(), 0, "reset")
+        self.recover_s = self.base_recover_s
+        self._overloaded = 0     # Consecutive overloaded frames
+        self._calm_since = None  # Start of the current calm stretch
+        self._escalated_at = None
+        self._recovered_at = None
+
+    @property
+    def mode(self):
+        return LEVELS[self.level]
+
+    def observe(self, backlog_ms, duty):
+        """Feeds one frame; returns the ModeChange if the level changed, else None."""
+        now = self.clock()
+        if backlog_ms > self.backlog_high_ms or duty > 1.0:
+            self._overloaded += 1
+            self._calm_since = None
+            settled = self._escalated_at is None or now - self._escalated_at >= self.settle_s
+            if self._overloaded >= self.escalate_after and settled and self.level < len(LEVELS) - 1:
+                if self._recovered_at is not None and now - self._recovered_at < 2 * self.recover_s:
+                    self.recover_s = min(2 * self.recover_s, self.max_recover_s)
+                return self._change(now, self.level + 1, f"backlog {backlog_ms:.0f} ms, duty {duty * 100:.0f}%")
+            return None
+
+        self._overloaded = 0
+        if backlog_ms >= self.backlog_low_ms or duty >= self.duty_low or self.level == 0:
+            self._calm_since = None
+            return None
+        if self._calm_since is None:
+            self._calm_since = now
+        elif now - self._calm_since >= self.recover_s:
+            self._calm_since = None
+            self._recovered_at = now
+            return self._change(now, self.level - 1, f"caught up for {self.recover_s:.0f} s")
+        return None
+
+    def _change(self, now, level, reason):
+        change = ModeChange(time.time(), self.level, level, reason)
+        if level > self.level:
+            self._escalated_at = now
+        self.level = level
+        self._overloaded = 0
+        self.history.append(change)
+        self.level_changed.emit(change)
+        return change
+
+
+#Test output
+if __name__ == "__main__":
+    clock = [0.0]
+    policy = BackpressurePolicy(clock=lambda: clock[0])
+    changes = []
+    policy.level_changed.connect(changes.append)
+
+    def run(seconds, backlog_ms, duty, fps=30):
+        for _ in range(int(seconds * fps)):
+            clock[0] += 1 / fps
+            policy.observe(backlog_ms, duty)
+
+    # Short spikes are ignored
+    for _ in range(5):
+        run(2 / 30, 400, 0.3)
+        run(0.5, 40, 0.3)
+    assert policy.level == 0 and not changes
+
+    # Sustained overload steps down one level per settle period, not all at once
+    run(1.5, 400, 1.3)
+    assert policy.level == 2, policy.level
+    run(5, 400, 1.3)
+    assert policy.level == len(LEVELS) - 1
+    assert policy.mode.coalesce > 1 and not policy.mode.hrv_extended
+
+    # Recovery is one level per calm stretch; a middling load holds the level
+    run(10, 150, 0.3)
+    assert policy.level == len(LEVELS) - 1
+    run(5.5, 60, 0.3)
+    assert policy.level == len(LEVELS) - 2
+
+    # Overload right after recovering doubles the wait before the next try
+    run(0.2, 60, 1.2)
+    assert policy.level == len(LEVELS) - 1 and policy.recover_s == 10.0
+    run(6, 60, 0.3)
+    assert policy.level == len(LEVELS) - 1
+    run(30, 60, 0.3)
+    assert policy.level == 0, policy.level
+
+    assert changes == policy.history and all(c.new - c.old in (-1, 1) for c in changes)
+    run(2, 400, 1.3)
+    policy.reset()
+    assert policy.level == 0 and changes[-1].new == 0 and changes[-1].reason == "reset"
+    for change in changes:
+        print(change)
+    print("All checks passed!")
@@ -0,0 +1,565 @@
+import os
+import json
+import mmap
+import time
+import zlib
+import threading
+import itertools
+import struct
+import numpy as np
+import colcodec
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+from colcodec import CodecError
+from streams import CHANNEL_FIELDS
+
+# --- CHUNKED SESSION JOURNAL ---
+# Append-only columnar session format. A session is a set of streams (tables
+# with fixed columns); each stream is cut into chunks of at most `chunk_rows`
+# rows that are written as they fill. A session is a directory:
+#
+#   session.json        schema, stream ids and session metadata (written once)
+#   seg_000000.wal ...  write-ahead segments: SEGMENT header, then chunks.
+#                       A chunk is a CHUNK header (stream id, rows, first/last
+#                       time, payload size, CRC-32 of the payload) followed by
+#                       one (codec, size) entry per column and the column bytes
+#                       (codecs: see colcodec, picked per column and chunk).
+#                       A new segment is started every `segment_bytes`.
+#   index.chk           committed index: INDEX_MAGIC, then commit records, each
+#                       a COMMIT header (entries, covered segment/offset, flags,
+#                       CRC-32 of the entries) followed by its INDEX_ENTRY rows
+#   writer.lock         exclusively locked by the writer while it is open, so
+#                       recover() leaves sessions still being recorded (by the
+#                       headless runner or another GUI) alone
+#
+# Chunks are fsynced every flush (about once a second), the index is
+# committed every few flushes, on every segment change and on close. After a
+# crash the committed index is read as is and only the data written after the
+# last commit -- the tail of the newest segment(s) -- is scanned for intact
+# chunks, so recovery time depends on the unflushed data, not on the session
+# length. A torn chunk at the very end is the most that can be lost beyond
+# the last flush. Times are session seconds for the signal streams and Unix
+# time for the wall_time streams; the first column of every stream is its
+# time.
+
+SESSION_FILE = "session.json"
+INDEX_FILE = "index.chk"
+LOCK_FILE = "writer.lock"
+SEGMENT_NAME = "seg_{:06d}.wal"
+SEGMENT = struct.Struct("<8sI")       # magic, segment number
+SEGMENT_MAGIC = b"EDASEG02"
+CHUNK = struct.Struct("<4sHHIddII")   # magic, stream id, columns, rows, t_first, t_last, payload bytes, crc32
+CHUNK_MAGIC = b"CHNK"
+COLUMN = struct.Struct("<BI")         # codec, bytes
+COLUMN_DIRECTORY = {n: struct.Struct("<" + "BI" * n) for n in range(1, 64)}
+INDEX_MAGIC = b"EDAIDX02"
+COMMIT = struct.Struct("<4sIIQII")    # magic, entries, segment, offset covered up to, flags, crc32 of entries
+COMMIT_MAGIC = b"CMIT"
+COMMIT_CLOSED = 1
+INDEX_ENTRY = np.dtype([("stream", "<u2"), ("segment", "<u4"), ("offset", "<u8"), ("rows", "<u4"),
+                        ("t_first", "<f8"), ("t_last", "<f8")])
+
+HRV_FIELDS = ("rmssd", "sdnn", "mean_rr", "pnn50", "vlf", "lf", "hf", "lf_hf", "sd1", "sd2")
+
+# Column dtypes: "f8", "i8", "u1", or "str" (UTF-8, length-prefixed)
+STREAMS = {
+    "packets": (("wall_time", "f8"), ("seq", "i8")),
+    **{name: (("t", "f8"),) + tuple((f, "f8") for f in fields) + (("valid", "u1"),)
+       for name, fields in CHANNEL_FIELDS.items()},
+    "eda_derived": (("t", "f8"), ("eda", "f8"), ("phasic", "f8"), ("tonic", "f8")),
+    "hr": (("t", "f8"), ("hr", "f8")),
+    "rri": (("t", "f8"), ("rri", "f8")), # Beat times and the RR interval (ms) ending at each
+    "sqi": (("t", "f8"), ("sqi", "f8")),
+    "hrv": (("wall_time", "f8"),) + tuple((k, "f8") for k in HRV_FIELDS),
+    "gaps": (("start", "f8"), ("duration", "f8"), ("lost", "i8"), ("interpolated", "u1"), ("channel", "str")),
+    "events": (("t", "f8"), ("label", "str")),
+    "removed_events": (("t", "f8"), ("label", "str")), # Deleted flags; each cancels one matching event
+    "modes": (("wall_time", "f8"), ("level", "i8"), ("mode", "str"), ("reason", "str")),
+}
+
+class ChunkFormatError(Exception):
+    pass
+
+def encode_column(values, dtype, compress=True):
+    """Column -> (codec, bytes)."""
+    return colcodec.encode(values, dtype, compress)
+
+def decode_column(codec, buf, dtype, rows):
+    try:
+        return colcodec.decode(codec, buf, dtype, rows)
+    except CodecError as e:
+        raise ChunkFormatError(str(e)) from e
+
+def _time_span(t):
+    finite = t[np.isfinite(t)] if t.dtype.kind == "f" else t
+    return (float(finite[0]), float(finite[-1])) if len(finite) else (np.nan, np.nan)
+
+def _fsync_dir(directory):
+    # Makes new files (segments, the renamed session.json) survive a power cut
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _try_lock(directory):
+    """Opens and exclusively locks the session's LOCK_FILE; None if another process holds it."""
+    f = open(os.path.join(directory, LOCK_FILE), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+def _unlock(f):
+    if fcntl is None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    f.close() # Releases the flock
+
+class ChunkWriter:
+    """
+    Writes one session directory. append() buffers rows per stream and
+    writes a chunk whenever a stream has `chunk_rows` of them; flush() also
+    writes the partial chunks and, with sync=True, fsyncs the segment;
+    commit() makes everything written so far part of the committed index.
+    Columns are compressed unless `compress` is False. Holds the session's
+    LOCK_FILE until close(). Not thread-safe: owned by the recorder's writer thread.
+    """
+    def __init__(self, directory, meta=None, chunk_rows=4096, segment_bytes=64 << 20, compress=True,
+                 streams=STREAMS):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.compress = compress
+        self.segment_bytes = segment_bytes
+        self.schema = {name: tuple(cols) for name, cols in streams.items()}
+        self.ids = {name: k for k, name in enumerate(self.schema)}
+        self.bytes_written = 0
+        self.rows_written = 0
+        self.commits = 0
+        self._pending = {name: [] for name in self.schema}
+        self._pending_rows = dict.fromkeys(self.schema, 0)
+        self._uncommitted = [] # INDEX_ENTRY tuples written since the last commit
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = _try_lock(directory)
+        if self._lock is None:
+            raise ChunkFormatError(f"{directory}: session is being written by another process")
+        header = {"version": 3, "created": time.time(), "chunk_rows": chunk_rows,
+                  "streams": {name: [list(c) for c in cols] for name, cols in self.schema.items()},
+                  "meta": meta or {}}
+        tmp = os.path.join(directory, SESSION_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(header, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(directory, SESSION_FILE))
+        self._index = open(os.path.join(directory, INDEX_FILE), "wb")
+        self._index.write(INDEX_MAGIC)
+        self.segment = -1
+        self._file = None
+        self._open_segment(0)
+
+    def _open_segment(self, number):
+        if self._file is not None:
+            self._file.close()
+        self.segment = number
+        self._file = open(os.path.join(self.directory, SEGMENT_NAME.format(number)), "wb")
+        self._write(SEGMENT.pack(SEGMENT_MAGIC, number))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        _fsync_dir(self.directory)
+
+    def _write(self, data):
+        self._file.write(data)
+        self.bytes_written += len(data)
+
+    def append(self, stream, columns):
+        """Adds rows: `columns` holds one equal-length array per schema column, in order."""
+        n = len(columns[0])
+        if n == 0:
+            return
+        self._pending[stream].append(columns)
+        self._pending_rows[stream] += n
+        while self._pending_rows[stream] >= self.chunk_rows:
+            self._write_pending(stream, self.chunk_rows)
+
+    def _write_pending(self, stream, rows=None):
+        parts = self._pending[stream]
+        cols = [np.concatenate([p[c] for p in parts]) if len(parts) > 1 else np.asarray(parts[0][c])
+                for c in range(len(self.schema[stream]))]
+        rows = len(cols[0]) if rows is None else rows
+        rest = [c[rows:] for c in cols]
+        self._pending[stream] = [rest] if len(rest[0]) else []
+        self._pending_rows[stream] = len(rest[0])
+        self._write_chunk(stream, [c[:rows] for c in cols])
+
+    def _write_chunk(self, stream, cols):
+        if self._file.tell() >= self.segment_bytes:
+            # Commit first, so recovery never has to look further back than the newest segment
+            self.commit()
+            self._open_segment(self.segment + 1)
+        directory, payload = [], []
+        for col, (_, dtype) in zip(cols, self.schema[stream]):
+            codec, data = encode_column(col, dtype, self.compress)
+            directory.append(COLUMN.pack(codec, len(data)))
+            payload.append(data)
+        body = b"".join(directory + payload)
+        rows = len(cols[0])
+        t_first, t_last = _time_span(np.asarray(cols[0]))
+        sid = self.ids[stream]
+        self._uncommitted.append((sid, self.segment, self._file.tell(), rows, t_first, t_last))
+        self._write(CHUNK.pack(CHUNK_MAGIC, sid, len(cols), rows, t_first, t_last, len(body), zlib.crc32(body)))
+        self._write(body)
+        self.rows_written += rows
+
+    def flush(self, sync=False):
+        """Writes all partial chunks; with sync the segment is also fsynced."""
+        for stream, rows in self._pending_rows.items():
+            if rows:
+                self._write_pending(stream)
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def commit(self, closed=False):
+        """Syncs the segment, then appends and syncs an index commit covering everything written."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        entries = np.array(self._uncommitted, dtype=INDEX_ENTRY).tobytes()
+        self._index.write(COMMIT.pack(COMMIT_MAGIC, len(self._uncommitted), self.segment, self._file.tell(),
+                                      COMMIT_CLOSED if closed else 0, zlib.crc32(entries)) + entries)
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._uncommitted = []
+        self.commits += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self.commit(closed=True)
+        self._file.close()
+        self._index.close()
+        _unlock(self._lock)
+
+def read_commits(directory):
+    """
+    Parses the committed index: (entries, closed, (segment, offset) the
+    commits cover up to, byte size of the valid commits). A torn last commit
+    is ignored; its chunks are found again by the tail scan.
+    """
+    with open(os.path.join(directory, INDEX_FILE), "rb") as f:
+        data = f.read()
+    if data[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+        raise ChunkFormatError(f"{directory}: bad index file")
+    parts, closed, tail = [], False, (0, SEGMENT.size)
+    pos = len(INDEX_MAGIC)
+    while pos + COMMIT.size <= len(data):
+        magic, n, segment, offset, flags, crc = COMMIT.unpack_from(data, pos)
+        end = pos + COMMIT.size + n * INDEX_ENTRY.itemsize
+        if magic != COMMIT_MAGIC or end > len(data) or zlib.crc32(data[pos + COMMIT.size:end]) != crc:
+            break
+        parts.append(np.frombuffer(data, dtype=INDEX_ENTRY, count=n, offset=pos + COMMIT.size))
+        closed, tail = bool(flags & COMMIT_CLOSED), (segment, offset)
+        pos = end
+    index = np.concatenate(parts) if parts else np.empty(0, dtype=INDEX_ENTRY)
+    return index, closed, tail, pos
+
+class ChunkReader:
+    """
+    Reads a session directory written by ChunkWriter, also one whose writer
+    was killed: the committed index is used as is and only the data after
+    the last commit is scanned (`recovered` chunks, `complete` False).
+    read() only decodes the chunks of the requested stream that overlap the
+    time range, and only the requested columns.
+
+    Segments are memory-mapped, so reading a chunk touches only its own
+    pages and the OS page cache, not this process, holds the file data;
+    reads keep no file position and may come from several threads. Raw
+    (uncompressed) columns are views of the mapping.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        try:
+            with open(os.path.join(directory, SESSION_FILE)) as f:
+                self.header = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ChunkFormatError(f"{directory} is not a session: {e}")
+        self.meta = self.header["meta"]
+        self.schema = {name: tuple(tuple(c) for c in cols) for name, cols in self.header["streams"].items()}
+        self.names = list(self.schema)
+        self._maps = {}
+        self._lock = threading.Lock()
+        self._streams = {} # stream -> its index entries
+        self._names = {}   # stream -> {column: position}
+        self.index, self.complete, self.tail, _ = read_commits(directory)
+        self.recovered = 0
+        self.scanned_bytes = 0
+        if not self.complete:
+            recovered = self._scan_tail(*self.tail)
+            self.recovered = len(recovered)
+            self.index = np.concatenate([self.index, recovered])
+
+    def _segment(self, number):
+        """The mapped segment (a bytes-like object)."""
+        data = self._maps.get(number)
+        if data is None:
+            with self._lock:
+                data = self._maps.get(number)
+                if data is None:
+                    with open(os.path.join(self.directory, SEGMENT_NAME.format(number)), "rb") as f:
+                        size = os.fstat(f.fileno()).st_size
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+                    self._maps[number] = data
+        return data
+
+    def _scan_tail(self, segment, offset):
+        """Entries of the intact chunks written after the last commit, in this and any later segments."""
+        entries = []
+        while os.path.exists(os.path.join(self.directory, SEGMENT_NAME.format(segment))):
+            data = self._segment(segment)
+            end = len(data)
+            self.scanned_bytes += max(0, end - offset)
+            while offset + CHUNK.size <= end:
+                magic, sid, _, rows, t_first, t_last, size, crc = CHUNK.unpack_from(data, offset)
+                body = offset + CHUNK.size
+                if magic != CHUNK_MAGIC or body + size > end or zlib.crc32(data[body:body + size]) != crc:
+                    break
+                entries.append((sid, segment, offset, rows, t_first, t_last))
+                offset += CHUNK.size + size
+            self.tail = (segment, offset) # End of the intact data
+            segment, offset = segment + 1, SEGMENT.size
+        return np.array(entries, dtype=INDEX_ENTRY)
+
+    def chunks(self, stream, t0=None, t1=None):
+        """Index entries of `stream` overlapping [t0, t1] (None = open)."""
+        index = self._streams.get(stream)
+        if index is None:
+            index = self._streams[stream] = self.index[self.index["stream"] == self.names.index(stream)]
+        if t0 is None and t1 is None:
+            return index
+        keep = np.ones(len(index), dtype=bool)
+        if t0 is not None:
+            keep &= ~(index["t_last"] < t0)
+        if t1 is not None:
+            keep &= ~(index["t_first"] > t1)
+        return index[keep]
+
+    def rows(self, stream):
+        return int(self.chunks(stream)["rows"].sum())
+
+    def read_chunk(self, stream, entry, columns=None):
+        schema = self.schema[stream]
+        wanted = range(len(schema)) if columns is None else [self.column_index(stream, c) for c in columns]
+        data = self._segment(int(entry["segment"]))
+        offset = int(entry["offset"])
+        _, _, ncols, rows, _, _, size, _ = CHUNK.unpack_from(data, offset)
+        body = memoryview(data)[offset + CHUNK.size:offset + CHUNK.size + size]
+        directory = COLUMN_DIRECTORY[ncols].unpack_from(body)
+        starts = list(itertools.accumulate(directory[1::2], initial=ncols * COLUMN.size))
+        return [decode_column(directory[2 * k], body[starts[k]:starts[k + 1]], schema[k][1], rows) for k in wanted]
+
+    def column_index(self, stream, column):
+        names = self._names.get(stream)
+        if names is None:
+            names = self._names[stream] = {c: k for k, (c, _) in enumerate(self.schema[stream])}
+        return names[column]
+
+    def read(self, stream, columns=None, t0=None, t1=None):
+        """{column: array} of a stream, whole chunks overlapping [t0, t1] (None = open)."""
+        names = [c for c, _ in self.schema[stream]] if columns is None else list(columns)
+        parts = [self.read_chunk(stream, entry, names) for entry in self.chunks(stream, t0, t1)]
+        out = {}
+        for k, (name, dtype) in enumerate((c, dict(self.schema[stream])[c]) for c in names):
+            if parts:
+                out[name] = np.concatenate([p[k] for p in parts])
+            else:
+                out[name] = np.array([], dtype=object if dtype == "str" else "<" + dtype)
+        return out
+
+    def close(self):
+        for data in self._maps.values():
+            try:
+                data.close()
+            except (AttributeError, BufferError):
+                pass # Empty segment, or raw columns still in use: unmapped when the last view goes
+        self._maps = {}
+
+def is_session(directory):
+    return os.path.isfile(os.path.join(directory, SESSION_FILE))
+
+def recover(directory):
+    """
+    Finalizes a session whose writer never closed it: cuts the torn tail off
+    the newest segment and commits the chunks found after the last commit.
+    Returns (recovered chunks, scanned bytes), or None if the session was
+    closed properly or its writer (in any process) still holds the lock.
+    """
+    lock = _try_lock(directory)
+    if lock is None:
+        return None # Still being recorded
+    try:
+        reader = ChunkReader(directory)
+        try:
+            if reader.complete:
+                return None
+            segment, offset = reader.tail
+            recovered = reader.index[len(reader.index) - reader.recovered:].tobytes()
+            summary = (reader.recovered, reader.scanned_bytes)
+        finally:
+            reader.close()
+        with open(os.path.join(directory, SEGMENT_NAME.format(segment)), "r+b") as f:
+            f.truncate(offset)
+            os.fsync(f.fileno())
+        _, _, _, valid_end = read_commits(directory)
+        with open(os.path.join(directory, INDEX_FILE), "r+b") as f:
+            f.seek(valid_end) # Overwrites a torn commit, if any
+            f.write(COMMIT.pack(COMMIT_MAGIC, summary[0], segment, offset, COMMIT_CLOSED, zlib.crc32(recovered)) +
+                    recovered)
+            f.truncate()
+            os.fsync(f.fileno())
+        return summary
+    finally:
+        _unlock(lock)
+
+
+#Test output
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    def write_imu(writer, seconds, fs=1000, start=0):
+        for k in range(start * 10, (start + seconds) * 10):
+            t = (k * 100 + np.arange(100)) / fs
+            writer.append("eda", [t, 2 + np.sin(t), 2 + np.sin(t), np.ones(100, dtype=np.uint8)])
+            writer.append("imu", [t] + [np.cos(t * j) for j in range(9)] + [np.ones(100, dtype=np.uint8)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session")
+        writer = ChunkWriter(path, meta={"frame_rate": 1000}, chunk_rows=1000)
+        fs, seconds = 1000, 10
+        write_imu(writer, seconds)
+        writer.append("events", [np.array([1.5, 7.25]), np.array(["Task Start", "Réc"])])
+        writer.close()
+
+        reader = ChunkReader(path)
+        assert reader.complete and reader.meta == {"frame_rate": 1000}
+        eda = reader.read("eda", ["t", "raw"])
+        assert len(eda["t"]) == seconds * fs and np.allclose(eda["raw"], 2 + np.sin(eda["t"]))
+        part = reader.read("imu", ["t", "gz"], t0=2.0, t1=2.5)
+        assert len(part["t"]) == 1000 and part["t"][0] <= 2.0 <= 2.5 <= part["t"][-1]
+        assert list(reader.read("events")["label"]) == ["Task Start", "Réc"]
+        assert len(reader.read("hr")["t"]) == 0
+        reader.close()
+
+        # Killed writer: 100 s committed over several segments, then 3 s only flushed
+        # and half a chunk torn off. Recovery scans only what came after the last commit
+        path = os.path.join(tmp, "crashed")
+        writer = ChunkWriter(path, chunk_rows=1000, segment_bytes=4 << 20)
+        write_imu(writer, 100)
+        writer.commit()
+        write_imu(writer, 3, start=100)
+        writer.flush(sync=True)
+        # While the writer is alive its session is neither recovered nor opened by a second writer
+        index_size = os.path.getsize(os.path.join(path, INDEX_FILE))
+        assert recover(path) is None and os.path.getsize(os.path.join(path, INDEX_FILE)) == index_size
+        try:
+            ChunkWriter(path)
+            raise AssertionError("Second writer on a locked session")
+        except ChunkFormatError:
+            pass
+        segment = os.path.join(path, SEGMENT_NAME.format(writer.segment))
+        writer._file.close()
+        writer._index.close()
+        writer._lock.close() # The OS drops the lock of a killed process
+        with open(segment, "r+b") as f:
+            f.truncate(os.path.getsize(segment) - 5000)
+        size = sum(os.path.getsize(os.path.join(path, n)) for n in os.listdir(path))
+        shutil.copytree(path, path + "_copy")
+
+        start = time.perf_counter()
+        reader = ChunkReader(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert writer.segment > 0 and not reader.complete
+        assert reader.scanned_bytes < size / 20, "Only the tail is scanned"
+        # The last flush survives except the torn chunk (the newest IMU one)
+        rows = reader.rows("imu")
+        assert reader.rows("eda") == 103 * fs and rows == 102 * fs
+        t = reader.read("imu", ["t"])["t"]
+        assert np.array_equal(t, np.arange(rows) / fs)
+        reader.close()
+        print(f"Recovery: {size / 1e6:.0f} MB session, {reader.scanned_bytes / 1e6:.2f} MB scanned, "
+              f"{reader.recovered} chunks recovered in {elapsed:.1f} ms")
+
+        recovered = reader.recovered
+        assert recover(path) == (recovered, reader.scanned_bytes)
+        reader = ChunkReader(path)
+        assert reader.complete and reader.rows("imu") == rows and recover(path) is None
+        reader.close()
+
+        # Torn commit record: ignored, its chunks come back from the tail scan
+        with open(os.path.join(path + "_copy", INDEX_FILE), "ab") as f:
+            f.write(COMMIT.pack(COMMIT_MAGIC, 50, 0, 0, 0, 0)[:-3])
+        assert recover(path + "_copy")[0] == recovered
+        reader = ChunkReader(path + "_copy")
+        assert reader.complete and reader.rows("imu") == rows
+        reader.close()
+
+        # Sustained write rate: 8 devices at 1000 Hz, all raw and derived channels,
+        # uncompressed and compressed, then the read-back rate
+        n, ticks = 33, 3000 # 33 ms of data per tick, ~100 s
+        rng = np.random.default_rng(0)
+        tt = np.arange(n * ticks) / fs
+        adc = np.round(2000 + 300 * np.sin(tt / 30) + rng.normal(0, 2, len(tt)))
+        ir = np.round(80000 + 2000 * np.sin(2 * np.pi * 1.2 * tt) + rng.normal(0, 20, len(tt)))
+        imu = [np.round(rng.normal(0, 0.05, len(tt)), 4) for _ in range(9)]
+        smooth = np.convolve(adc, np.ones(25) / 25, mode="same") / 1000
+        bpm = np.repeat(70 + np.cumsum(rng.normal(0, 0.3, ticks)), n)
+        ones = np.ones(n, dtype=np.uint8)
+        sizes = {}
+        for compress in (False, True):
+            path = os.path.join(tmp, f"bench_{compress}")
+            writer = ChunkWriter(path, compress=compress)
+            start = time.perf_counter()
+            for k in range(ticks):
+                s = slice(k * n, (k + 1) * n)
+                for device in range(8):
+                    writer.append("packets", [tt[s], np.arange(k * n, (k + 1) * n)])
+                    writer.append("eda", [tt[s], adc[s], smooth[s], ones])
+                    writer.append("cardiac", [tt[s], ir[s], bpm[s], bpm[s], ones])
+                    writer.append("imu", [tt[s]] + [c[s] for c in imu] + [ones])
+                    writer.append("eda_derived", [tt[s], smooth[s], smooth[s] - 2, smooth[s]])
+                    writer.append("hr", [tt[s], bpm[s]])
+                if k % 30 == 29:
+                    writer.flush(sync=True)
+                    if k % 300 == 299:
+                        writer.commit()
+            writer.close()
+            elapsed = time.perf_counter() - start
+            sizes[compress] = writer.bytes_written
+            rate = writer.rows_written / elapsed
+            print(f"{'Compressed' if compress else 'Raw'}: {writer.rows_written / 1e6:.1f} M rows, "
+                  f"{writer.bytes_written / 1e6:.0f} MB in {elapsed:.2f} s: {rate / 1e6:.2f} M rows/s, "
+                  f"{rate / (8 * 6 * fs):.0f}x real time for 8 devices at 1000 Hz")
+
+            reader = ChunkReader(path)
+            start = time.perf_counter()
+            cardiac = reader.read("cardiac", ["t", "ir_value", "bpm"])
+            elapsed = time.perf_counter() - start
+            assert np.array_equal(cardiac["ir_value"], np.tile(ir.reshape(ticks, 1, n), (1, 8, 1)).ravel())
+            decoded = sum(v.nbytes for v in cardiac.values())
+            print(f"  read {decoded / 1e6:.0f} MB of cardiac columns at {decoded / elapsed / 1e6:.0f} MB/s")
+            reader.close()
+        print(f"Compression: {sizes[False] / sizes[True]:.1f}x")
+        assert sizes[True] < sizes[False] / 2
+    print("All checks passed!")
@@ -8,6 +8,9 @@ COLOR_RECORD  = "#D9534F"   # Red for recording state
 COLOR_EDA     = "#07294D"   # Primary Blue for EDA/Phasic
 COLOR_HR      = "#D9534F"   # Red for Heart Rate
 COLOR_TONIC   = "#FFC600"   # Gold for Tonic
+COLOR_ACCEL   = "#07294D"   # IMU accelerometer traces
+COLOR_GYRO    = "#D9534F"   # IMU gyroscope traces
+COLOR_ORIENT  = "#2E8B57"   # IMU orientation (roll/pitch/yaw) traces
 
 FONT_UI       = "Segoe UI"
 FONT_MONO     = "Consolas"
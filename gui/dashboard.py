@@ -0,0 +1,334 @@
+import math
+import time
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox, QCheckBox
+from colorConstraints import COLOR_EDA, COLOR_TEXT, COLOR_RECORD
+from plotdata import StripBuffer, MinMaxDecimator, AxisRange
+from render import RenderScheduler, USE_OPENGL
+from worker import ProcessingWorker, start_shared_worker_thread
+
+# --- MULTI-SUBJECT DASHBOARD ---
+# A wall of compact tiles, one per subject stream. All tiles live in one
+# GraphicsLayoutWidget (one view, one paint per frame) and are redrawn by
+# one RenderScheduler. Each tile draws its EDA trace min/max-decimated to
+# its own pixel width; HR, RMSSD, signal quality and loss are shown as text.
+# All subjects' processing workers share one thread and tick at a lower
+# rate than the single-subject view, with HRV recomputed every few seconds.
+#
+# Scrolling: the x-axis is fixed to "seconds ago" and each frame only moves
+# the curve item (setPos) to the tile's display clock, which runs on wall
+# time one worker interval behind the newest sample. Curve data is only
+# rebuilt when a new worker frame arrives, so the wall scrolls smoothly at
+# the render rate although each stream updates twice a second.
+
+MAX_SUBJECTS = 16
+STALL_SECONDS = 3.0 # No frame for this long marks a tile as stalled
+
+class SubjectTile:
+    """One subject's cell: name, EDA trace and a metrics line."""
+    def __init__(self, cell, name, window_seconds=60.0, fs=20.0, delay=0.5):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.delay = delay # Display clock lag behind the newest sample (s)
+        self.title = cell.addLabel(name, row=0, col=0, bold=True, size="9pt", color=COLOR_TEXT)
+        self.plot = cell.addPlot(row=1, col=0)
+        self.plot.setMouseEnabled(x=False, y=False)
+        self.plot.setMenuEnabled(False)
+        self.plot.hideButtons()
+        self.plot.hideAxis("bottom")
+        self.plot.getAxis("left").setWidth(32)
+        self.plot.setXRange(-window_seconds, 0, padding=0)
+        self.curve = pg.PlotCurveItem(pen=pg.mkPen(COLOR_EDA, width=1))
+        self.plot.addItem(self.curve)
+        self.label = cell.addLabel("", row=2, col=0, size="8pt", color=COLOR_TEXT)
+
+        self.buf = StripBuffer(max(1, int(window_seconds * fs)))
+        self.dec = MinMaxDecimator()
+        self.yrange = AxisRange()
+        self.hr = self.rmssd = self.sqi = float("nan")
+        self.loss = 0.0
+        self.last_frame = time.monotonic()
+        self.dirty = False
+        self._text = None
+        self._anchor = None # (session time, monotonic time) of the display clock
+
+    def push_eda(self, t, values):
+        self.buf.append(t, values)
+        if self.dec.width is not None:
+            self.dec.append(t, values) # Only the open and new bins change
+        now = time.monotonic()
+        self.last_frame = now
+        self.dirty = True
+        # Pull the display clock towards the stream; snap after a stall or jump
+        target = self.buf.latest_time() - self.delay
+        shown = self.display_time(now)
+        if shown is None or abs(target - shown) > 1.0:
+            self._anchor = (target, now)
+        else:
+            self._anchor = (shown + 0.2 * (target - shown), now)
+
+    def display_time(self, now):
+        """Session time drawn at the right edge of the tile."""
+        if self._anchor is None:
+            return None
+        t, wall = self._anchor
+        return t + (now - wall)
+
+    def set_metric(self, name, value):
+        setattr(self, name, value)
+        self.dirty = True
+
+    def stalled(self, now):
+        return now - self.last_frame > STALL_SECONDS
+
+    def render(self, now):
+        """Scrolls to the display clock; rebuilds the curve only if data arrived."""
+        shown = self.display_time(now)
+        if shown is not None:
+            self.curve.setPos(-shown, 0)
+        if not self.dirty:
+            return shown is not None
+        self.dirty = False
+        if len(self.buf):
+            window = self.window_seconds
+            x, y = self.buf.window(window)
+            n_bins = max(50, int(self.plot.vb.width()))
+            width = window / n_bins
+            if len(x) > 2 * n_bins:
+                if self.dec.width != width:
+                    self.dec.rebuild(x, y, width, n_bins) # First use or tile resized
+                x, y = self.dec.points(x[0])
+            else:
+                self.dec.width = None
+            self.curve.setData(x, y, connect="finite")
+            if np.isfinite(y).any() and self.yrange.update(np.nanmin(y), np.nanmax(y)) is not None:
+                self.plot.setYRange(*self.yrange.range, padding=0)
+        self._update_text(now)
+        return True
+
+    def _update_text(self, now):
+        if self.stalled(now):
+            text, color = "NO DATA", COLOR_RECORD
+        else:
+            parts = [f"HR {self.hr:.0f}" if np.isfinite(self.hr) else "HR --",
+                     f"RMSSD {self.rmssd:.0f} ms" if np.isfinite(self.rmssd) else "RMSSD --",
+                     f"SQI {self.sqi * 100:.0f}%" if np.isfinite(self.sqi) else "SQI --",
+                     f"Loss {self.loss * 100:.1f}%"]
+            text, color = "  ".join(parts), COLOR_RECORD if self.loss > 0.05 else COLOR_TEXT
+        if (text, color) != self._text:
+            # LabelItem relayouts its HTML on every setText; skip unchanged text
+            self._text = (text, color)
+            self.label.setText(text, color=color)
+
+class SubjectStream(QObject):
+    """Feeds one subject's worker output into its tile (all slots run in the GUI thread)."""
+    def __init__(self, source, worker, tile, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.worker = worker
+        self.tile = tile
+        worker.frame_ready.connect(self.on_frame_ready)
+        worker.hrv_processor.hrv_computed.connect(self.on_hrv)
+        worker.hrv_processor.quality.quality_updated.connect(self.on_quality)
+        source.packet_ready.connect(worker.submit)
+
+    @Slot(object)
+    def on_frame_ready(self, frame):
+        if frame.eda is not None:
+            self.tile.push_eda(frame.eda_t, frame.eda)
+        if frame.hr is not None and np.isfinite(frame.hr).any():
+            self.tile.hr = float(frame.hr[np.isfinite(frame.hr)][-1])
+        self.tile.loss = frame.loss.loss_ratio
+
+    @Slot(dict)
+    def on_hrv(self, data):
+        self.tile.set_metric("rmssd", data.get("rmssd", float("nan")))
+
+    @Slot(object, object)
+    def on_quality(self, t, sqi):
+        if len(sqi):
+            self.tile.set_metric("sqi", float(sqi[-1]))
+
+class GroupDashboard(QWidget):
+    """
+    Grid of up to MAX_SUBJECTS subject tiles with a shared render clock.
+
+    The owner builds the ingestion threads and calls start_group(); the
+    Start button only emits `start_requested(count, use_devices)` and Close
+    only `close_requested`.
+    Implements the RenderScheduler plot interface for the whole grid.
+    """
+    start_requested = Signal(int, bool)
+    stop_requested = Signal()
+    close_requested = Signal()
+
+    def __init__(self, window_seconds=60.0, worker_interval_ms=500, hrv_every_s=5.0, parent=None):
+        super().__init__(parent)
+        self.window_seconds = window_seconds
+        self.worker_interval_ms = worker_interval_ms
+        self.hrv_every_s = hrv_every_s
+        self.tiles = []
+        self.streams = []
+        self.thread = None
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Subjects:"))
+        self.spin_count = QSpinBox()
+        self.spin_count.setRange(1, MAX_SUBJECTS)
+        self.spin_count.setValue(4)
+        controls.addWidget(self.spin_count)
+        self.chk_devices = QCheckBox("Use connected devices (one per serial port)")
+        controls.addWidget(self.chk_devices)
+        self.btn_start = QPushButton("Start Group")
+        self.btn_start.clicked.connect(lambda: self.start_requested.emit(self.spin_count.value(),
+                                                                         self.chk_devices.isChecked()))
+        self.btn_stop = QPushButton("Stop Group")
+        self.btn_stop.setObjectName("secondary")
+        self.btn_stop.setEnabled(False)
+        self.btn_stop.clicked.connect(self.stop_requested.emit)
+        controls.addWidget(self.btn_start)
+        controls.addWidget(self.btn_stop)
+        controls.addStretch()
+        self.lbl_rate = QLabel("")
+        controls.addWidget(self.lbl_rate)
+        btn_close = QPushButton("Close")
+        btn_close.setObjectName("secondary")
+        btn_close.clicked.connect(self.close_requested.emit)
+        controls.addWidget(btn_close)
+        layout.addLayout(controls)
+
+        self.glw = pg.GraphicsLayoutWidget()
+        if USE_OPENGL:
+            self.glw.useOpenGL(True)
+        self.glw.setBackground("w")
+        layout.addWidget(self.glw)
+
+        self.scheduler = RenderScheduler([self], self.isVisible, parent=self)
+        self._frames_drawn = 0
+        self._stats_timer = QTimer(self)
+        self._stats_timer.timeout.connect(self._update_stats)
+
+    # --- Session ---
+    def start_group(self, sources, frame_rate, channel_rates):
+        """Starts one processing pipeline per (name, ingestion thread) and lays out their tiles."""
+        self.stop_group()
+        n = len(sources)
+        cols = math.ceil(math.sqrt(n))
+        workers = []
+        for k, (name, source) in enumerate(sources):
+            cell = self.glw.addLayout(row=k // cols, col=k % cols)
+            tile = SubjectTile(cell, name, self.window_seconds, channel_rates.get("eda", frame_rate),
+                               delay=self.worker_interval_ms / 1000)
+            worker = ProcessingWorker(frame_rate, channel_rates, interval_ms=self.worker_interval_ms,
+                                      hrv_every_s=self.hrv_every_s)
+            self.tiles.append(tile)
+            self.streams.append(SubjectStream(source, worker, tile, parent=self))
+            workers.append(worker)
+        self.thread = start_shared_worker_thread(workers, self)
+        for stream in self.streams:
+            stream.worker.set_paused(False)
+            stream.source.start()
+        self.scheduler.set_streaming(True)
+        self._stats_timer.start(1000)
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+
+    def stop_group(self):
+        if self.thread is None:
+            return
+        for stream in self.streams:
+            stream.source.stop()
+        self.thread.quit()
+        self.thread.wait()
+        self.thread = None
+        self._stats_timer.stop()
+        self.scheduler.set_streaming(False)
+        self.glw.clear()
+        self.tiles = []
+        self.streams = []
+        self.lbl_rate.setText("")
+        self.btn_start.setEnabled(True)
+        self.btn_stop.setEnabled(False)
+
+    def _update_stats(self):
+        drawn = self.scheduler.frames_drawn - self._frames_drawn
+        self._frames_drawn = self.scheduler.frames_drawn
+        self.lbl_rate.setText(f"{len(self.tiles)} streams | {drawn} fps | {self.scheduler.render_ms:.1f} ms/frame")
+        # Stalled streams get no frames, so nothing else would redraw their status
+        now = time.monotonic()
+        for tile in self.tiles:
+            if tile.stalled(now):
+                tile.dirty = True
+
+    # --- RenderScheduler plot interface ---
+    def render(self):
+        now = time.monotonic()
+        drawn = [tile.render(now) for tile in self.tiles]
+        return any(drawn)
+
+    def curves(self):
+        return tuple(tile.curve for tile in self.tiles)
+
+    def mark_dirty(self):
+        for tile in self.tiles:
+            tile.dirty = True
+
+
+#Test output
+if __name__ == "__main__":
+    import os
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication([])
+    dashboard = GroupDashboard()
+    dashboard.resize(1600, 1000)
+    dashboard.show()
+    fs, n = 20, MAX_SUBJECTS
+
+    # Tiles only (no pipelines): 16 subjects, 60 s of EDA pushed in 500 ms frames
+    cols = 4
+    for k in range(n):
+        cell = dashboard.glw.addLayout(row=k // cols, col=k % cols)
+        dashboard.tiles.append(SubjectTile(cell, f"Subject {k + 1}", 60.0, fs))
+    app.processEvents()
+    rng = np.random.default_rng(0)
+    def push_frame(t0):
+        t = t0 + np.arange(10) / fs
+        for k, tile in enumerate(dashboard.tiles):
+            tile.push_eda(t, 2 + np.sin(t / (5 + k)) + 0.01 * rng.standard_normal(10))
+            tile.hr, tile.loss = 70.0 + k, 0.0
+        return t0 + 10 / fs
+    t0 = 0.0
+    for _ in range(120):
+        t0 = push_frame(t0)
+
+    # At 30 FPS a 500 ms worker frame arrives every 15th redraw; the others only scroll
+    data_ms, scroll_ms = [], []
+    for frame in range(20):
+        start = time.perf_counter()
+        if frame % 5 == 0:
+            t0 = push_frame(t0)
+        dashboard.render()
+        dashboard.glw.viewport().repaint() # Synchronous paint of the whole wall
+        (data_ms if frame % 5 == 0 else scroll_ms).append((time.perf_counter() - start) * 1000)
+    print(f"{n} tiles, redraw + paint: {np.median(data_ms):.2f} ms with new data, "
+          f"{np.median(scroll_ms):.2f} ms scrolling only")
+
+    # Drawn points per tile are bounded by its pixel width, and the newest
+    # sample sits one worker interval right of the display clock
+    tile = dashboard.tiles[0]
+    x, y = tile.curve.getData()
+    assert len(x) <= 2 * int(tile.plot.vb.width()) + 8
+    shown = tile.display_time(time.monotonic())
+    assert abs(tile.buf.latest_time() - shown - tile.delay) < 0.1
+    assert abs(tile.curve.pos().x() + shown) < 0.1
+    assert tile._text[0].startswith("HR 70")
+    dashboard.tiles[1].last_frame -= 10
+    dashboard.tiles[1].dirty = True
+    dashboard.render()
+    assert dashboard.tiles[1]._text[0] == "NO DATA"
+    print("All checks passed!")
+    os._exit(0) # Skip teardown of the pyqtgraph items
@@ -0,0 +1,133 @@
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox, QLabel
+
+# --- EDA DEBUG INSPECTOR ---
+
+class EDAInspectorWindow(QWidget):
+    """
+    Shows the EDA processor's latest analysis window: raw, cleaned and tonic
+    signal on top, phasic component with SCR onsets and peaks below.
+
+    Reads `processor.last_window`, which the worker replaces once per
+    processing tick; a timer redraws when it changed and the window is
+    visible, so nothing runs in the processing thread. SCRs are detected
+    here, only for the windows actually drawn. Both plots share the x-axis;
+    zooming stops following new data until "Reset Zoom".
+    """
+    def __init__(self, processor, refresh_ms=500, parent=None):
+        super().__init__(parent)
+        self.processor = processor
+        self.setWindowTitle("EDA Inspector (NeuroKit2)")
+        self.setMinimumSize(700, 500)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.chk_freeze = QCheckBox("Freeze")
+        self.chk_freeze.setToolTip("Stop updating, e.g. while inspecting a zoomed section")
+        btn_reset = QPushButton("Reset Zoom")
+        btn_reset.clicked.connect(self.reset_zoom)
+        self.info_label = QLabel("Waiting for the first full analysis window...")
+        controls.addWidget(self.chk_freeze)
+        controls.addWidget(btn_reset)
+        controls.addStretch()
+        controls.addWidget(self.info_label)
+        layout.addLayout(controls)
+
+        self.glw = pg.GraphicsLayoutWidget()
+        self.glw.setBackground("w")
+        self.plot_signal = self.glw.addPlot(row=0, col=0, title="Raw / Clean / Tonic")
+        self.plot_phasic = self.glw.addPlot(row=1, col=0, title="Phasic (SCR)")
+        self.plot_phasic.setXLink(self.plot_signal)
+        for plot, units in ((self.plot_signal, "µS"), (self.plot_phasic, "µS")):
+            plot.showGrid(x=True, y=True, alpha=0.3)
+            plot.setLabel("left", "EDA", units=units)
+            plot.getAxis("left").enableAutoSIPrefix(False)
+        self.plot_phasic.setLabel("bottom", "Time", units="s")
+        self.plot_signal.addLegend(offset=(-10, 10))
+        self.plot_phasic.addLegend(offset=(-10, 10))
+
+        self.curve_raw = self.plot_signal.plot(pen=pg.mkPen("#AAAAAA", width=1), name="Raw")
+        self.curve_clean = self.plot_signal.plot(pen=pg.mkPen("#007ACC", width=2), name="Clean")
+        self.curve_tonic = self.plot_signal.plot(pen=pg.mkPen("#2E8B57", width=2, style=Qt.DashLine), name="Tonic")
+        self.curve_phasic = self.plot_phasic.plot(pen=pg.mkPen("#D9534F", width=2), name="Phasic")
+        self.scr_onsets = pg.ScatterPlotItem(symbol="t1", size=9, brush=pg.mkBrush("#07294D"), pen=None, name="SCR onset")
+        self.scr_peaks = pg.ScatterPlotItem(symbol="o", size=8, brush=pg.mkBrush("#FF8C00"), pen=None, name="SCR peak")
+        self.plot_phasic.addItem(self.scr_onsets)
+        self.plot_phasic.addItem(self.scr_peaks)
+        layout.addWidget(self.glw)
+
+        self._shown = None # Window currently drawn
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start(refresh_ms)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+
+    def reset_zoom(self):
+        for plot in (self.plot_signal, self.plot_phasic):
+            plot.enableAutoRange()
+
+    def refresh(self):
+        window = self.processor.last_window
+        if window is None or window is self._shown or self.chk_freeze.isChecked() or not self.isVisible():
+            return
+        self._shown = window
+        t = window.t
+        self.curve_raw.setData(t, window.raw)
+        self.curve_clean.setData(t, window.clean)
+        self.curve_tonic.setData(t, window.tonic)
+        self.curve_phasic.setData(t, window.phasic)
+        try:
+            onsets, peaks = window.find_scrs()
+        except Exception as e:
+            # Too flat or too short a window for peak detection
+            onsets = peaks = np.array([], dtype=int)
+            print(f"SCR detection failed: {e}")
+        self.scr_onsets.setData(t[onsets], window.phasic[onsets])
+        self.scr_peaks.setData(t[peaks], window.phasic[peaks])
+        self.info_label.setText(f"{t[0]:.1f} - {t[-1]:.1f} s, {window.sampling_rate:g} Hz, {len(peaks)} SCRs")
+
+
+#Test output
+if __name__ == "__main__":
+    import time
+    import neurokit2 as nk
+    from PySide6.QtWidgets import QApplication
+    from eda_process import EDAProcessor
+    from streams import ChannelBlock
+
+    app = QApplication([])
+    fs = 20
+    eda = nk.eda_simulate(duration=90, sampling_rate=fs, scr_number=6, random_state=3)
+    processor = EDAProcessor(sampling_rate=fs, window_seconds=60)
+    inspector = EDAInspectorWindow(processor)
+    inspector.show()
+
+    # Processing ticks (two frames each) never touch the inspector
+    ticks = []
+    for k in range(0, len(eda), 2):
+        t = np.arange(k, k + 2) / fs
+        block = ChannelBlock("eda", t, np.column_stack([eda[k:k + 2], eda[k:k + 2]]), np.ones(2, dtype=bool))
+        start = time.perf_counter()
+        processor.process_batch(block)
+        ticks.append((time.perf_counter() - start) * 1000)
+    print(f"EDA tick: {np.median(ticks):.2f} ms median")
+
+    start = time.perf_counter()
+    inspector.refresh()
+    print(f"Inspector refresh: {(time.perf_counter() - start) * 1000:.2f} ms, {inspector.info_label.text()}")
+    window = processor.last_window
+    assert inspector._shown is window and len(window.raw) == 60 * fs
+    assert abs(window.t[-1] - (len(eda) - 1) / fs) < 1e-9
+    assert len(inspector.scr_peaks.data) >= 3
+
+    # Unchanged or frozen windows are not redrawn
+    inspector.chk_freeze.setChecked(True)
+    processor.process_batch(ChannelBlock("eda", np.array([90.0]), np.array([[eda[-1], eda[-1]]]), np.ones(1, dtype=bool)))
+    inspector.refresh()
+    assert inspector._shown is window
+    print("All checks passed!")
@@ -1,8 +1,30 @@
+from dataclasses import dataclass
 from PySide6.QtCore import QObject
-import neurokit2 as nk
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from streams import ChannelBlock, fill_missing, leading_missing
+from startup import lazy_import
+
+nk = lazy_import("neurokit2")
+
+@dataclass(frozen=True)
+class EDAWindow:
+    """One processed analysis window (arrays of equal length, oldest first)."""
+    t_end: float        # Session time (s) of the last sample
+    sampling_rate: float
+    raw: np.ndarray
+    clean: np.ndarray
+    phasic: np.ndarray
+    tonic: np.ndarray
+
+    @property
+    def t(self):
+        return self.t_end - np.arange(len(self.raw))[::-1] / self.sampling_rate
+
+    def find_scrs(self, amplitude_min=0.1):
+        """(onset indices, peak indices) of the SCRs in the phasic component."""
+        info = nk.eda_findpeaks(self.phasic, sampling_rate=self.sampling_rate, method="neurokit",
+                                amplitude_min=amplitude_min)
+        return np.asarray(info["SCR_Onsets"], dtype=int), np.asarray(info["SCR_Peaks"], dtype=int)
 
 class EDAProcessor(QObject):
     """
@@ -14,31 +36,40 @@ class EDAProcessor(QObject):
         self.window_seconds = window_seconds
         self.window_size = int(window_seconds * sampling_rate)
         self.buffer = []
+        # Latest processed window, for the debug inspector. Replaced as a whole,
+        # never modified, so the GUI thread can read it without locking.
+        self.last_window = None
 
-    def process_batch(self, packets: list) -> tuple[list[float], list[float], list[float]]:
+    def process_batch(self, block: ChannelBlock) -> tuple[list[float], list[float], list[float]]:
         """
-        Takes a list of SensorPackets and returns lists of processed values.
+        Takes a block of the EDA channel and returns lists of processed values.
         
         Args:
-            packets (list): A list of SensorPacket objects containing raw data.
+            block (ChannelBlock): New samples of the "eda" channel at its native rate.
             
         Returns:
-            tuple: (eda_smooth, phasic, tonic)
+            tuple: (eda_smooth, phasic, tonic), one value per block row
                 - eda_smooth (list[float]): Cleaned EDA signal.
                 - phasic (list[float]): Phasic component (SCR).
                 - tonic (list[float]): Tonic component (SCL).
+            Lost rows are NaN in all three; rows the router interpolated are
+            processed like received ones.
         """
-        # 1. Extract raw EDA values from packets
-        new_raw = []
-        for p in packets:
-            val = 0.0
-            if p.eda:
-                val = float(p.eda.raw)
-            new_raw.append(val)
-        
-        if not new_raw:
+        if len(block) == 0:
             return [], [], []
 
+        # 1. Extract raw EDA values; lost samples are held at the last value
+        # so the filters stay continuous, and masked again on output
+        last = self.buffer[-1] if self.buffer else np.nan
+        raw = fill_missing(block.column("raw"), block.usable, last)
+        # Rows lost before the first sample of the session have no value to
+        # hold; they stay out of the buffer (and are NaN on output)
+        skip = leading_missing(raw)
+        new_raw = raw[skip:].tolist()
+        lost = ~block.usable
+        if not new_raw:
+            return [np.nan] * len(block), [np.nan] * len(block), [np.nan] * len(block)
+
         # 2. Append to internal buffer
         self.buffer.extend(new_raw)
         
@@ -48,49 +79,41 @@ class EDAProcessor(QObject):
             
         # 3. Process if buffer is sufficient size
         # We need enough history for the filters to settle (at least 4 seconds recommended)
+        eda_clean, phasic, tonic = new_raw, [0.0]*len(new_raw), new_raw
         if len(self.buffer) >= self.sampling_rate * 4:
             try:
-                # Run NeuroKit2 processing
-                # method='neurokit' uses a high-pass filter for phasic extraction (fast & robust)
-                signals, _ = nk.eda_process(self.buffer, sampling_rate=self.sampling_rate, method='neurokit')
-                
-                # Store for debug plotting
-                self.last_signals = signals
-                self.last_info = _
-                
-                # 4. Extract 'EDA_Clean', 'EDA_Phasic', 'EDA_Tonic'
-                # We only need the values corresponding to the new packets we just added
+                # Same steps as nk.eda_process(method='neurokit'), without
+                # its SCR detection and per-tick DataFrame
+                clean_all = nk.eda_clean(self.buffer, sampling_rate=self.sampling_rate, method='neurokit')
+                # 'neurokit' decomposition: high-pass filter for phasic extraction (fast & robust)
+                components = nk.eda_phasic(clean_all, sampling_rate=self.sampling_rate, method='neurokit')
+                phasic_all = components["EDA_Phasic"].to_numpy()
+                tonic_all = components["EDA_Tonic"].to_numpy()
+                self.last_window = EDAWindow(float(block.t[-1]), self.sampling_rate, np.array(self.buffer),
+                                             np.asarray(clean_all), phasic_all, tonic_all)
+
+                # 4. We only need the values corresponding to the new samples we just added
                 n_new = len(new_raw)
-                
-                # signals is a DataFrame. We take the last n_new rows.
-                eda_clean = signals["EDA_Clean"].iloc[-n_new:].to_list()
-                phasic = signals["EDA_Phasic"].iloc[-n_new:].to_list()
-                tonic = signals["EDA_Tonic"].iloc[-n_new:].to_list()
-                
-                return eda_clean, phasic, tonic
+                eda_clean = clean_all[-n_new:].tolist()
+                phasic = phasic_all[-n_new:].tolist()
+                tonic = tonic_all[-n_new:].tolist()
                 
             except Exception as e:
                 print(f"EDA Processing Error: {e}")
-                # Fallback on error
-                return new_raw, [0.0]*len(new_raw), new_raw
-        else:
-            # Not enough data yet, return raw as smooth, 0 for components
-            return new_raw, [0.0]*len(new_raw), new_raw
+                # Fallback on error: raw as smooth, 0 for components
+        # else: not enough data yet, return raw as smooth, 0 for components
 
-    def create_debug_plot(self):
-        """
-        Opens a matplotlib window with the NeuroKit2 analysis of the current buffer.
-        Useful for verifying the signal processing pipeline.
-        """
-        if hasattr(self, 'last_signals') and hasattr(self, 'last_info'):
-            # Create the plot using NeuroKit2's native function
-            nk.eda_plot(self.last_signals, self.last_info)
-            plt.show()
+        if skip:
+            eda_clean, phasic, tonic = ([np.nan] * skip + list(v) for v in (eda_clean, phasic, tonic))
+        if lost.any():
+            eda_clean, phasic, tonic = (np.where(lost, np.nan, v).tolist() for v in (eda_clean, phasic, tonic))
+        return eda_clean, phasic, tonic
 
     def set_sampling_rate(self, rate):
         self.sampling_rate = rate
         self.window_size = int(self.window_seconds * rate)
         self.buffer = []
+        self.last_window = None
 
     def set_window_seconds(self, seconds):
         self.window_seconds = seconds
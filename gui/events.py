@@ -0,0 +1,268 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PySide6.QtCore import QObject, Signal
+
+# --- SESSION STORAGE ---
+
+class SessionArray:
+    """
+    Append-only float64 array for whole-session signals.
+    Capacity doubles when full so appends are amortised O(1) and
+    `view()` never copies.
+    """
+    def __init__(self, capacity=4096):
+        self._data = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        n = len(values)
+        if n == 0:
+            return
+        if self._size + n > len(self._data):
+            new_cap = max(len(self._data) * 2, self._size + n)
+            grown = np.empty(new_cap, dtype=np.float64)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:self._size + n] = values
+        self._size += n
+
+    def view(self):
+        return self._data[:self._size]
+
+    def clear(self):
+        self._size = 0
+
+# --- EVENT-LOCKED ANALYSIS ---
+
+class EventAnalyzer(QObject):
+    """
+    Event-related response analysis around inserted flags.
+
+    Keeps session-long copies of the phasic EDA and heart-rate traces plus
+    detected beat times. Every flag is a time (s) on the session axis; once
+    its post-event window has been acquired the aligned pre/post windows of
+    all pending flags are cut out as one (events x samples) array and
+    analysed in a single batch. Adding or deleting a flag only touches that
+    flag's row - the session is never reprocessed.
+    """
+    # Emits (event_id, metrics) whenever an event's analysis is completed
+    event_analyzed = Signal(int, dict)
+
+    def __init__(self, parent=None, eda_rate=20, hr_rate=20, pre_seconds=5.0, post_seconds=10.0,
+                 scr_threshold=0.01, scr_latency=(1.0, 5.0), max_beat_lag=40.0):
+        super().__init__(parent)
+        self.eda_rate = eda_rate # Phasic trace runs at the EDA channel rate
+        self.hr_rate = hr_rate   # HR trace runs at the cardiac channel rate
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.scr_threshold = scr_threshold # µS rise above onset level counted as a response
+        self.scr_latency = scr_latency     # (min, max) seconds after the flag an SCR may start
+        self.max_beat_lag = max_beat_lag   # Beats arrive in HRV-window batches; wait this long for them
+
+        self.phasic = SessionArray()
+        self.hr = SessionArray()
+        self.beats = SessionArray()        # Beat times in seconds on the session axis
+
+        self._next_id = 0
+        self._events = {}    # id -> (time_s, label)
+        self._pending = []   # ids waiting for their post-event window
+        self.results = {}    # id -> metrics dict
+
+    # --- Stream input ---
+    def append_phasic(self, phasic):
+        """Appends newly processed phasic EDA samples (at eda_rate)."""
+        self.phasic.append(phasic)
+        if self._pending:
+            self.update()
+
+    def append_hr(self, hr):
+        """Appends newly processed heart-rate samples (at hr_rate)."""
+        self.hr.append(hr)
+        if self._pending:
+            self.update()
+
+    def append_beats(self, beat_times):
+        """Appends newly confirmed beat times (seconds, ascending)."""
+        self.beats.append(beat_times)
+        if self._pending:
+            self.update()
+
+    # --- Flag bookkeeping ---
+    def add_event(self, time_s, label="Event", event_id=None):
+        """
+        Registers a flag and returns its id (allocated here unless the caller,
+        e.g. another thread, supplies one). Analysis runs once the post window
+        is complete.
+        """
+        if event_id is None:
+            event_id = self._next_id
+            self._next_id += 1
+        self._events[event_id] = (float(time_s), label)
+        self._pending.append(event_id)
+        self.update()
+        return event_id
+
+    def remove_event(self, event_id):
+        self._events.pop(event_id, None)
+        self.results.pop(event_id, None)
+        if event_id in self._pending:
+            self._pending.remove(event_id)
+
+    def reset(self):
+        self.phasic.clear()
+        self.hr.clear()
+        self.beats.clear()
+        self._events = {}
+        self._pending = []
+        self.results = {}
+
+    def set_rates(self, eda_rate, hr_rate):
+        self.eda_rate = eda_rate
+        self.hr_rate = hr_rate
+        self.reset()
+
+    # --- Analysis ---
+    def update(self):
+        """Analyses every pending event whose post-event window is now available."""
+        # Session time covered by both traces
+        covered = min((len(self.phasic) - 1) / self.eda_rate, (len(self.hr) - 1) / self.hr_rate)
+        beats = self.beats.view()
+        last_beat = beats[-1] if len(beats) else -np.inf
+
+        ready = []
+        for event_id in self._pending:
+            end = self._events[event_id][0] + self.post_seconds
+            beats_in = last_beat >= end or covered >= end + self.max_beat_lag
+            if covered >= end and beats_in:
+                ready.append(event_id)
+        if not ready:
+            return
+
+        for event_id in ready:
+            self._pending.remove(event_id)
+
+        metrics = self.analyze(np.array([self._events[i][0] for i in ready]))
+        for row, event_id in enumerate(ready):
+            result = {key: float(values[row]) for key, values in metrics.items()}
+            result["time"], result["label"] = self._events[event_id]
+            self.results[event_id] = result
+            self.event_analyzed.emit(event_id, result)
+
+    def extract_windows(self, signal, onsets, n_pre, n_post):
+        """
+        Returns the aligned (events x (n_pre + n_post)) window array for `onsets`.
+        Windows reaching before the session start are NaN-padded on the left.
+        """
+        pad = np.full(n_pre, np.nan)
+        padded = np.concatenate([pad, signal]) if n_pre else signal
+        windows = sliding_window_view(padded, n_pre + n_post)
+        return windows[onsets]
+
+    def _windows(self, signal, rate, times):
+        n_pre = int(round(self.pre_seconds * rate))
+        n_post = int(round(self.post_seconds * rate))
+        onsets = np.round(times * rate).astype(np.int64)
+        return self.extract_windows(signal.view(), onsets, n_pre, n_post), n_pre, n_post
+
+    def analyze(self, times):
+        """Batched per-event metrics for flag times (s)."""
+        fs = float(self.eda_rate)
+        phasic, n_pre, n_post = self._windows(self.phasic, fs, times)
+        hr, n_pre_hr, _ = self._windows(self.hr, self.hr_rate, times)
+
+        # SCR: first rise above threshold inside the latency window, amplitude = peak rise
+        baseline = phasic[:, n_pre:n_pre + 1]
+        lo = n_pre + int(self.scr_latency[0] * fs)
+        hi = min(n_pre + int(self.scr_latency[1] * fs) + 1, n_pre + n_post)
+        rise = phasic[:, lo:hi] - baseline
+        responded = np.any(rise > self.scr_threshold, axis=1)
+        first = np.argmax(rise > self.scr_threshold, axis=1)
+        scr_latency = np.where(responded, (lo - n_pre + first) / fs, np.nan)
+        peak_rise = np.fmax.reduce(phasic[:, lo:] - baseline, axis=1) # NaN (lost samples) ignored
+        scr_amplitude = np.where(responded, peak_rise, 0.0)
+
+        # HR change: mean post - mean pre
+        with np.errstate(invalid="ignore"):
+            hr_pre = np.nanmean(hr[:, :n_pre_hr], axis=1) if n_pre_hr else np.full(len(times), np.nan)
+            hr_post = np.nanmean(hr[:, n_pre_hr:], axis=1)
+
+        # HRV change: RMSSD of RR intervals whose beats fall in each window
+        rmssd_pre = self._windowed_rmssd(times - self.pre_seconds, times)
+        rmssd_post = self._windowed_rmssd(times, times + self.post_seconds)
+
+        return {
+            "scr_latency": scr_latency,
+            "scr_amplitude": scr_amplitude,
+            "hr_pre": hr_pre,
+            "hr_post": hr_post,
+            "hr_change": hr_post - hr_pre,
+            "rmssd_pre": rmssd_pre,
+            "rmssd_post": rmssd_post,
+            "rmssd_change": rmssd_post - rmssd_pre,
+        }
+
+    def _windowed_rmssd(self, t_start, t_end):
+        """RMSSD (ms) of successive RR differences for each [t_start, t_end) window."""
+        beats = self.beats.view()
+        if len(beats) < 3:
+            return np.full(len(t_start), np.nan)
+        rr = np.diff(beats) * 1000.0
+        sq_diff = np.diff(rr) ** 2
+        csum = np.concatenate([[0.0], np.cumsum(sq_diff)])
+
+        # Difference j spans beats j..j+2, so it belongs to a window when
+        # beat j is at/after the start and beat j+2 is before the end
+        i0 = np.minimum(np.searchsorted(beats, t_start), len(sq_diff))
+        i1 = np.searchsorted(beats[2:], t_end)
+        count = i1 - i0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rmssd = np.sqrt((csum[np.maximum(i1, i0)] - csum[i0]) / count)
+        return np.where(count >= 2, rmssd, np.nan)
+
+    @staticmethod
+    def format_result(result):
+        """Short one-line summary for the flag list."""
+        if np.isnan(result["scr_latency"]):
+            scr = "no SCR"
+        else:
+            scr = f"SCR {result['scr_amplitude']:.3f} µS @ {result['scr_latency']:.1f}s"
+        parts = [scr]
+        if np.isfinite(result["hr_change"]):
+            parts.append(f"ΔHR {result['hr_change']:+.1f} BPM")
+        if np.isfinite(result["rmssd_change"]):
+            parts.append(f"ΔRMSSD {result['rmssd_change']:+.1f} ms")
+        return " | ".join(parts)
+
+
+#Test output
+if __name__ == "__main__":
+    fs = 20
+    t = np.arange(0, 60, 1 / fs)
+    # Phasic response 2 s after a flag at 20 s, HR step +10 BPM
+    phasic = np.where(t > 22, 0.2 * np.exp(-(t - 22) / 3), 0.0)
+    hr = np.where(t > 20, 80.0, 70.0)
+
+    analyzer = EventAnalyzer(eda_rate=fs, hr_rate=fs)
+    received = {}
+    analyzer.event_analyzed.connect(lambda i, r: received.update({i: r}))
+
+    eid = analyzer.add_event(20.0, "Task Start")
+    late = analyzer.add_event(55.0, "Recovery")
+    analyzer.append_beats(np.cumsum(np.tile([0.80, 0.82, 0.78, 0.81], 20)))
+    for i in range(0, len(t), 7):
+        analyzer.append_phasic(phasic[i:i + 7])
+        analyzer.append_hr(hr[i:i + 7])
+
+    r = received[eid]
+    print(EventAnalyzer.format_result(r))
+    assert abs(r["scr_latency"] - 2.05) < 0.11, r["scr_latency"]
+    assert abs(r["hr_change"] - 10.0) < 0.5, r["hr_change"]
+    assert late not in received, "Post window of the late flag is incomplete"
+
+    analyzer.remove_event(late)
+    assert not analyzer._pending
+    print("All checks passed!")
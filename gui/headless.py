@@ -0,0 +1,165 @@
+import os
+import sys
+import signal
+import argparse
+import warnings
+import datetime
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Slot
+from worker import ProcessingWorker, start_worker_thread
+from recorder import SessionRecorder, ChunkedRecorder
+from procmetrics import MetricsCollector, register_thread
+
+# --- HEADLESS ACQUISITION ---
+# Runs ingestion -> processing -> recording without any window, for
+# unattended recordings and benchmarks:
+#
+#   python headless.py --sim --duration 3600 --out sessions/overnight
+#   python headless.py --port /dev/ttyUSB0 --rate 20
+#   python headless.py --sim --csv            (processed channels as CSV files)
+#
+# Uses a QCoreApplication event loop, so the same worker and ingestion
+# threads as the GUI run unchanged; nothing is drawn.
+
+class HeadlessSession(QObject):
+    """Wires an ingestion thread to a ProcessingWorker and a ChunkedRecorder (or a CSV SessionRecorder)."""
+    def __init__(self, source, frame_rate, channel_rates, out_dir, duration_s=0, status_s=10, csv=False,
+                 parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.duration_s = duration_s
+        self.frames = 0
+        self.samples = 0
+
+        self.worker = ProcessingWorker(frame_rate, channel_rates, interval_ms=33)
+        self.worker.frame_ready.connect(self.on_frame_ready)
+        self.worker.hrv_processor.hrv_error.connect(lambda e: None) # Expected while the window fills
+        self.processing_thread = start_worker_thread(self.worker)
+        if csv:
+            self.recorder = SessionRecorder(out_dir, parent=self)
+            self.worker.frame_ready.connect(self.recorder.write_frame)
+            self.worker.hrv_processor.hrv_computed.connect(self.recorder.write_hrv)
+        else:
+            self.recorder = ChunkedRecorder(out_dir, meta={"frame_rate": frame_rate, "channel_rates": channel_rates},
+                                            parent=self)
+            self.recorder.error_occurred.connect(self.on_error)
+            self.worker.attach_recorder(self.recorder)
+
+        self.metrics = MetricsCollector(probes={"queue_depth": self._queue_depth,
+                                                "dropped": lambda: self.worker.router.stats.frames_lost},
+                                        parent=self)
+        self.metrics.snapshot_ready.connect(self.on_metrics_snapshot)
+        self.metrics.start_recording(os.path.join(out_dir, "metrics.csv"))
+        self._last_snapshot = None
+
+        self.source.packet_ready.connect(self.worker.submit)
+        self.source.error_occurred.connect(self.on_error)
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.print_status)
+        self.status_s = status_s
+        self.started_at = None
+
+    def start(self):
+        register_thread("gui")
+        self.started_at = datetime.datetime.now()
+        self.worker.set_paused(False)
+        self.metrics.start()
+        self.source.start()
+        if self.status_s > 0:
+            self.status_timer.start(int(self.status_s * 1000))
+        if self.duration_s > 0:
+            QTimer.singleShot(int(self.duration_s * 1000), self.stop)
+        print(f"Recording to {self.recorder.directory} (Ctrl+C to stop)")
+
+    @Slot()
+    def stop(self):
+        if self.started_at is None:
+            return
+        self.started_at, started_at = None, self.started_at
+        self.status_timer.stop()
+        self.source.stop()
+        self.processing_thread.quit()
+        self.processing_thread.wait()
+        self.metrics.stop()
+        self.recorder.close()
+        if isinstance(self.recorder, ChunkedRecorder):
+            self.recorder.wait()
+        elapsed = (datetime.datetime.now() - started_at).total_seconds()
+        stats = self.worker.router.stats
+        print(f"Stopped after {elapsed:.0f} s: {self.frames} frames, {self.samples} EDA samples, "
+              f"{stats.frames_lost} frames lost")
+        QCoreApplication.quit()
+
+    def _queue_depth(self):
+        # Called from the metrics thread
+        in_flight = self.source.packets_emitted - self.worker.packets_submitted
+        return max(0, in_flight) + self.worker.pending_count
+
+    @Slot(object)
+    def on_frame_ready(self, frame):
+        self.frames += 1
+        if frame.eda_t is not None:
+            self.samples += len(frame.eda_t)
+
+    @Slot(object)
+    def on_metrics_snapshot(self, snap):
+        self._last_snapshot = snap
+
+    @Slot(str)
+    def on_error(self, message):
+        print(f"Error: {message}", file=sys.stderr)
+
+    def print_status(self):
+        self.recorder.flush()
+        elapsed = (datetime.datetime.now() - self.started_at).total_seconds()
+        line = f"[{elapsed:7.0f} s] frames {self.frames}, loss {self.worker.router.stats.loss_ratio * 100:.1f}%"
+        snap = self._last_snapshot
+        if snap is not None:
+            line += f", CPU {snap['cpu_total']:.0f}%, RSS {snap['rss_mb']:.0f} MB, queue {snap['queue_depth']:.0f}"
+        print(line, flush=True)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Record and process a session without the GUI.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--sim", action="store_true", help="use the simulated data stream")
+    source.add_argument("--port", help="serial port of the wearable (e.g. COM3, /dev/ttyUSB0)")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--rate", type=int, default=20, help="frame rate in Hz (default 20)")
+    for channel in ("eda", "cardiac", "imu"):
+        parser.add_argument(f"--{channel}-rate", type=int, default=None,
+                            help=f"native {channel} rate in Hz (default: frame rate)")
+    parser.add_argument("--loss", type=float, default=0.0, help="simulated frame loss fraction")
+    parser.add_argument("--duration", type=float, default=0, help="seconds to record (0 = until Ctrl+C)")
+    parser.add_argument("--status", type=float, default=10, help="seconds between status lines (0 = off)")
+    parser.add_argument("--out", default=None, help="session directory (default sessions/session_<time>)")
+    parser.add_argument("--csv", action="store_true", help="write processed channels as CSV instead of session.chk")
+    parser.add_argument("--verbose", action="store_true", help="show NeuroKit warnings")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.verbose:
+        # Per-window NeuroKit warnings would flood an overnight log
+        warnings.filterwarnings("ignore", module="neurokit2")
+    app = QCoreApplication(sys.argv[:1])
+    rates = {"eda": args.eda_rate, "cardiac": args.cardiac_rate, "imu": args.imu_rate}
+    # A channel can't be sent more often than once per frame
+    rates = {name: min(rate or args.rate, args.rate) for name, rate in rates.items()}
+    if args.sim:
+        from simdata import SimulationIngestionThread
+        source = SimulationIngestionThread(sampling_rate=args.rate, channel_rates=rates, loss_rate=args.loss)
+    else:
+        from rawdata import HardwareIngestionThread
+        source = HardwareIngestionThread(port=args.port, baudrate=args.baudrate)
+    out_dir = args.out or os.path.join("sessions", datetime.datetime.now().strftime("session_%Y%m%d_%H%M%S"))
+
+    session = HeadlessSession(source, args.rate, rates, out_dir, args.duration, args.status, args.csv)
+    # Ctrl+C: Python only runs signal handlers between bytecodes, so wake the interpreter regularly
+    signal.signal(signal.SIGINT, lambda *_: session.stop())
+    wake = QTimer()
+    wake.timeout.connect(lambda: None)
+    wake.start(200)
+    QTimer.singleShot(0, session.start)
+    return app.exec()
+
+if __name__ == "__main__":
+    sys.exit(main())
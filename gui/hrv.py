@@ -1,6 +1,3 @@
-import neurokit2 as nk
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QPushButton, QLineEdit, 
@@ -12,172 +9,318 @@ from PySide6.QtCore import Qt, QTimer, QSize, QTime, QObject, Signal, Slot
 from PySide6.QtGui import QAction, QFont, QIcon, QColor, QPalette
 
 import pyqtgraph as pg
-
-# Show window for R-R intervals
-class RRIntervalWindow(QWidget):
-    def __init__(self, rri_ms, parent=None):
+from streams import fill_missing, leading_missing
+from kernels import rr_intervals
+from quality import PPGQuality
+from events import SessionArray
+from render import PointCloudItem
+from startup import lazy_import
+
+nk = lazy_import("neurokit2")
+
+# --- LIVE HRV WINDOWS ---
+# The windows subscribe to the processor's beat and HRV stream: new RR
+# intervals are appended to growable session arrays and drawn incrementally
+# by a throttled redraw, only while the window is visible. They are built
+# once and shown/hidden, so reopening keeps the session's history.
+
+class LiveHRVWindow(QWidget):
+    """Shared buffering and throttled redraw of the live HRV windows."""
+    def __init__(self, title, min_width, min_height, redraw_ms=250, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("RR Interval Analysis")
-        self.setMinimumSize(400, 300)
+        self.setWindowTitle(title)
+        self.setMinimumSize(min_width, min_height)
+        self.t = SessionArray()   # Beat times (s)
+        self.rri = SessionArray() # RR interval ending at each beat (ms); NaN = implausible, breaks the series
+        self.metrics = {}         # Latest hrv_computed results
+        self._dirty = True
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._tick)
+        self._timer.start(redraw_ms)
+
+    def __len__(self):
+        return len(self.rri)
+
+    @Slot(object, object)
+    def append_rri(self, t, rri_ms):
+        self.t.append(t)
+        self.rri.append(rri_ms)
+        self._dirty = True
+
+    @Slot(dict)
+    def update_metrics(self, data):
+        self.metrics = data
+        self._dirty = True
 
-        layout = QVBoxLayout(self)
-
-        pw = pg.PlotWidget(title="RR Intervals (ms)")
-        pw.setLabel("left", "RR Interval", units="ms")
-        pw.setLabel("bottom", "Beat Index")
+    def reset(self):
+        self.t.clear()
+        self.rri.clear()
+        self.metrics = {}
+        self._dirty = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._tick()
+
+    def _tick(self):
+        if self._dirty and self.isVisible():
+            self._dirty = False
+            self.redraw()
+
+    def redraw(self):
+        """
+        Redraws the window from `t`, `rri` and `metrics`. Called at most once
+        per timer tick, only while visible and after new data. Subclasses
+        override it; the base window draws nothing.
+        """
+
+    @staticmethod
+    def _plot_widget(title, left, bottom, left_units=None):
+        pw = pg.PlotWidget(title=title)
+        pw.setLabel("left", left, units=left_units)
+        pw.getAxis("left").enableAutoSIPrefix(False) # "ms" must not become "kms"
+        pw.setLabel("bottom", bottom)
         pw.showGrid(x=True, y=True, alpha=0.3)
         pw.setBackground("w")
-        pg.setConfigOptions(antialias=True)
+        return pw
 
-        if len(rri_ms) > 1: 
-            x = np.arange(len(rri_ms))
-            pw.plot(x, rri_ms, pen=pg.mkPen(color="#007ACC", width=2), symbol="o", symbolSize=8, symbolBrush="#007ACC")
-            mean_rri = float(np.mean(rri_ms))
-            
-            pw.addItem(pg.InfiniteLine(mean_rri, angle=0, pen=pg.mkPen(color="#FF5733", width=1, style=Qt.DashLine), label=f"Mean: {mean_rri:.1f} ms",
-                                       labelOpts={"color": "#3498DB", "position": 0.95}))
+# Show window for R-R intervals
+class RRIntervalWindow(LiveHRVWindow):
+    def __init__(self, rri_ms=None, parent=None):
+        super().__init__("RR Interval Analysis", 400, 300, parent=parent)
+        layout = QVBoxLayout(self)
+
+        self.pw = self._plot_widget("RR Intervals (ms)", "RR Interval", "Beat Index", left_units="ms")
+        # Long sessions: only the visible part is drawn, reduced to ~2 points per pixel
+        self.pw.setClipToView(True)
+        self.pw.setDownsampling(auto=True, mode="peak")
+        self.curve = self.pw.plot(pen=pg.mkPen(color="#007ACC", width=2), connect="finite")
+        self.mean_line = pg.InfiniteLine(angle=0, pen=pg.mkPen(color="#FF5733", width=1, style=Qt.DashLine),
+                                         label="Mean: {value:.1f} ms", labelOpts={"color": "#3498DB", "position": 0.95})
+        self.pw.addItem(self.mean_line)
         # If there are not enough RR intervals, show a message
-        else: 
-            pw.addItem(pg.TextItem("Not enough RR intervals to plot", color="#FF5733"))
+        self.message = pg.TextItem("Not enough RR intervals to plot", color="#FF5733")
+        self.pw.addItem(self.message)
+        layout.addWidget(self.pw)
+
+        self._index = np.arange(0)
+        self._sum = 0.0
+        self._count = 0
+        if rri_ms is not None:
+            self.append_rri(np.cumsum(rri_ms) / 1000, rri_ms)
+
+    def append_rri(self, t, rri_ms):
+        super().append_rri(t, rri_ms)
+        # Running mean, so the mean line never rescans the session
+        rri = np.asarray(rri_ms, dtype=float)
+        finite = rri[np.isfinite(rri)]
+        self._sum += float(finite.sum())
+        self._count += len(finite)
 
-        layout.addWidget(pw)
+    def reset(self):
+        super().reset()
+        self._sum = 0.0
+        self._count = 0
+
+    def redraw(self):
+        n = len(self.rri)
+        enough = self._count > 1
+        self.message.setVisible(not enough)
+        self.mean_line.setVisible(enough)
+        if len(self._index) < n:
+            self._index = np.arange(max(n, 2 * len(self._index)))
+        self.curve.setData(self._index[:n], self.rri.view())
+        if enough:
+            self.mean_line.setValue(self._sum / self._count)
 
 # Show window for Poincare plot
-class PoincarePlotWindow(QWidget):
-    def __init__(self, rri_ms, hrv_nonlinear=None, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Poincare Plot")
-        self.setMinimumSize(400, 400)
-
+class PoincarePlotWindow(LiveHRVWindow):
+    def __init__(self, rri_ms=None, hrv_nonlinear=None, parent=None):
+        super().__init__("Poincare Plot", 400, 400, parent=parent)
         layout = QVBoxLayout(self)
 
-        pw = pg.PlotWidget(title="Poincare Plot")
-        pw.setLabel("left", "RR(n+1) (ms)")
-        pw.setLabel("bottom", "RR(n) (ms)")
-        pw.showGrid(x=True, y=True, alpha=0.3)
-        pw.setBackground("w")
-        pg.setConfigOptions(antialias=True)
-
-        if len(rri_ms) > 2: 
-            rr_n = rri_ms[:-1]
-            rr_n1 = rri_ms[1:]
-            scatterPlot = pg.ScatterPlotItem(rr_n, rr_n1, size=7, pen=pg.mkPen(color="#007ACC", width=2), symbol="o", symbolSize=8, symbolBrush="#007ACC")
-            
-            pw.addItem(scatterPlot)
-
-            # identity line
-            min_val = float(min(rri_ms)) - 20
-            max_val = float(max(rri_ms)) + 20
-            pw.plot([min_val, max_val], [min_val, max_val], pen=pg.mkPen(color="#FF5733", width=1, style=Qt.DashLine))
-            
-        layout.addWidget(pw)
-
+        self.pw = self._plot_widget("Poincare Plot", "RR(n+1) (ms)", "RR(n) (ms)")
+        # Points are only ever added: each redraw appends the new (RR(n), RR(n+1)) pairs
+        self.scatter = PointCloudItem(size=7, color="#007ACC")
+        self.pw.addItem(self.scatter)
+        # identity line
+        self.identity = self.pw.plot(pen=pg.mkPen(color="#FF5733", width=1, style=Qt.DashLine))
+        layout.addWidget(self.pw)
+
+        self.info_label = QLabel("")
+        self.info_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.info_label)
+
+        self._plotted = 0 # RR intervals whose pair (with the next one) is already plotted
+        self._lo = np.inf
+        self._hi = -np.inf
+        if rri_ms is not None:
+            self.append_rri(np.cumsum(rri_ms) / 1000, rri_ms)
         if hrv_nonlinear is not None:
             try:
                 raw_sd1 = hrv_nonlinear.get("HRV_SD1", float("nan"))
                 raw_sd2 = hrv_nonlinear.get("HRV_SD2", float("nan"))
                 sd1 = float(raw_sd1[0]) if hasattr(raw_sd1, '__getitem__') else float(raw_sd1)
                 sd2 = float(raw_sd2[0]) if hasattr(raw_sd2, '__getitem__') else float(raw_sd2)
-                info_text = f"SD1: {sd1:.1f} ms\nSD2: {sd2:.1f} ms"
+                self.update_metrics({"sd1": sd1, "sd2": sd2})
             except Exception as e:
-                info_text = f"Error retrieving nonlinear metrics: {str(e)}"
+                self.info_label.setText(f"Error retrieving nonlinear metrics: {str(e)}")
 
-            info_label = QLabel(info_text)
-            info_label.setAlignment(Qt.AlignCenter)
-            layout.addWidget(info_label)
+    def reset(self):
+        super().reset()
+        self.scatter.clear()
+        self._plotted = 0
+        self._lo = np.inf
+        self._hi = -np.inf
+
+    def redraw(self):
+        rri = self.rri.view()
+        if len(rri) - 1 > self._plotted:
+            rr_n = rri[self._plotted:-1]
+            rr_n1 = rri[self._plotted + 1:]
+            ok = np.isfinite(rr_n) & np.isfinite(rr_n1)
+            if ok.any():
+                self.scatter.append(rr_n[ok], rr_n1[ok])
+                self._lo = min(self._lo, float(rr_n[ok].min()), float(rr_n1[ok].min()))
+                self._hi = max(self._hi, float(rr_n[ok].max()), float(rr_n1[ok].max()))
+                self.identity.setData([self._lo - 20, self._hi + 20], [self._lo - 20, self._hi + 20])
+            self._plotted = len(rri) - 1
+        if "sd1" in self.metrics:
+            self.info_label.setText(f"SD1: {self.metrics['sd1']:.1f} ms\nSD2: {self.metrics['sd2']:.1f} ms")
 
 #PSD window
-class PSDWindow(QWidget):
-    def __init__(self, freq, parent=None):
-        super().__init__(parent)
-        self.setWindowTitle("Power Spectral Density")
-        self.setMinimumSize(400, 300)
+class PSDWindow(LiveHRVWindow):
+    bands  = ["VLF",     "LF",      "HF"     ]
+    keys   = ["vlf",     "lf",      "hf"     ]
+    colors = ["#AED6F1", "#A9DFBF",  "#F9E79F"]
+
+    def __init__(self, freq=None, parent=None):
+        super().__init__("Power Spectral Density", 400, 300, parent=parent)
         layout = QVBoxLayout(self)
 
-        pw = pg.PlotWidget(title="Power Spectral Density")
-        pw.setLabel("left", "Power")
-        pw.setLabel("bottom", "Frequency (Hz)")
-        pw.showGrid(x=True, y=True, alpha=0.3)
-        pw.setBackground("w")
-        pg.setConfigOptions(antialias=True)
+        self.pw = self._plot_widget("Power Spectral Density", "Power", "Frequency (Hz)")
+        self.bar = pg.BarGraphItem(x=list(range(len(self.bands))), height=[0.0] * len(self.bands), width=0.6,
+                                   brushes=[pg.mkBrush(c) for c in self.colors])
+        self.pw.addItem(self.bar)
+        self.pw.getAxis("bottom").setTicks([[(i, band) for i, band in enumerate(self.bands)]])
+        self.message = pg.TextItem("No frequency data available", color="#FF5733")
+        self.pw.addItem(self.message)
+        layout.addWidget(self.pw)
+
+        self.info_label = QLabel("")
+        self.info_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.info_label)
 
         if freq:
-            try: 
-                bands  = ["VLF",     "LF",      "HF"     ]
-                keys   = ["HRV_VLF", "HRV_LF",  "HRV_HF" ]
-                colors = ["#AED6F1", "#A9DFBF",  "#F9E79F"]
-
-                values = []
-                for key in keys:
-                    try: 
-                        raw = freq.get(key, 0)
-                        val = float(raw[0]) if hasattr(raw, '__getitem__') else float(raw)
-                        values.append(val if np.isfinite(val) else 0.0)
-                    except: 
-                        values.append(0.0)
-
-                bar = pg.BarGraphItem(x=list(range(len(bands))), height=values, width=0.6, brushes=[pg.mkBrush(c) for c in colors])
-                
-                pw.addItem(bar)
-                pw.getAxis("bottom").setTicks([[(i, band) for i, band in enumerate(bands)]])
-
-                lf_hf_ratio = values[1] / values[2] if values[2] > 0 else float('inf')
-                info_label =QLabel(f"VLF: {values[0]:.1f} ms²     LF: {values[1]:.1f} ms^2     "
-                               f"HF: {values[2]:.1f} ms²     LF/HF: {lf_hf_ratio:.2f}")
-                info_label.setAlignment(Qt.AlignCenter)
-                layout.addWidget(pw)
-                layout.addWidget(info_label)
+            self.update_metrics({key: freq.get("HRV_" + key.upper(), 0) for key in self.keys})
 
-            except Exception as e:
-                pw.addItem(pg.TextItem(f"Error rendering PSD: {str(e)}", color="#FF5733"))
-                layout.addWidget(pw)
-                
+    def redraw(self):
+        values = []
+        for key in self.keys:
+            try:
+                raw = self.metrics.get(key, 0)
+                val = float(raw[0]) if hasattr(raw, '__getitem__') else float(raw)
+                values.append(val if np.isfinite(val) else 0.0)
+            except (TypeError, ValueError):
+                values.append(0.0)
+        has_data = any(values)
+        self.message.setVisible(not has_data)
+        self.bar.setOpts(height=values)
+        if has_data:
+            lf_hf_ratio = values[1] / values[2] if values[2] > 0 else float('inf')
+            self.info_label.setText(f"VLF: {values[0]:.1f} ms²     LF: {values[1]:.1f} ms^2     "
+                                    f"HF: {values[2]:.1f} ms²     LF/HF: {lf_hf_ratio:.2f}")
         else:
-            pw.addItem(pg.TextItem("No frequency data available", color="#FF5733"))
-            layout.addWidget(pw)
+            self.info_label.setText("")
 
 # Processor for HRV
 # Buffers data, and rund HRV computation when enough data is collected
 class HRVProcessor(QObject):
     hrv_computed = Signal(dict)
     hrv_error = Signal(str)
+    # Emits newly detected beat times (seconds since the stream started) as a numpy array
+    beats_detected = Signal(object)
+    # Emits (beat times s, RR intervals ms) for the same beats; NaN marks an implausible interval
+    rri_detected = Signal(object, object)
 
-    def __init__(self, sampling_rate=256, window_second=30, parent=None):
+    def __init__(self, sampling_rate=256, window_second=30, update_every_s=0.0, parent=None):
         super().__init__(parent)
         self.sampling_rate = sampling_rate # Data points per second
         self.window_second = window_second
+        # Minimum new data between two HRV computations (0 = every block); beats
+        # are still all found as long as this is shorter than the window
+        self.update_every_s = update_every_s
+        self._computed_at = None # samples_seen at the last computation
+        # Frequency-domain and nonlinear metrics (~14 ms of a ~28 ms computation);
+        # when off they are reported as NaN and the PSD/Poincare data is left as is
+        self.extended = True
         self.window_size = window_second * sampling_rate # Windo second determines time of data required to compute HRV, size gives the total number of samples needed
         self.buffer = []
+        self.samples_seen = 0 # Total samples received, used to place beats on the session axis
+        self._last_beat = -1
+        self._last_rr = 0.0 # Last accepted RR interval (ms), reference of the relative gate
+        # RR intervals outside [rr_min_ms, rr_max_ms] are published as NaN; so are
+        # ones changing by more than rr_max_rel from the last accepted interval
+        # (inf = range check only)
+        self.rr_min_ms, self.rr_max_ms, self.rr_max_rel = 250.0, 2000.0, np.inf
+        # Per-second PPG quality; windows that fail it skip the HRV suite
+        self.quality = PPGQuality(sampling_rate, parent=self)
 
         # For plot windows
         self._rri_ms = np.array([])
         self._hrv_nonlinear = None
         self._hrv_freq = None
-
-    def process_packet(self, packet):
-        """Ingests a single packet from the main stream."""
-        if packet.cardiac:
-            # Buffer IR data for raw calculation
-            self.receive_data([packet.cardiac.ir_value])
+        self.rri_count = 0 # RR intervals in the last computed window; safe to read from any thread
+
+    def process_block(self, block):
+        """Ingests a block of the cardiac channel from the main stream."""
+        self.quality.update(block)
+        # Buffer IR data for raw calculation; lost samples hold the last value
+        last = self.buffer[-1] if self.buffer else np.nan
+        ir = fill_missing(block.column("ir_value"), block.usable, last)
+        # Rows lost before the first sample of the session stay out of the
+        # buffer, but still advance the beat clock
+        skip = leading_missing(ir)
+        self.samples_seen += skip
+        if skip < len(ir):
+            self.receive_data(ir[skip:].tolist())
 
     @Slot(list)
     def receive_data(self, data):
         self.buffer.extend(data)
+        self.samples_seen += len(data)
 
         if len(self.buffer) >= self.window_size:
-            self.compute_hrv()
+            due = (self._computed_at is None or
+                   self.samples_seen - self._computed_at >= self.update_every_s * self.sampling_rate)
+            if due:
+                self._computed_at = self.samples_seen
+                self.compute_hrv()
             self.buffer = self.buffer[-self.window_size:]
 
     @Slot()
     # Resets the buffer
     def reset(self):
         self.buffer = []
+        self.samples_seen = 0
+        self._computed_at = None
+        self._last_beat = -1
+        self._last_rr = 0.0
+        self.quality.reset()
         self._rri_ms = np.array([])
         self._hrv_nonlinear = None
         self._hrv_freq = None
+        self.rri_count = 0
 
     # Computes HRV
     def compute_hrv(self):
+        # Cheap quality gate first (only for data fed through process_block)
+        if len(self.quality.sqi):
+            ok, reason = self.quality.window_ok(self.window_second)
+            if not ok:
+                self.hrv_error.emit(reason)
+                return
+
         # Get the most recent sample
         try:
             window = np.array(self.buffer[-self.window_size:])
@@ -200,40 +343,49 @@ class HRVProcessor(QObject):
             mean_rr = float(hrv_results["HRV_MeanNN"].iloc[0])
             pnn50 = float(hrv_results["HRV_pNN50"].iloc[0])
 
-            # Frequency domain 
-            try: 
-                hrv_freq_df = nk.hrv_frequency(peaks, sampling_rate=self.sampling_rate, show=False)
-                self._hrv_freq = hrv_freq_df.iloc[0].to_dict()
-                lf = float(hrv_freq_df["HRV_LF"].iloc[0])
-                hf = float(hrv_freq_df["HRV_HF"].iloc[0])
-                lf_hf = lf / hf if hf > 0 else float("nan")
-            except Exception as e:
-                print(f"  [DEBUG] hrv_frequency failed: {e}")  
-                lf = float("nan")
-                hf = float("nan")
-                lf_hf = float("nan")
-                self._hrv_freq = None
-
-            # Nonlinear domain 
-            try: 
-                hrv_nonlinear_df = nk.hrv_nonlinear(peaks, sampling_rate=self.sampling_rate, show=False)
-                self._hrv_nonlinear = hrv_nonlinear_df.iloc[0].to_dict()
-                sd1 = float(hrv_nonlinear_df["HRV_SD1"].iloc[0])
-                sd2 = float(hrv_nonlinear_df["HRV_SD2"].iloc[0])
-            except Exception as e:
-                print(f"  [DEBUG] hrv_nonlinear failed: {e}") 
-                sd1 = float("nan")
-                sd2 = float("nan")
-                self._hrv_nonlinear = None
+            if self.extended:
+                # Frequency domain 
+                try: 
+                    hrv_freq_df = nk.hrv_frequency(peaks, sampling_rate=self.sampling_rate, show=False)
+                    self._hrv_freq = hrv_freq_df.iloc[0].to_dict()
+                    vlf = float(hrv_freq_df["HRV_VLF"].iloc[0])
+                    lf = float(hrv_freq_df["HRV_LF"].iloc[0])
+                    hf = float(hrv_freq_df["HRV_HF"].iloc[0])
+                    lf_hf = lf / hf if hf > 0 else float("nan")
+                except Exception as e:
+                    print(f"  [DEBUG] hrv_frequency failed: {e}")  
+                    vlf = float("nan")
+                    lf = float("nan")
+                    hf = float("nan")
+                    lf_hf = float("nan")
+                    self._hrv_freq = None
+
+                # Nonlinear domain 
+                try: 
+                    hrv_nonlinear_df = nk.hrv_nonlinear(peaks, sampling_rate=self.sampling_rate, show=False)
+                    self._hrv_nonlinear = hrv_nonlinear_df.iloc[0].to_dict()
+                    sd1 = float(hrv_nonlinear_df["HRV_SD1"].iloc[0])
+                    sd2 = float(hrv_nonlinear_df["HRV_SD2"].iloc[0])
+                except Exception as e:
+                    print(f"  [DEBUG] hrv_nonlinear failed: {e}") 
+                    sd1 = float("nan")
+                    sd2 = float("nan")
+                    self._hrv_nonlinear = None
+            else:
+                vlf = lf = hf = lf_hf = sd1 = sd2 = float("nan")
 
             # store RRI
             self._rri_ms = np.diff(peaks["PPG_Peaks"]) / self.sampling_rate * 1000 
+            self.rri_count = len(self._rri_ms)
+
+            self._emit_new_beats(np.asarray(peak_loss), len(window))
             
             self.hrv_computed.emit({
                 "rmssd":   rmssd,
                 "sdnn":    sdnn,
                 "mean_rr": mean_rr,
                 "pnn50":   pnn50,
+                "vlf":     vlf,
                 "lf":      lf,
                 "hf":      hf,
                 "lf_hf":   lf_hf,
@@ -245,19 +397,44 @@ class HRVProcessor(QObject):
             self.hrv_error.emit(f"Error processing data: {str(e)}")
             return
     
-    # Open windows for RRI, Poincare, and PSD
+    def _emit_new_beats(self, peaks, window_len):
+        """Publishes peaks not reported by a previous (overlapping) window."""
+        offset = self.samples_seen - window_len
+        abs_peaks = peaks + offset
+        # Peaks at the very edge of the window may still move; wait for the next window
+        settled = abs_peaks < self.samples_seen - int(0.25 * self.sampling_rate)
+        # Overlapping windows re-detect old beats, possibly shifted by a sample or two
+        refractory = int(0.3 * self.sampling_rate)
+        new = abs_peaks[settled & (abs_peaks > self._last_beat + refractory)]
+        if len(new) and offset >= 0:
+            first = self._last_beat < 0
+            self.beats_detected.emit(new / self.sampling_rate)
+            # Missed beats or a dropout give intervals no heart can produce
+            rri, accepted, self._last_beat, self._last_rr = rr_intervals(
+                new, self.sampling_rate, self._last_beat, self._last_rr, self.rr_min_ms, self.rr_max_ms, self.rr_max_rel)
+            rri = np.where(accepted, rri, np.nan)
+            if first:
+                rri = np.concatenate([[np.nan], rri]) # No interval ends at the first beat
+            self.rri_detected.emit(new / self.sampling_rate, rri)
+
+    # Open windows for RRI, Poincare, and PSD (seeded with the latest window, then live)
     def open_rri_window(self, parent=None):
-        win = RRIntervalWindow(self._rri_ms, parent)
-        win.show()
-        return win
+        return self._open_live_window(RRIntervalWindow(self._rri_ms, parent))
     
     def open_poincare_window(self, parent=None):
-        win = PoincarePlotWindow(self._rri_ms, self._hrv_nonlinear, parent)
-        win.show()
-        return win
+        return self._open_live_window(PoincarePlotWindow(self._rri_ms, self._hrv_nonlinear, parent))
     
     def open_psd_window(self, parent=None):
-        win = PSDWindow(self._hrv_freq, parent)
+        return self._open_live_window(PSDWindow(self._hrv_freq, parent))
+
+    def connect_live_window(self, win):
+        """Subscribes a LiveHRVWindow to this processor's beat and HRV stream."""
+        self.rri_detected.connect(win.append_rri)
+        self.hrv_computed.connect(win.update_metrics)
+        return win
+
+    def _open_live_window(self, win):
+        self.connect_live_window(win)
         win.show()
         return win
 
@@ -265,6 +442,11 @@ class HRVProcessor(QObject):
         self.sampling_rate = rate
         self.window_size = int(self.window_second * rate)
         self.buffer = []
+        self.samples_seen = 0
+        self._computed_at = None
+        self._last_beat = -1
+        self._last_rr = 0.0
+        self.quality.set_sampling_rate(rate)
 
     def set_window_seconds(self, seconds):
         self.window_second = seconds
@@ -0,0 +1,161 @@
+import csv
+import time
+import bisect
+import threading
+import numpy as np
+
+# --- PIPELINE LATENCY INSTRUMENTATION ---
+# Stages timed per packet or per processing tick (all in ms, perf_counter based):
+#   ingest     - line read from the device -> packet handed to the worker
+#   parse      - decode + _parse_telemetry of one line
+#   queue      - packet waiting in the worker until the next processing tick
+#   eda/ppg/hrv - processor time per tick
+#   render     - one RenderScheduler redraw
+#   end_to_end - oldest undrawn line read -> its frame drawn
+STAGES = ("ingest", "parse", "queue", "eda", "ppg", "hrv", "render", "end_to_end")
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram with log-spaced bins (20 per decade,
+    1 us - 100 s): recording is a binary search with no allocation, and a
+    percentile is reported as its bin's upper edge (within ~12%).
+    """
+    EDGES = np.logspace(-3, 5, 161) # ms
+    _EDGES_LIST = EDGES.tolist()
+
+    def __init__(self):
+        self.counts = np.zeros(len(self.EDGES) + 1, dtype=np.int64)
+        self.reset()
+
+    def reset(self):
+        self.counts[:] = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.items = 0          # Work items (samples/packets) covered by the records
+        self.first = None       # perf_counter of the first record, for throughput
+        self.last = None
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, ms, items=1, now=None):
+        """Records one latency (or an array of them)."""
+        if isinstance(ms, (float, int)):
+            # Per-packet fast path: no numpy dispatch
+            self.counts[bisect.bisect_left(self._EDGES_LIST, ms)] += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+        else:
+            ms = np.asarray(ms, dtype=np.float64).ravel()
+            if len(ms) == 0:
+                return
+            np.add.at(self.counts, np.searchsorted(self.EDGES, ms), 1)
+            self.total_ms += float(ms.sum())
+            self.max_ms = max(self.max_ms, float(ms.max()))
+        now = time.perf_counter() if now is None else now
+        self.items += items
+        if self.first is None:
+            self.first = now
+        self.last = now
+
+    def percentile(self, q):
+        """Upper edge of the bin holding the q-th percentile (ms); NaN when empty."""
+        cum = np.cumsum(self.counts)
+        if cum[-1] == 0:
+            return float("nan")
+        i = int(np.searchsorted(cum, q / 100.0 * cum[-1]))
+        return float(self.EDGES[min(i, len(self.EDGES) - 1)])
+
+    def summary(self):
+        n = self.count
+        span = (self.last - self.first) if n > 1 else 0.0
+        return {"count": n,
+                "mean_ms": self.total_ms / n if n else float("nan"),
+                "p50_ms": self.percentile(50),
+                "p95_ms": self.percentile(95),
+                "p99_ms": self.percentile(99),
+                "max_ms": self.max_ms if n else float("nan"),
+                "per_s": self.items / span if span > 0 else float("nan")}
+
+class LatencyMonitor:
+    """
+    One histogram per pipeline stage. Stages are recorded from the thread
+    that runs them (worker, GUI); a lock keeps snapshots consistent.
+    """
+    def __init__(self, stages=STAGES):
+        self.stages = tuple(stages)
+        self._hist = {stage: LatencyHistogram() for stage in self.stages}
+        self._lock = threading.Lock()
+
+    def record(self, stage, ms, items=1):
+        with self._lock:
+            self._hist[stage].add(ms, items)
+
+    def reset(self):
+        with self._lock:
+            for hist in self._hist.values():
+                hist.reset()
+
+    def snapshot(self):
+        """{stage: summary dict} for all stages."""
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in self._hist.items()}
+
+    def format_table(self):
+        """Fixed-width text table for the on-screen HUD."""
+        rows = [f"{'stage':<11}{'p50':>8}{'p95':>8}{'p99':>8}{'/s':>8}"]
+        for stage, s in self.snapshot().items():
+            if s["count"] == 0:
+                rows.append(f"{stage:<11}{'--':>8}{'--':>8}{'--':>8}{'--':>8}")
+                continue
+            rows.append(f"{stage:<11}{s['p50_ms']:>8.2f}{s['p95_ms']:>8.2f}{s['p99_ms']:>8.2f}{s['per_s']:>8.0f}")
+        return "\n".join(rows)
+
+    def to_csv(self, path):
+        """Writes one summary row per stage (latencies in ms, throughput in items/s)."""
+        snapshot = self.snapshot()
+        fields = ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "per_s"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage"] + fields)
+            for stage, s in snapshot.items():
+                writer.writerow([stage] + [s[key] for key in fields])
+
+
+#Test output
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    monitor = LatencyMonitor()
+    samples = rng.lognormal(mean=np.log(2.0), sigma=0.5, size=20000) # ms
+    for chunk in np.array_split(samples, 200):
+        monitor.record("eda", chunk, items=len(chunk))
+    monitor.record("render", 3.0)
+    snap = monitor.snapshot()
+    for q in (50, 95, 99):
+        exact = np.percentile(samples, q)
+        assert abs(snap["eda"][f"p{q}_ms"] / exact - 1) < 0.13, (q, snap["eda"][f"p{q}_ms"], exact)
+    assert snap["eda"]["count"] == 20000 and snap["render"]["count"] == 1
+    assert snap["parse"]["count"] == 0 and np.isnan(snap["parse"]["p50_ms"])
+
+    # Recording cost (must be cheap enough to leave on)
+    hist = LatencyHistogram()
+    start = time.perf_counter()
+    for v in samples[:10000].tolist():
+        hist.add(v)
+    per_record_us = (time.perf_counter() - start) / 10000 * 1e6
+    print(f"Record: {per_record_us:.2f} us")
+    print(monitor.format_table())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "latency.csv")
+        monitor.to_csv(path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert lines[0].startswith("stage,count") and len(lines) == len(STAGES) + 1
+    monitor.reset()
+    assert monitor.snapshot()["eda"]["count"] == 0
+    print("All checks passed!")
@@ -1,18 +1,35 @@
+import time
+_T_START = time.perf_counter() # Startup profile origin, before the heavy imports
+
 from database import SubjectDataDialog, SubjectSelectionDialog
 from hardwareDiagnostics import HardwareDiagnosticsDialog
 from activity import ActivityProfileDialog
 from colorConstraints import *
 from rawdata import HardwareIngestionThread, SensorPacket, get_available_ports
 from simdata import SimulationIngestionThread
-from eda_process import EDAProcessor
-from ppg import PPGProcessor
-from hrv import HRVProcessor
-
+from events import EventAnalyzer
+from hrv import RRIntervalWindow, PoincarePlotWindow, PSDWindow
+from eda_inspector import EDAInspectorWindow
+from dashboard import GroupDashboard
+from worker import ProcessingWorker, start_worker_thread
+from plotdata import StripBuffer, MinMaxDecimator, HistoryPyramid, RollingMinMax, AxisRange
+from render import RenderScheduler, USE_OPENGL
+from markers import MarkerLayer
+from stackplot import StackedChannelPlot
+from streams import CHANNEL_FIELDS
+from procmetrics import MetricsCollector, register_thread, format_metrics_tooltip
+from recorder import ChunkedRecorder
+from chunkstore import ChunkFormatError, is_session, recover
+from sessionview import open_session
+from startup import StartupProfile
+from backpressure import BackpressurePolicy, LEVELS
+
+import os
 import sys
 import datetime
+import tempfile
 import random
 import numpy as np
-import psutil
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                QHBoxLayout, QLabel, QPushButton, QLineEdit, 
                                QGroupBox, QFrame, QStatusBar, QMenuBar, QMenu, 
@@ -24,6 +41,9 @@ from PySide6.QtGui import QAction, QFont, QIcon, QColor, QPalette
 
 import pyqtgraph as pg
 
+# Each recording is written to its own directory in here
+SESSION_DIR = "sessions"
+
 # --- CUSTOM MODAL DIALOGS ---
 class StyledDialog(QDialog):
     def __init__(self, title, parent=None):
@@ -131,9 +151,9 @@ class ExitDialog(StyledDialog):
         self.accept()
 
 class HardwareConfigDialog(StyledDialog):
-    def __init__(self, current_rate, eda_win, ppg_win, hrv_win, parent=None):
+    def __init__(self, current_rate, eda_win, ppg_win, hrv_win, channel_rates=None, view_win=15, parent=None):
         super().__init__("Hardware Configuration", parent)
-        self.setFixedSize(400, 350)
+        self.setFixedSize(400, 490)
         
         # Header
         header = QLabel("Acquisition Settings")
@@ -174,11 +194,34 @@ class HardwareConfigDialog(StyledDialog):
             self.combo_hrv.addItem(f"{w} s", w)
         idx = self.combo_hrv.findData(hrv_win)
         if idx >= 0: self.combo_hrv.setCurrentIndex(idx)
+
+        self.combo_view = QComboBox()
+        self.combo_view.setToolTip("Time span shown by the live plots (long spans are decimated for drawing)")
+        for w in [15, 30, 60, 120, 300]:
+            self.combo_view.addItem(f"{w} s", w)
+        idx = self.combo_view.findData(int(view_win))
+        if idx >= 0: self.combo_view.setCurrentIndex(idx)
             
+        # Per-channel native rates (firmware may send a section only every Nth frame)
+        self.combo_channels = {}
+        for name in ("eda", "cardiac", "imu"):
+            combo = QComboBox()
+            combo.setToolTip("Native rate of this channel's section in the telemetry stream")
+            combo.addItem("Same as sampling rate", None)
+            for r in rates:
+                combo.addItem(f"{r} Hz", r)
+            idx = combo.findData((channel_rates or {}).get(name))
+            if idx >= 0: combo.setCurrentIndex(idx)
+            self.combo_channels[name] = combo
+
         form.addRow("Sampling Rate:", self.combo_rate)
+        form.addRow("EDA Channel Rate:", self.combo_channels["eda"])
+        form.addRow("PPG Channel Rate:", self.combo_channels["cardiac"])
+        form.addRow("IMU Channel Rate:", self.combo_channels["imu"])
         form.addRow("EDA Window:", self.combo_eda)
         form.addRow("PPG Window:", self.combo_ppg)
         form.addRow("HRV Window:", self.combo_hrv)
+        form.addRow("Live View Window:", self.combo_view)
         grp.setLayout(form)
         self.layout_main.addWidget(grp)
         
@@ -203,6 +246,13 @@ class HardwareConfigDialog(StyledDialog):
     def get_windows(self):
         return self.combo_eda.currentData(), self.combo_ppg.currentData(), self.combo_hrv.currentData()
 
+    def get_view_window(self):
+        return self.combo_view.currentData()
+
+    def get_channel_rates(self):
+        """Returns {channel: rate or None (= sampling rate)}"""
+        return {name: combo.currentData() for name, combo in self.combo_channels.items()}
+
 class RibbonButton(QToolButton):
     def __init__(self, text, icon_std_key, parent=None):
         super().__init__(parent)
@@ -233,7 +283,8 @@ class RibbonButton(QToolButton):
 
 # --- GRAPH WIDGET ---
 class BioSignalPlot(QWidget):
-    def __init__(self, title, left_label, left_unit, right_label=None, right_unit=None):
+    def __init__(self, title, left_label, left_unit, right_label=None, right_unit=None, window_seconds=15.0,
+                 history_dir=None):
         super().__init__()
         self.main_layout = QVBoxLayout(self) # type: ignore
         self.main_layout.setContentsMargins(0, 0, 0, 0) # type: ignore
@@ -241,9 +292,11 @@ class BioSignalPlot(QWidget):
         # Configuration
         pg.setConfigOption('background', 'w')
         pg.setConfigOption('foreground', 'k')
-        pg.setConfigOptions(antialias=True)
+        # Antialiasing is switched per curve by the RenderScheduler
 
         self.plot_widget = pg.PlotWidget(title=title)
+        if USE_OPENGL:
+            self.plot_widget.useOpenGL(True)
         self.plot_widget.showGrid(x=True, y=True, alpha=0.3)
         self.plot_widget.plotItem.setMouseEnabled(x=True, y=False)
         self.legend = self.plot_widget.addLegend(offset=(10, 10))
@@ -254,10 +307,43 @@ class BioSignalPlot(QWidget):
         self.main_layout.addWidget(self.plot_widget)
         
         # Data Containers (Strip Chart Logic)
-        self.buffer_size = 300
-        self.fs = 20.0 # Hz
-        # X-Data will hold actual timestamps (simulated)
-        self.x_data = np.array([])
+        self.window_seconds = window_seconds # Visible time span
+        self.fs = 20.0 # Hz (frame rate; no channel is sampled faster)
+        self.buffer_size = int(window_seconds * self.fs)
+        # Each curve keeps its own timestamps (session seconds), since the two
+        # traces may come from channels sampled at different rates.
+        # Preallocated rings; x1/data1 etc. are the raw samples in the window.
+        self.buf1 = StripBuffer(self.buffer_size)
+        self.buf2 = StripBuffer(self.buffer_size)
+        self.x1 = np.array([])
+        self.x2 = np.array([])
+        # Long windows are reduced to ~2 points per pixel before setData
+        self.dec1 = MinMaxDecimator()
+        self.dec2 = MinMaxDecimator()
+        self.bin_pixels = 1 # Pixels per decimation bin; raised by the backpressure policy
+        # Set by push_data_batch, cleared by render()
+        self.dirty1 = False
+        self.dirty2 = False
+        # Whole-session history for scrollback/zoom (memory-mapped under history_dir)
+        self.hist1 = HistoryPyramid(history_dir, f"plot{id(self)}_1")
+        self.hist2 = HistoryPyramid(history_dir, f"plot{id(self)}_2")
+        self._live_hist = (self.hist1, self.hist2)
+        # (start, end) while a recorded session is shown instead (show_session)
+        self.session_span = None
+        # The x range follows the newest sample until the user pans
+        self.follow = True
+        # Y ranges are set explicitly from rolling window min/max, so pyqtgraph
+        # never rescans whole curves for auto-ranging
+        self.mm1 = RollingMinMax()
+        self.mm2 = RollingMinMax()
+        self.yrange1 = AxisRange()
+        self.yrange2 = AxisRange()
+        self.plot_widget.plotItem.vb.disableAutoRange()
+        self.plot_widget.plotItem.vb.sigRangeChangedManually.connect(self._on_manual_range)
+        self.plot_widget.plotItem.vb.sigXRangeChanged.connect(self._on_x_range_changed)
+        # All event markers live in one batched item
+        self.markers = MarkerLayer(text_color=COLOR_TEXT)
+        self.plot_widget.addItem(self.markers, ignoreBounds=True)
         
         self.dual_axis = right_label is not None
         
@@ -274,7 +360,7 @@ class BioSignalPlot(QWidget):
             name1 = left_label
 
         self.data1 = np.array([])
-        self.curve1 = self.plot_widget.plot(self.x_data, self.data1, pen=pg.mkPen(c1, width=2), name=name1)
+        self.curve1 = self.plot_widget.plot(self.x1, self.data1, pen=pg.mkPen(c1, width=2), name=name1, connect="finite")
 
         # --- RIGHT AXIS (Secondary) or SAME AXIS ---
         if self.dual_axis:
@@ -282,6 +368,7 @@ class BioSignalPlot(QWidget):
             self.plot_item = self.plot_widget.plotItem
             self.vb2 = pg.ViewBox()
             self.vb2.setMouseEnabled(x=True, y=False)
+            self.vb2.disableAutoRange()
             self.plot_item.showAxis('right')
             self.plot_item.scene().addItem(self.vb2)
             self.plot_item.getAxis('right').linkToView(self.vb2)
@@ -292,7 +379,7 @@ class BioSignalPlot(QWidget):
             # HR is Red
             c2 = COLOR_HR if "Heart" in right_label else COLOR_RECORD
             
-            self.curve2 = pg.PlotCurveItem(self.x_data, self.data2, pen=pg.mkPen(c2, width=2, style=Qt.DashLine), name=right_label)
+            self.curve2 = pg.PlotCurveItem(self.x2, self.data2, pen=pg.mkPen(c2, width=2, style=Qt.DashLine), name=right_label, connect="finite")
             self.vb2.addItem(self.curve2)
             
             # Add to legend manually since it's on a different viewbox
@@ -304,97 +391,211 @@ class BioSignalPlot(QWidget):
             self.data2 = np.array([])
             # Tonic is Gold
             c2 = COLOR_TONIC
-            self.curve2 = self.plot_widget.plot(self.x_data, self.data2, pen=pg.mkPen(c2, width=2), name="Tonic Level")
+            self.curve2 = self.plot_widget.plot(self.x2, self.data2, pen=pg.mkPen(c2, width=2), name="Tonic Level", connect="finite")
 
     def update_views(self):
         if self.dual_axis:
             self.vb2.setGeometry(self.plot_item.vb.sceneBoundingRect())
             self.vb2.linkedViewChanged(self.plot_item.vb, self.vb2.XAxis)
 
+    def _on_manual_range(self, mask):
+        if mask[0]:
+            self.follow = False
+
+    def _on_x_range_changed(self, vb, x_range):
+        # Panned/zoomed away from the live edge: draw from the session history
+        if self.follow:
+            return
+        n_bins = self._pixel_bins()
+        bounds = []
+        for curve, hist in ((self.curve1, self.hist1), (self.curve2, self.hist2)):
+            x, y, _ = hist.query(x_range[0], x_range[1], n_bins)
+            curve.setData(x, y)
+            # Queries are bounded to a few points per pixel, so a scan is cheap here
+            finite = y[np.isfinite(y)]
+            bounds.append((float(finite.min()), float(finite.max())) if len(finite) else None)
+        self._apply_y_ranges(*bounds)
+
+    def _apply_y_ranges(self, bounds1, bounds2):
+        """Sets the y range(s) from (min, max) data bounds; axes only move when the hysteresis says so."""
+        if self.dual_axis:
+            targets = ((self.plot_widget.plotItem.vb, self.yrange1, bounds1), (self.vb2, self.yrange2, bounds2))
+        else:
+            both = [b for b in (bounds1, bounds2) if b is not None]
+            merged = (min(b[0] for b in both), max(b[1] for b in both)) if both else None
+            targets = ((self.plot_widget.plotItem.vb, self.yrange1, merged),)
+        for vb, axis_range, bounds in targets:
+            if bounds is None:
+                continue
+            new_range = axis_range.update(*bounds)
+            if new_range is not None:
+                vb.setYRange(*new_range, padding=0)
+
+    def _pixel_bins(self):
+        return max(100, int(self.plot_widget.plotItem.vb.width()) // self.bin_pixels)
+
+    def set_bin_pixels(self, pixels):
+        self.bin_pixels = pixels
+        self.mark_dirty()
+
+    def set_sampling_rate(self, fs):
+        self.fs = float(fs)
+        self.buffer_size = int(self.window_seconds * self.fs)
+        self.buf1 = StripBuffer(self.buffer_size)
+        self.buf2 = StripBuffer(self.buffer_size)
+        self.dec1.width = None
+        self.dec2.width = None
+        self.mm1.clear()
+        self.mm2.clear()
+
+    def set_window_seconds(self, seconds):
+        """Changes the visible time span; the samples already in the new window are kept."""
+        self.window_seconds = float(seconds)
+        self.buffer_size = int(self.window_seconds * self.fs)
+        for name, mm in (("buf1", self.mm1), ("buf2", self.mm2)):
+            buf = StripBuffer(self.buffer_size)
+            buf.append(*getattr(self, name).window(self.window_seconds))
+            setattr(self, name, buf)
+            mm.clear()
+            mm.append(*buf.window(self.window_seconds))
+        self.dec1.width = None
+        self.dec2.width = None
+        self.yrange1.clear()
+        self.yrange2.clear()
+        self.mark_dirty()
+
+    def show_session(self, hist1, hist2, start, end):
+        """
+        Shows a recorded session instead of live data: the curves are drawn
+        from `hist1`/`hist2` (history sources like sessionview.SessionCurve)
+        for whatever range is on screen, starting with the last
+        `window_seconds` before `end`. "A" shows the whole session; live
+        data arriving later replaces it.
+        """
+        self.reset_data()
+        self.hist1, self.hist2 = hist1, hist2
+        self.session_span = (start, end)
+        self.follow = False
+        self.plot_widget.setXRange(max(start, end - self.window_seconds), end, padding=0)
+        self.mark_dirty()
+
     def reset_data(self):
-        self.x_data = np.array([])
+        self.hist1, self.hist2 = self._live_hist
+        self.session_span = None
+        self.buf1.clear()
+        self.buf2.clear()
+        self.hist1.clear()
+        self.hist2.clear()
+        self.dec1.width = None
+        self.dec2.width = None
+        self.mm1.clear()
+        self.mm2.clear()
+        self.yrange1.clear()
+        self.yrange2.clear()
+        self.dirty1 = self.dirty2 = False
+        self.follow = True
+        self.x1 = np.array([])
+        self.x2 = np.array([])
         self.data1 = np.array([])
         self.data2 = np.array([])
-        self.curve1.setData(self.x_data, self.data1)
-        self.curve2.setData(self.x_data, self.data2)
-        # Clear lines
-        for item in self.plot_widget.items():
-            if isinstance(item, pg.InfiniteLine):
-                self.plot_widget.removeItem(item)
+        self.curve1.setData(self.x1, self.data1)
+        self.curve2.setData(self.x2, self.data2)
+        self.markers.clear()
 
-    def add_marker(self, text, color_hex):
-        """Adds a marker at the current latest timestamp (right side)"""
-        if len(self.x_data) > 0:
-            current_time = self.x_data[-1]
-        else:
-            current_time = 0.0
-        c = QColor(color_hex)
-        
-        # InfiniteLine at current_time. 
-        # Since we use real coordinates for X, the line will stay at this X value
-        # while the View moves or data updates.
-        line = pg.InfiniteLine(pos=current_time, angle=90, pen=pg.mkPen(c, width=2, style=Qt.DashDotLine), 
-                               label=text, labelOpts={'color': COLOR_TEXT, 'position': 0.8, 'fill': (255,255,255,200)})
-        
-        self.plot_widget.addItem(line)
-        return line
+    def latest_time(self):
+        """Newest timestamp shown on either curve (0.0 when empty)."""
+        ends = [t for t in (self.buf1.latest_time(), self.buf2.latest_time()) if t is not None]
+        return max(ends) if ends else 0.0
 
-    def remove_marker(self, line_obj):
-        self.plot_widget.removeItem(line_obj)
-
-    def push_data(self, val1, val2):
-        """Updates the plot with new real data points"""
-        # Shift Time Window
-        dt = 1.0 / self.fs
-        
-        if len(self.x_data) > 0:
-            new_time = self.x_data[-1] + dt
+    def add_marker(self, text, color_hex):
+        """Adds a marker at the current latest timestamp (right side); returns its id"""
+        # Markers sit at a data x value, so they stay put while the view moves
+        return self.markers.add(self.latest_time(), text, color_hex)
+
+    def remove_marker(self, marker_id):
+        self.markers.remove(marker_id)
+
+    def push_data(self, t, val1, val2):
+        """Updates the plot with one new sample on both curves"""
+        self.push_data_batch([t], [val1], [t], [val2])
+
+    def push_data_batch(self, t1, val1_list, t2=None, val2_list=None):
+        """
+        Adds a batch of new data points; they are drawn on the next render().
+        Each curve takes its own timestamps (session seconds); NaN values
+        are drawn as gaps. Either curve may be omitted.
+        """
+        if self.session_span is not None:
+            self.reset_data() # Back to live from a recorded session
+        if val1_list is not None and len(val1_list) > 0:
+            self._push_curve(self.buf1, self.dec1, self.hist1, self.mm1, t1, val1_list)
+            self.dirty1 = True
+        if val2_list is not None and len(val2_list) > 0:
+            self._push_curve(self.buf2, self.dec2, self.hist2, self.mm2, t2, val2_list)
+            self.dirty2 = True
+        # Expired here rather than in render(), which a hidden or panned-back
+        # plot skips: the deques stay bounded by the window either way
+        start = self.latest_time() - self.window_seconds
+        self.mm1.expire(start)
+        self.mm2.expire(start)
+
+    @staticmethod
+    def _push_curve(buf, dec, hist, mm, t, values):
+        hist.append(t, values)
+        buf.append(t, values)
+        mm.append(t, values)
+        if dec.width is not None:
+            dec.append(t, values) # Only the open and new bins change
+
+    def mark_dirty(self):
+        self.dirty1 = self.dirty2 = True
+
+    def curves(self):
+        return (self.curve1, self.curve2)
+
+    def render(self):
+        """Redraws the curves that changed since the last render. Returns True if anything was drawn."""
+        vb = self.plot_widget.plotItem.vb
+        if vb.autoRangeEnabled()[0]:
+            # "A" button pressed: resume following instead of fitting all data
+            # (a recorded session is shown whole)
+            vb.disableAutoRange()
+            self.yrange1.clear()
+            self.yrange2.clear()
+            if self.session_span is not None:
+                vb.setXRange(*self.session_span, padding=0)
+            else:
+                self.follow = True
+            self.mark_dirty()
+        if not (self.dirty1 or self.dirty2):
+            return False
+        window = self.window_seconds
+        if self.dirty1:
+            self.x1, self.data1 = self._draw_curve(self.curve1, self.buf1, self.dec1, window)
+        if self.dirty2:
+            self.x2, self.data2 = self._draw_curve(self.curve2, self.buf2, self.dec2, window)
+        self.dirty1 = self.dirty2 = False
+        if self.follow:
+            end = self.latest_time()
+            vb.setXRange(end - window, end, padding=0)
+            self._apply_y_ranges(self.mm1.bounds(), self.mm2.bounds())
         else:
-            new_time = 0.0
-        
-        self.x_data = np.append(self.x_data, new_time)
-        self.data1 = np.append(self.data1, val1)
-        self.data2 = np.append(self.data2, val2)
-        
-        if len(self.x_data) > self.buffer_size:
-            self.x_data = self.x_data[-self.buffer_size:]
-            self.data1 = self.data1[-self.buffer_size:]
-            self.data2 = self.data2[-self.buffer_size:]
-        
-        # Update Curves
-        self.curve1.setData(self.x_data, self.data1)
-        self.curve2.setData(self.x_data, self.data2)
+            self._on_x_range_changed(vb, vb.viewRange()[0])
+        return True
 
-    def push_data_batch(self, val1_list, val2_list):
-        """Updates the plot with a batch of new data points"""
-        n = len(val1_list)
-        if n == 0: return
-        
-        # Shift Time Window
-        dt = 1.0 / self.fs
-        
-        # Generate new time points extending from the last known time
-        if len(self.x_data) > 0:
-            last_time = self.x_data[-1]
-        else:
-            last_time = -dt # So first point starts at 0
-            
-        new_times = last_time + np.arange(1, n + 1) * dt
-        
-        # Append
-        self.x_data = np.concatenate([self.x_data, new_times])
-        self.data1 = np.concatenate([self.data1, val1_list])
-        self.data2 = np.concatenate([self.data2, val2_list])
-        
-        # Slice if needed
-        if len(self.x_data) > self.buffer_size:
-            self.x_data = self.x_data[-self.buffer_size:]
-            self.data1 = self.data1[-self.buffer_size:]
-            self.data2 = self.data2[-self.buffer_size:]
-        
-        # Update Curves
-        self.curve1.setData(self.x_data, self.data1)
-        self.curve2.setData(self.x_data, self.data2)
+    def _draw_curve(self, curve, buf, dec, window):
+        x, y = buf.window(window)
+        if self.follow:
+            n_bins = self._pixel_bins()
+            width = window / n_bins
+            if len(x) > 2 * n_bins:
+                if dec.width != width:
+                    dec.rebuild(x, y, width, n_bins) # First use or plot resized
+                curve.setData(*dec.points(x[0]))
+            else:
+                dec.width = None
+                curve.setData(x, y)
+        return x, y
 
 # --- MAIN WINDOW ---
 class MainWindow(QMainWindow):
@@ -406,24 +607,52 @@ class MainWindow(QMainWindow):
         # State
         self.device_connected = False
         self.ingestion_thread = None
+        self._submitted_at_connect = 0
         self.last_hardware_error = None
         self.is_recording = False
+        self.recorder = None
+        self.recorded_session = None # Session opened for review (sessionview.RecordedSession)
+        self.overview_builder = None # Its background min/max summaries
         self.is_paused = True
-        self.active_flags = [] # Stores dicts of {timestamp, line_obj, list_item}
-        self.sampling_rate = 20 # Default
+        self.active_flags = [] # Stores dicts of {marker_main, marker_sub, item, event_id}
+        self.sampling_rate = 20 # Default (frame rate)
+        # Per-channel rate overrides; None = one sample per frame
+        self.channel_rates = {"eda": None, "cardiac": None, "imu": None}
+        # Plot history (scrollback) is spilled to memory-mapped files here, removed on exit
+        self.history_dir = tempfile.TemporaryDirectory(prefix="eda_history_")
         
         # --- DATA PROCESSORS ---
-        self.eda_processor = EDAProcessor(self, sampling_rate=self.sampling_rate)
-        self.ppg_processor = PPGProcessor(self, sampling_rate=self.sampling_rate)
-        self.hrv_processor = HRVProcessor(sampling_rate=self.sampling_rate, window_second=30, parent=self)
+        # Frames are split into independent channel streams; each processor
+        # runs at its own channel's native rate. All of it lives in the
+        # processing thread, which publishes one display-ready frame every 33 ms
+        # (~30 FPS). The processors are referenced here for read-only access;
+        # changes go through the worker's methods.
+        self.worker = ProcessingWorker(self.sampling_rate, self.get_channel_rates(), interval_ms=33)
+        self.stream_router = self.worker.router
+        self.eda_processor = self.worker.eda_processor
+        self.ppg_processor = self.worker.ppg_processor
+        self.hrv_processor = self.worker.hrv_processor
+        self.event_analyzer = self.worker.event_analyzer
+        self.worker.frame_ready.connect(self.on_frame_ready)
         self.hrv_processor.hrv_computed.connect(self.on_hrv_update)
-        self._hrv_windows = []
-        
-        # Data Buffer for UI Throttling
-        self.packet_buffer = []
-        self.ui_update_timer = QTimer(self)
-        self.ui_update_timer.timeout.connect(self.update_ui_from_buffer)
-        self.ui_update_timer.start(33) # ~30 FPS
+        self.hrv_processor.quality.quality_updated.connect(self.on_quality_update)
+        self.event_analyzer.event_analyzed.connect(self.on_event_analyzed)
+        # Live RRI / Poincare / PSD windows: built once, fed from session start, shown on demand
+        self.rri_window = self.hrv_processor.connect_live_window(RRIntervalWindow())
+        self.poincare_window = self.hrv_processor.connect_live_window(PoincarePlotWindow())
+        self.psd_window = self.hrv_processor.connect_live_window(PSDWindow())
+        self._hrv_windows = [self.rri_window, self.poincare_window, self.psd_window]
+        self.eda_inspector = None # Built on first use
+        self._next_event_id = 0
+        # Frame-time / lag metrics (ms, smoothed), shown in the status bar
+        self.frame_stats = {"processing_ms": 0.0, "lag_ms": 0.0, "queue_ms": 0.0}
+        self.processing_thread = start_worker_thread(self.worker, self)
+        # Process resource usage, sampled off the GUI thread and shown in the status bar
+        register_thread("gui")
+        self.metrics = MetricsCollector(probes={"queue_depth": self._ingest_queue_depth,
+                                                "dropped": lambda: self.stream_router.stats.frames_lost}, parent=self)
+        self.metrics.snapshot_ready.connect(self.on_metrics_snapshot)
+        self.metrics.start()
         
         # Connection Timeout Timer
         self.conn_timer = QTimer(self)
@@ -436,8 +665,17 @@ class MainWindow(QMainWindow):
         self.timer_elapsed.timeout.connect(self.update_elapsed_time)
 
 
+        # Plots are only redrawn when dirty and visible, at an adaptive rate
+        self.render_scheduler = RenderScheduler([], self._plots_visible, latency=self.worker.latency, parent=self)
+        # Trades display rate, plot detail and HRV extras for keeping up; recording is never thinned
+        self.backpressure = BackpressurePolicy(parent=self)
+        self.backpressure.level_changed.connect(self.on_backpressure_changed)
+
         QApplication.instance().setStyleSheet(ResearchStyleSheet.get_stylesheet())
         self.setup_ui()
+        self.render_scheduler.add_plot(self.graph_main)
+        self.render_scheduler.add_plot(self.graph_sub)
+        self.render_scheduler.add_plot(self.graph_imu)
 
     def setup_ui(self):
         self.create_menu_bar()
@@ -480,6 +718,14 @@ class MainWindow(QMainWindow):
         file_menu.addSeparator()
         file_menu.addAction("Exit", self.close)
         
+        view_menu = menubar.addMenu("View")
+        self.act_hud = view_menu.addAction("Pipeline Latency HUD")
+        self.act_hud.setCheckable(True)
+        self.act_hud.setShortcut("F12")
+        self.act_hud.toggled.connect(self.toggle_latency_hud)
+        view_menu.addAction("Export Latency Stats...", self.export_latency_csv)
+        view_menu.addAction("Export Process Metrics...", self.export_metrics_csv)
+
         help_menu = menubar.addMenu("Help")
         help_menu.addAction("Documentation")
         help_menu.addAction("About")
@@ -505,7 +751,8 @@ class MainWindow(QMainWindow):
         setup_page = create_page([
             ("Connect\nDevice", QStyle.SP_ComputerIcon, self.on_connect_request),
             ("Subject\nData", QStyle.SP_FileDialogInfoView, self.open_subject_data_dialog),
-            ("Hardware\nDiagnostics", pg.QtWidgets.QStyle.SP_DriveHDIcon, self.open_diagnostics)
+            ("Hardware\nDiagnostics", pg.QtWidgets.QStyle.SP_DriveHDIcon, self.open_diagnostics),
+            ("Group\nDashboard", QStyle.SP_FileDialogListView, self.open_group_dashboard)
         ])
         self.ribbon_tabs.addTab(setup_page, "Setup")
 
@@ -524,7 +771,7 @@ class MainWindow(QMainWindow):
             ("Run\ncvxEDA", QStyle.SP_MediaPlay, lambda: QMessageBox.information(self, "Info", "Optimization Started")),
             ("Filter\nConfig", QStyle.SP_FileDialogListView, None),
             ("HRV\nDashboard", QStyle.SP_FileDialogContentsView, lambda: QMessageBox.information(self, "HRV", "Opening HRV Dashboard...")),
-            ("NK2\nVerify", QStyle.SP_ComputerIcon, lambda: self.eda_processor.create_debug_plot())
+            ("NK2\nVerify", QStyle.SP_ComputerIcon, self.open_eda_inspector)
         ])
         self.ribbon_tabs.addTab(ana_page, "Analysis")
 
@@ -729,12 +976,22 @@ class MainWindow(QMainWindow):
         l_live = QVBoxLayout(p_live)
         
         # Top Graph: Dual Axis (EDA + HR)
-        self.graph_main = BioSignalPlot("Live Physiological Signals (EDA | HR)", "EDA", "µS", "Heart Rate", "BPM")
+        self.graph_main = BioSignalPlot("Live Physiological Signals (EDA | HR)", "EDA", "µS", "Heart Rate", "BPM",
+                                        history_dir=self.history_dir.name)
         l_live.addWidget(self.graph_main, 5)
         
-        # Bottom Graph: Decomposition
-        self.graph_sub = BioSignalPlot("Signal Decomposition (Phasic | Tonic)", "Phasic Driver", "µS")
-        l_live.addWidget(self.graph_sub, 3)
+        # Bottom Graph: Decomposition, or the raw IMU channels on a second tab
+        self.graph_sub = BioSignalPlot("Signal Decomposition (Phasic | Tonic)", "Phasic Driver", "µS",
+                                       history_dir=self.history_dir.name)
+        self.graph_imu = StackedChannelPlot("Motion (Raw IMU)", CHANNEL_FIELDS["imu"],
+                                            [("Accel", COLOR_ACCEL, [0, 1, 2]),
+                                             ("Gyro", COLOR_GYRO, [3, 4, 5]),
+                                             ("Orientation", COLOR_ORIENT, [6, 7, 8])],
+                                            fs=self.get_channel_rate("imu"))
+        self.tabs_sub = QTabWidget()
+        self.tabs_sub.addTab(self.graph_sub, "Decomposition")
+        self.tabs_sub.addTab(self.graph_imu, "Motion (IMU)")
+        l_live.addWidget(self.tabs_sub, 3)
         
         # Event Insertion Bar
         f_evt = QFrame()
@@ -761,6 +1018,22 @@ class MainWindow(QMainWindow):
         l_live.addWidget(f_evt)
         self.center_stack.addWidget(p_live)
 
+        # Page 2: Group Dashboard (one tile per subject, independent of the live session)
+        self.group_dashboard = GroupDashboard()
+        self.group_dashboard.start_requested.connect(self.on_group_start)
+        self.group_dashboard.stop_requested.connect(self.on_group_stop)
+        self.group_dashboard.close_requested.connect(self.on_group_close)
+        self.center_stack.addWidget(self.group_dashboard)
+
+        # Pipeline latency overlay (View > Pipeline Latency HUD); only refreshed while shown
+        self.hud = QLabel(self.graph_main)
+        self.hud.setFont(QFont(FONT_MONO, 9))
+        self.hud.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: white; padding: 6px; border-radius: 6px;")
+        self.hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hud.hide()
+        self.hud_timer = QTimer(self)
+        self.hud_timer.timeout.connect(self.update_latency_hud)
+
     def create_right_panel(self):
         self.panel_right = QWidget()
         self.panel_right.setFixedWidth(300)
@@ -786,6 +1059,8 @@ class MainWindow(QMainWindow):
         self.val_hr.setFont(QFont(FONT_MONO, 24, QFont.Weight.Bold)) # type: ignore
         self.val_hr.setStyleSheet(f"color: {COLOR_HR}")
         v_hr.addWidget(self.val_hr)
+        self.val_sqi = QLabel("Signal Quality: --")
+        v_hr.addWidget(self.val_sqi)
         
         # HRV Column
         v_hrv = QVBoxLayout()
@@ -848,11 +1123,12 @@ class MainWindow(QMainWindow):
             
             self.device_connected = True
             self.last_hardware_error = None
-            self.is_paused = True
+            self._set_paused(True)
             
             try:
                 if dlg.debug_mode:
-                    self.ingestion_thread = SimulationIngestionThread(sampling_rate=self.sampling_rate)
+                    self.ingestion_thread = SimulationIngestionThread(sampling_rate=self.sampling_rate,
+                                                                      channel_rates=self.get_channel_rates())
                     # Immediate UI update for simulation
                     self.lbl_conn.setText("CONNECTED (SIM)")
                     self.lbl_conn.setStyleSheet("color: green; border: 2px solid green; font-weight: bold; border-radius: 8px; background: #E8F5E9;")
@@ -868,7 +1144,8 @@ class MainWindow(QMainWindow):
                     # Start Timeout Timer (5 seconds)
                     self.conn_timer.start(5000)
                 
-                self.ingestion_thread.packet_ready.connect(self.on_packet_received)
+                self._submitted_at_connect = self.worker.packets_submitted
+                self.ingestion_thread.packet_ready.connect(self.worker.submit)
                 self.ingestion_thread.error_occurred.connect(self.on_hardware_error)
                 self.ingestion_thread.start()
             except Exception as e:
@@ -881,7 +1158,7 @@ class MainWindow(QMainWindow):
             self.ingestion_thread = None
             
         self.device_connected = False
-        self.is_paused = True
+        self._set_paused(True)
         self.lbl_conn.setText("DISCONNECTED")
         self.lbl_conn.setStyleSheet("color: #777; border: 2px dashed #CCC; padding: 15px; border-radius: 8px;")
         
@@ -898,8 +1175,17 @@ class MainWindow(QMainWindow):
         self.btn_sim_stop.setEnabled(False)
         self.statusBar().showMessage("Device Disconnected.")
 
-    def on_packet_received(self, packet: SensorPacket):
-        # If this is the first packet, confirm connection in UI
+    def _set_paused(self, paused):
+        self.is_paused = paused
+        self.worker.set_paused(paused)
+        self.render_scheduler.set_streaming(not paused)
+
+    def _plots_visible(self):
+        # Live page shown in a visible, non-minimized window
+        return self.isVisible() and not self.isMinimized() and self.center_stack.currentIndex() == 1
+
+    def _confirm_connection(self):
+        # First data from the hardware confirms the connection in the UI
         if "CONNECTING" in self.lbl_conn.text():
             self.conn_timer.stop()
             self.lbl_conn.setText("CONNECTED")
@@ -909,64 +1195,153 @@ class MainWindow(QMainWindow):
             self.btn_disconnect.setEnabled(True)
             self.statusBar().showMessage("Hardware Stream Active.")
 
-        if self.is_paused:
-            return
-        self.packet_buffer.append(packet)
-
-    def update_ui_from_buffer(self):
-        if not self.packet_buffer:
-            return
-            
-        packets = self.packet_buffer
-        self.packet_buffer = []
-
-        # 1. Pass data to processors
-        # EDA & Decomposition
-        eda_batch, phasic_batch, tonic_batch = self.eda_processor.process_batch(packets)
-        
-        # PPG / Heart Rate
-        hr_batch = self.ppg_processor.process_batch(packets)
-        
-        # HRV (Process individually as it maintains internal buffer state)
-        for packet in packets:
-            self.hrv_processor.process_packet(packet)
-            
-        # Update Metrics (Last value)
-        self.val_eda.setText(f"{eda_batch[-1]:.2f} µS")
-        self.val_hr.setText(f"{int(hr_batch[-1])} BPM")
-        
-        # Update Graphs
-        self.graph_main.push_data_batch(eda_batch, hr_batch)
-        self.graph_sub.push_data_batch(phasic_batch, tonic_batch)
+    def on_frame_ready(self, frame):
+        """Draws one processed frame from the worker thread (GUI thread only updates widgets)."""
+        received = time.perf_counter()
+        if frame.packets:
+            self._confirm_connection()
+        self._report_packet_loss(frame)
+        self.render_scheduler.data_arrived(frame.t_read)
+
+        if frame.eda is not None:
+            self.graph_main.push_data_batch(frame.eda_t, frame.eda)
+            self.graph_sub.push_data_batch(frame.eda_t, frame.phasic, frame.eda_t, frame.tonic)
+            eda_now = self._last_finite(frame.eda)
+            if eda_now is not None:
+                self.val_eda.setText(f"{eda_now:.2f} µS")
+
+        if frame.hr is not None:
+            self.graph_main.push_data_batch(None, None, frame.hr_t, frame.hr)
+            hr_now = self._last_finite(frame.hr)
+            if hr_now is not None:
+                self.val_hr.setText(f"{int(hr_now)} BPM")
+
+        if frame.imu is not None:
+            self.graph_imu.push_data_batch(frame.imu_t, frame.imu)
+
+        if frame.eda is not None or frame.hr is not None:
+            samples = {"processing_ms": frame.processing_ms,
+                       "lag_ms": frame.lag_ms + (received - frame.emitted_at) * 1000,
+                       "queue_ms": (received - frame.emitted_at) * 1000}
+            for key, value in samples.items():
+                self.frame_stats[key] += 0.1 * (value - self.frame_stats[key])
+
+        if frame.t_read and frame.interval_ms:
+            # Worker and renderer share the GIL, so their duty cycles add up
+            render = self.render_scheduler
+            duty = frame.processing_ms / frame.interval_ms
+            if self._plots_visible():
+                duty += render.render_ms / render.interval
+            self.backpressure.observe((received - frame.t_read) * 1000, duty)
+
+    def on_backpressure_changed(self, change):
+        mode = LEVELS[change.new]
+        self.render_scheduler.set_min_interval(mode.render_interval_ms)
+        for plot in (self.graph_main, self.graph_sub, self.graph_imu):
+            plot.set_bin_pixels(mode.bin_pixels)
+        self.worker.degrade(mode.coalesce, mode.hrv_extended)
+        print(f"[{datetime.datetime.fromtimestamp(change.wall_time):%H:%M:%S}] {change}")
+        self.statusBar().showMessage(str(change), 5000)
+        if self.recorder is not None:
+            self.recorder.write_mode(change)
+
+    def _report_packet_loss(self, frame):
+        stats = frame.loss
+        self.lbl_loss.setText(f"Loss: {stats.loss_ratio * 100:.1f}% ({stats.gaps} gaps)")
+        for gap in frame.gaps:
+            if gap.channel == "frames" and not gap.interpolated:
+                self.statusBar().showMessage(
+                    f"Signal discontinuity: {gap.duration:.2f}s of data lost at {gap.start:.2f}s", 5000)
+
+    @staticmethod
+    def _last_finite(values):
+        values = np.asarray(values, dtype=float)
+        finite = np.flatnonzero(np.isfinite(values))
+        return values[finite[-1]] if len(finite) else None
+
+    def get_channel_rate(self, name):
+        # A channel can't be sent more often than once per frame
+        return min(self.channel_rates.get(name) or self.sampling_rate, self.sampling_rate)
+
+    def get_channel_rates(self):
+        return {name: self.get_channel_rate(name) for name in self.channel_rates}
 
     def on_hrv_update(self, data):
         if "rmssd" in data:
             self.val_hrv.setText(f"{data['rmssd']:.1f} ms")
 
+    def on_quality_update(self, t, sqi):
+        quality = self.hrv_processor.quality
+        score = float(sqi[-1])
+        good = score >= quality.min_sqi
+        self.val_sqi.setText(f"Signal Quality: {score * 100:.0f}%")
+        self.val_sqi.setStyleSheet("color: green;" if good else f"color: {COLOR_RECORD};")
+        self.val_sqi.setToolTip("\n".join(f"{key}: {value:.2f}" for key, value in quality.components.items()))
+
     def _hrv_check_data_ready(self):
-        if len(self.hrv_processor._rri_ms) < 2:
+        if len(self.rri_window) < 2:
             QMessageBox.warning(self, "Insufficient Data", "Not enough RR intervals to plot.")
             return False
         return True
     
     def _hrv_run_rmssd(self):
-        if len(self.hrv_processor._rri_ms) < 2:
+        if self.hrv_processor.rri_count < 2:
             QMessageBox.warning(self, "Insufficient Data", "Not enough RR intervals to plot.")
             return
-        self.hrv_processor.compute_hrv()
+        self.worker.request_hrv()
         self.statusBar().showMessage("HRV (RMSSD) Computed.", 3000)
 
     def _hrv_open_rri(self):
         if self._hrv_check_data_ready():
-            self._hrv_windows.append(self.hrv_processor.open_rri_window())
+            self._hrv_show_window(self.rri_window)
 
     def _hrv_open_poincare(self):
         if self._hrv_check_data_ready():
-            self._hrv_windows.append(self.hrv_processor.open_poincare_window())
+            self._hrv_show_window(self.poincare_window)
     
     def _hrv_open_psd(self):
         if self._hrv_check_data_ready():
-            self._hrv_windows.append(self.hrv_processor.open_psd_window())
+            self._hrv_show_window(self.psd_window)
+
+    def open_eda_inspector(self):
+        if self.eda_inspector is None:
+            self.eda_inspector = EDAInspectorWindow(self.eda_processor)
+        self.eda_inspector.show()
+        self.eda_inspector.raise_()
+        self.eda_inspector.activateWindow()
+
+    def open_group_dashboard(self):
+        self.center_stack.setCurrentIndex(2)
+
+    def on_group_start(self, count, use_devices):
+        rates = self.get_channel_rates()
+        if use_devices:
+            ports = get_available_ports()[:count]
+            if not ports:
+                QMessageBox.warning(self, "Group Dashboard", "No serial ports found.")
+                return
+            sources = [(port, HardwareIngestionThread(port=port)) for port in ports]
+        else:
+            sources = [(f"Subject {k + 1} (SIM)", SimulationIngestionThread(sampling_rate=self.sampling_rate,
+                                                                             channel_rates=rates))
+                       for k in range(count)]
+        for name, source in sources:
+            source.error_occurred.connect(lambda msg, name=name: self.statusBar().showMessage(f"{name}: {msg}"))
+        self.group_dashboard.start_group(sources, self.sampling_rate, rates)
+        self.statusBar().showMessage(f"Group dashboard: {len(sources)} streams.")
+
+    def on_group_stop(self):
+        self.group_dashboard.stop_group()
+        self.statusBar().showMessage("Group dashboard stopped.")
+
+    def on_group_close(self):
+        self.group_dashboard.stop_group()
+        self.center_stack.setCurrentIndex(0)
+
+    def _hrv_show_window(self, win):
+        win.show()
+        win.raise_()
+        win.activateWindow()
 
     def on_connection_timeout(self):
         if "CONNECTING" in self.lbl_conn.text():
@@ -989,7 +1364,7 @@ class MainWindow(QMainWindow):
         self.btn_rec.setEnabled(True)
         
         # Start in PAUSED state so user must click Start
-        self.is_paused = True
+        self._set_paused(True)
         self.btn_sim_start.setEnabled(True)
         self.btn_sim_pause.setEnabled(False)
         self.btn_sim_stop.setEnabled(True)
@@ -998,8 +1373,16 @@ class MainWindow(QMainWindow):
         self.center_stack.setCurrentIndex(1)
         
         # Reset Graphs
+        self.close_recorded_session()
         self.graph_main.reset_data()
         self.graph_sub.reset_data()
+        self.graph_imu.reset_data()
+        self.worker.reset()
+        self.backpressure.reset()
+        for win in self._hrv_windows:
+            win.reset()
+        self.list_flags.clear()
+        self.active_flags = []
 
         # Start timer
         self.session_start_time = datetime.datetime.now()
@@ -1008,19 +1391,145 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Session Ready. Press Start to begin data stream.")
 
     def on_load_clicked(self):
-        QFileDialog.getOpenFileName(self, "Load Data", "", "CSV Files (*.csv)")
+        if not self.is_paused:
+            QMessageBox.warning(self, "Load Data", "Pause the live session before opening a recorded one.")
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Load Data", SESSION_DIR,
+                                              "Recorded Sessions (session.json *.csv);;All Files (*)")
+        if not path:
+            return
+        self.statusBar().showMessage("Opening session...")
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            start = time.perf_counter()
+            session = open_session(path) # CSV sessions are converted on their first open
+            self.show_recorded_session(session)
+        except (OSError, ChunkFormatError) as e:
+            self.statusBar().showMessage(f"Could not open {path}")
+            QMessageBox.critical(self, "Load Data", f"Could not open the session:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        first, last = self.recorded_session.span()
+        self.statusBar().showMessage(f"Opened {session.name}: {(last - first) / 60:.1f} min in "
+                                     f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def show_recorded_session(self, session):
+        """
+        Shows a recorded session in the live view: the plots decode only the
+        range on screen (starting with the last seconds, like live), the IMU
+        lanes get that window, the HRV windows the beats and latest metrics.
+        """
+        span = session.span()
+        if span is None:
+            session.close()
+            raise ChunkFormatError(f"{session.directory}: no signal data")
+        self.close_recorded_session()
+        self.recorded_session = session
+        first, last = span
+        self.center_stack.setCurrentIndex(1)
+
+        graphs = ((self.graph_main, ("eda_derived", "eda"), ("hr", "hr")),
+                  (self.graph_sub, ("eda_derived", "phasic"), ("eda_derived", "tonic")))
+        for graph, curve1, curve2 in graphs:
+            graph.show_session(*(session.curve(*c) if session.has(c[0]) else HistoryPyramid() for c in (curve1, curve2)),
+                               first, last)
+        for t, label in session.events():
+            for graph, _, _ in graphs:
+                graph.markers.add(t, label, COLOR_PRIMARY)
+
+        self.graph_imu.reset_data()
+        if session.has("imu"):
+            fields = CHANNEL_FIELDS["imu"]
+            self.graph_imu.set_sampling_rate(session.rate("imu"))
+            imu = session.window("imu", fields, last - self.graph_imu.window_seconds, last)
+            self.graph_imu.push_data_batch(imu["t"], np.column_stack([imu[f] for f in fields]))
+
+        for win in self._hrv_windows:
+            win.reset()
+        rri = session.table("rri")
+        hrv = session.table("hrv")
+        metrics = {key: float(values[-1]) for key, values in hrv.items() if key != "wall_time"} if hrv else {}
+        for win in self._hrv_windows:
+            if rri is not None:
+                win.append_rri(rri["t"], rri["rri"])
+            win.update_metrics(metrics)
+        if np.isfinite(metrics.get("rmssd", np.nan)):
+            self.on_hrv_update(metrics)
+
+        # Zoomed-out views fill in as the chunk summaries are built
+        self.overview_builder = session.overview_builder(parent=self)
+        self.overview_builder.progress.connect(lambda _: (self.graph_main.mark_dirty(), self.graph_sub.mark_dirty()))
+        self.overview_builder.start()
+
+    def close_recorded_session(self):
+        if self.overview_builder is not None:
+            self.overview_builder.requestInterruption()
+            self.overview_builder.wait()
+            self.overview_builder = None
+        if self.recorded_session is not None:
+            self.graph_main.reset_data()
+            self.graph_sub.reset_data()
+            self.graph_imu.reset_data()
+            self.graph_imu.set_sampling_rate(self.get_channel_rate("imu"))
+            self.recorded_session.close()
+            self.recorded_session = None
 
     def on_record_toggled(self, checked):
         self.is_recording = checked
         if checked:
+            # Raw and processed channels, plus process metrics for later performance analysis
+            directory = os.path.join(SESSION_DIR, datetime.datetime.now().strftime("session_%Y%m%d_%H%M%S"))
+            try:
+                self.recorder = ChunkedRecorder(directory, meta={"frame_rate": self.sampling_rate,
+                                                                 "channel_rates": self.get_channel_rates()},
+                                                parent=self)
+                self.recorder.error_occurred.connect(lambda msg: self.statusBar().showMessage(msg))
+                # Fed by the worker thread, so a busy GUI never delays the recording
+                self.worker.attach_recorder(self.recorder)
+                if self.backpressure.level:
+                    self.recorder.write_mode(self.backpressure.history[-1])
+                self.metrics.start_recording(os.path.join(directory, "metrics.csv"))
+                self.statusBar().showMessage(f"Recording to {directory}", 3000)
+            except OSError as e:
+                self.statusBar().showMessage(f"Session not recorded: {e}", 5000)
             self.lbl_rec_hint.setText("RECORDING")
             self.lbl_rec_hint.setStyleSheet(f"color: {COLOR_RECORD}; font-weight: bold;")
         else:
+            self.metrics.stop_recording()
+            if self.recorder is not None:
+                # Closed by the worker after the ticks already queued
+                self.worker.detach_recorder()
+                self.recorder = None
             self.lbl_rec_hint.setText("Ready")
             self.lbl_rec_hint.setStyleSheet("color: black;")
         
         print("Recording State Toggled")
 
+    def recover_sessions(self):
+        """Finalizes recordings whose writer was killed; only the data after their last index commit is scanned."""
+        if not os.path.isdir(SESSION_DIR):
+            return
+        recovered = []
+        for name in sorted(os.listdir(SESSION_DIR)):
+            directory = os.path.join(SESSION_DIR, name)
+            if not is_session(directory):
+                continue
+            start = time.perf_counter()
+            try:
+                result = recover(directory)
+            except (OSError, ChunkFormatError) as e:
+                print(f"Session {name} could not be recovered: {e}")
+                continue
+            if result is not None:
+                chunks, scanned = result
+                print(f"Recovered session {name}: {chunks} chunks from {scanned / 1e6:.1f} MB of journal "
+                      f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+                recovered.append(name)
+        if recovered:
+            self.statusBar().showMessage(f"Recovered {len(recovered)} interrupted recording(s): {', '.join(recovered)}",
+                                         10000)
+
     def on_insert_event(self, label=None):
         if label is None:
             label = self.txt_event.text() or "Event"
@@ -1030,15 +1539,12 @@ class MainWindow(QMainWindow):
         color = "#" + ''.join([random.choice('0123456789ABCDEF') for _ in range(6)])
         
         # Add to Graphs (Top and Bottom)
-        l1 = self.graph_main.add_marker(label, color)
-        l2 = self.graph_sub.add_marker(label, color)
+        m1 = self.graph_main.add_marker(label, color)
+        m2 = self.graph_sub.add_marker(label, color)
         
         # Add to List
         # Get timestamp from graph
-        if len(self.graph_main.x_data) > 0:
-            ts = self.graph_main.x_data[-1]
-        else:
-            ts = 0.0
+        ts = self.graph_main.latest_time()
         ts_fmt = f"{ts:.2f}s"
         
         item = pg.QtWidgets.QListWidgetItem(f"[{ts_fmt}] {label}")
@@ -1046,28 +1552,85 @@ class MainWindow(QMainWindow):
         self.list_flags.addItem(item)
         
         self.active_flags.append({
-            'line_main': l1,
-            'line_sub': l2,
-            'item': item
+            'marker_main': m1,
+            'marker_sub': m2,
+            'item': item,
+            'event_id': self._next_event_id,
+            'time': ts,
+            'label': label
         })
+        self.worker.add_event(self._next_event_id, ts, label)
+        if self.recorder is not None:
+            self.recorder.write_event(ts, label)
+        self._next_event_id += 1
+
+    def on_event_analyzed(self, event_id, result):
+        for flag in self.active_flags:
+            if flag['event_id'] == event_id:
+                summary = EventAnalyzer.format_result(result)
+                flag['item'].setText(f"[{result['time']:.2f}s] {result['label']} - {summary}")
+                flag['item'].setToolTip(summary)
+                break
+
+    def toggle_latency_hud(self, on):
+        self.hud.setVisible(on)
+        if on:
+            self.update_latency_hud()
+            self.hud_timer.start(500)
+        else:
+            self.hud_timer.stop()
+
+    def update_latency_hud(self):
+        self.hud.setText("Latency (ms)\n" + self.worker.latency.format_table())
+        self.hud.adjustSize()
+        # Top-right corner of the plot, clear of the right axis
+        self.hud.move(self.graph_main.width() - self.hud.width() - 70, 30)
+        self.hud.raise_()
+
+    def export_latency_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Latency Stats", "latency.csv", "CSV Files (*.csv)")
+        if path:
+            try:
+                self.worker.latency.to_csv(path)
+                self.statusBar().showMessage(f"Latency stats exported to {path}", 3000)
+            except OSError as e:
+                QMessageBox.warning(self, "Export Failed", str(e))
 
     def update_status_bar_stats(self):
         # Time
         self.lbl_time.setText(f"System Time: {datetime.datetime.now().strftime('%H:%M:%S')}")
-        
-        # Hardware Stats
-        try:
-            disk = psutil.disk_usage('/')
-            free_gb = disk.free / (1024**3)
-            self.lbl_disk.setText(f"Disk: {free_gb:.1f}GB Free")
-            
-            ram = psutil.virtual_memory()
-            self.lbl_ram.setText(f"RAM: {ram.percent}% Used")
-            
-            cpu = psutil.cpu_percent()
-            self.lbl_cpu.setText(f"CPU: {cpu}%")
-        except Exception:
-            pass
+
+        # Pipeline responsiveness
+        stats = self.frame_stats
+        render = self.render_scheduler
+        self.lbl_perf.setText(f"Frame: {render.render_ms:.1f} ms | Lag: {stats['lag_ms']:.0f} ms")
+        self.lbl_perf.setToolTip(f"Redraw every {render.interval} ms ({render.frames_drawn} frames drawn)\n"
+                                 f"Processing: {stats['processing_ms']:.1f} ms/frame\n"
+                                 f"GUI queue delay: {stats['queue_ms']:.1f} ms\n"
+                                 f"Mode: {self.backpressure.mode.name}")
+        
+
+    def on_metrics_snapshot(self, snap):
+        # Published by the metrics collector thread about once per second
+        self.lbl_cpu.setText(f"CPU: {snap['cpu_total']:.0f}% (System {snap['sys_cpu']:.0f}%)")
+        self.lbl_cpu.setToolTip(format_metrics_tooltip(snap))
+        self.lbl_ram.setText(f"RAM: {snap['rss_mb']:.0f} MB ({snap['sys_ram']:.0f}% Used)")
+        self.lbl_disk.setText(f"Disk: {snap['disk_free_gb']:.1f}GB Free")
+
+    def _ingest_queue_depth(self):
+        # Called from the metrics thread: packets emitted but not yet processed
+        ingestion = self.ingestion_thread
+        in_flight = ingestion.packets_emitted - (self.worker.packets_submitted - self._submitted_at_connect) if ingestion else 0
+        return max(0, in_flight) + self.worker.pending_count
+
+    def export_metrics_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Process Metrics", "process_metrics.csv", "CSV Files (*.csv)")
+        if path:
+            try:
+                self.metrics.to_csv(path)
+                self.statusBar().showMessage(f"Process metrics exported to {path}", 3000)
+            except OSError as e:
+                QMessageBox.warning(self, "Export Failed", str(e))
 
     def create_status_bar(self):
 
@@ -1084,9 +1647,13 @@ class MainWindow(QMainWindow):
         self.lbl_disk = QLabel("Disk: --")
         self.lbl_ram = QLabel("RAM: --")
         self.lbl_time = QLabel()
+        self.lbl_loss = QLabel("Loss: --")
+        self.lbl_perf = QLabel("Frame: --")
 
         
 
+        status.addPermanentWidget(self.lbl_perf)
+        status.addPermanentWidget(self.lbl_loss)
         status.addPermanentWidget(self.lbl_cpu)
         status.addPermanentWidget(self.lbl_disk)
 
@@ -1109,21 +1676,24 @@ class MainWindow(QMainWindow):
         if row >= 0:
             target = self.active_flags.pop(row)
             
-            # Remove lines
-            self.graph_main.remove_marker(target['line_main'])
-            self.graph_sub.remove_marker(target['line_sub'])
+            # Remove markers
+            self.graph_main.remove_marker(target['marker_main'])
+            self.graph_sub.remove_marker(target['marker_sub'])
             
             # Remove list item
             self.list_flags.takeItem(row)
+            self.worker.remove_event(target['event_id'])
+            if self.recorder is not None:
+                self.recorder.remove_event(target['time'], target['label'])
 
     def on_start_sim(self):
-        self.is_paused = False
+        self._set_paused(False)
         self.btn_sim_start.setEnabled(False)
         self.btn_sim_pause.setEnabled(True)
         self.statusBar().showMessage("Data Stream Resumed.")
 
     def on_pause_sim(self):
-        self.is_paused = True
+        self._set_paused(True)
         self.btn_sim_start.setEnabled(True)
         self.btn_sim_pause.setEnabled(False)
         self.statusBar().showMessage("Data Stream Paused.")
@@ -1155,6 +1725,19 @@ class MainWindow(QMainWindow):
             if self.ingestion_thread:
                 # stop() handles the wait() call internally
                 self.ingestion_thread.stop()
+            self.processing_thread.quit()
+            self.processing_thread.wait()
+            self.group_dashboard.stop_group()
+            self.close_recorded_session()
+            self.metrics.stop()
+            # Including recordings stopped earlier whose writer is still finishing
+            for recorder in self.findChildren(ChunkedRecorder):
+                recorder.close()
+                recorder.wait()
+            for win in self._hrv_windows:
+                win.close()
+            if self.eda_inspector is not None:
+                self.eda_inspector.close()
             event.accept()
         else:
             event.ignore()
@@ -1206,28 +1789,44 @@ class MainWindow(QMainWindow):
         eda_win = self.eda_processor.window_seconds
         ppg_win = self.ppg_processor.window_seconds
         hrv_win = self.hrv_processor.window_second
+        view_win = self.graph_main.window_seconds
 
-        dlg = HardwareConfigDialog(self.sampling_rate, eda_win, ppg_win, hrv_win, self)
+        dlg = HardwareConfigDialog(self.sampling_rate, eda_win, ppg_win, hrv_win, self.channel_rates, view_win, self)
         if dlg.exec() == QDialog.Accepted:
             new_rate = dlg.get_selected_rate()
             new_eda, new_ppg, new_hrv = dlg.get_windows()
+            new_channels = dlg.get_channel_rates()
+            new_view = dlg.get_view_window()
             
-            if new_rate != self.sampling_rate:
+            if new_rate != self.sampling_rate or new_channels != self.channel_rates:
                 self.sampling_rate = new_rate
-                self.eda_processor.set_sampling_rate(new_rate)
-                self.ppg_processor.set_sampling_rate(new_rate)
-                self.hrv_processor.set_sampling_rate(new_rate)
-                self.graph_main.fs = float(new_rate)
-                self.graph_sub.fs = float(new_rate)
+                self.channel_rates = new_channels
+                self.worker.configure(frame_rate=new_rate, channel_rates=self.get_channel_rates())
+                self.graph_main.set_sampling_rate(new_rate)
+                self.graph_sub.set_sampling_rate(new_rate)
+                self.graph_imu.set_sampling_rate(self.get_channel_rate("imu"))
+
+            if new_view != view_win:
+                for graph in (self.graph_main, self.graph_sub, self.graph_imu):
+                    graph.set_window_seconds(new_view)
             
-            self.eda_processor.set_window_seconds(new_eda)
-            self.ppg_processor.set_window_seconds(new_ppg)
-            self.hrv_processor.set_window_seconds(new_hrv)
+            self.worker.configure(eda_window=new_eda, ppg_window=new_ppg, hrv_window=new_hrv)
             
             self.statusBar().showMessage(f"Acquisition settings updated: {new_rate}Hz")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    profile = StartupProfile(_T_START)
+    profile.mark("imports")
     window = MainWindow()
+    profile.mark("window_built")
+    # NeuroKit & co. load in the background once the dashboard is on screen
+    profile.watch_first_paint(window)
+    profile.preload_after_first_paint()
+    # Sessions left open by a crash are finalized once the window is up
+    profile.first_paint.connect(window.recover_sessions)
+    if "--startup-benchmark" in sys.argv:
+        # Prints the milestones as JSON and exits at once (see startup_bench.py)
+        profile.preloaded.connect(lambda: (print(profile.to_json(), flush=True), os._exit(0)))
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,152 @@
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QRectF, QPointF, QLineF
+from PySide6.QtGui import QColor, QFontMetrics
+
+# --- EVENT MARKER LAYER ---
+
+class MarkerLayer(pg.GraphicsObject):
+    """
+    All event markers of one plot in a single graphics item.
+
+    Marker times are kept in a sorted array, so the markers inside the
+    visible x-range are found with two binary searches and drawn in one
+    paint call (lines batched per colour). Labels are drawn in screen
+    space and culled left to right when they would overlap the previous
+    label. Markers are ignored for auto-ranging.
+    """
+    def __init__(self, label_position=0.8, text_color="#000000"):
+        super().__init__()
+        self.label_position = label_position # Label height as a fraction of the view
+        self.text_color = QColor(text_color)
+        self._x = np.empty(0)                # Sorted marker times
+        self._ids = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+        self._style = {}                     # id -> (label, QColor)
+        self._pens = {}                      # colour name -> cosmetic pen
+        self._view = None
+        self.setZValue(10)
+
+    def __len__(self):
+        return len(self._x)
+
+    # --- Marker bookkeeping ---
+    def add(self, x, label, color):
+        """Adds a marker and returns its id."""
+        marker_id = self._next_id
+        self._next_id += 1
+        i = np.searchsorted(self._x, x, side="right")
+        self._x = np.insert(self._x, i, x)
+        self._ids = np.insert(self._ids, i, marker_id)
+        self._style[marker_id] = (label, QColor(color))
+        self.update()
+        return marker_id
+
+    def remove(self, marker_id):
+        keep = self._ids != marker_id
+        self._x, self._ids = self._x[keep], self._ids[keep]
+        self._style.pop(marker_id, None)
+        self.update()
+
+    def clear(self):
+        self._x = np.empty(0)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._style = {}
+        self.update()
+
+    def visible_range(self, x0, x1):
+        """Index range [i0, i1) of the markers with x0 <= x <= x1."""
+        return np.searchsorted(self._x, x0, side="left"), np.searchsorted(self._x, x1, side="right")
+
+    # --- QGraphicsItem interface ---
+    def viewRangeChanged(self):
+        # Spans the whole view vertically, so the bounding rect follows the view
+        self.prepareGeometryChange()
+        self._view = None
+
+    def dataBounds(self, axis, frac=1.0, orthoRange=None):
+        return None # Never affects auto-range
+
+    def boundingRect(self):
+        if self._view is None:
+            vb = self.getViewBox()
+            self._view = QRectF(vb.viewRect()) if vb is not None else QRectF()
+        return self._view
+
+    def _pen(self, color):
+        pen = self._pens.get(color.name())
+        if pen is None:
+            pen = pg.mkPen(color, width=2, style=Qt.DashDotLine)
+            pen.setCosmetic(True)
+            self._pens[color.name()] = pen
+        return pen
+
+    def paint(self, p, *args):
+        view = self.boundingRect()
+        if len(self._x) == 0 or view.isEmpty():
+            return
+        i0, i1 = self.visible_range(view.left(), view.right())
+        if i0 == i1:
+            return
+        xs = self._x[i0:i1]
+        styles = [self._style[i] for i in self._ids[i0:i1]]
+
+        # Lines, one drawLines call per colour
+        y0, y1 = view.top(), view.bottom()
+        groups = {}
+        for x, (_, color) in zip(xs, styles):
+            groups.setdefault(color.name(), (color, []))[1].append(QLineF(x, y0, x, y1))
+        for color, lines in groups.values():
+            p.setPen(self._pen(color))
+            p.drawLines(lines)
+
+        # Labels in screen space, skipping any that would overlap the last one drawn
+        transform = p.transform()
+        p.save()
+        p.resetTransform()
+        metrics = QFontMetrics(p.font())
+        y_label = y0 + (1.0 - self.label_position) * (y1 - y0) if view.height() > 0 else y0
+        right_edge = -np.inf
+        p.setPen(self.text_color)
+        for x, (label, _) in zip(xs, styles):
+            anchor = transform.map(QPointF(x, y_label))
+            width = metrics.horizontalAdvance(label) + 6
+            left = anchor.x() - width / 2
+            if left < right_edge:
+                continue
+            rect = QRectF(left, anchor.y() - metrics.height() / 2, width, metrics.height())
+            p.fillRect(rect, QColor(255, 255, 255, 200))
+            p.drawText(rect, Qt.AlignCenter, label)
+            right_edge = rect.right() + 4
+        p.restore()
+
+
+#Test output
+if __name__ == "__main__":
+    import time
+    from PySide6.QtGui import QImage, QPainter, QTransform
+    from PySide6.QtWidgets import QApplication
+
+    app = QApplication([])
+    layer = MarkerLayer()
+    rng = np.random.default_rng(0)
+    ids = [layer.add(x, f"E{i}", "#FF0000" if i % 2 else "#0000FF") for i, x in enumerate(rng.uniform(0, 3600, 5000))]
+    assert len(layer) == 5000 and np.all(np.diff(layer._x) >= 0), "Markers should stay sorted"
+    i0, i1 = layer.visible_range(100, 115)
+    assert np.all((layer._x[i0:i1] >= 100) & (layer._x[i0:i1] <= 115))
+    assert i1 - i0 == np.count_nonzero((layer._x >= 100) & (layer._x <= 115))
+    layer.remove(ids[0])
+    assert len(layer) == 4999 and ids[0] not in layer._ids
+
+    # Paint a 15 s window into an image (data -> 800x300 pixels)
+    image = QImage(800, 300, QImage.Format_ARGB32)
+    layer._view = QRectF(100, 0, 15, 1)
+    start = time.perf_counter()
+    p = QPainter(image)
+    p.setTransform(QTransform(800 / 15, 0, 0, -300, -100 * 800 / 15, 300))
+    layer.paint(p)
+    p.end()
+    print(f"Paint of {i1 - i0} visible markers (of {len(layer)}): {(time.perf_counter() - start) * 1000:.2f} ms")
+    layer.clear()
+    assert len(layer) == 0
+    print("All checks passed!")
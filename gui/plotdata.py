@@ -0,0 +1,444 @@
+import os
+from collections import deque
+import numpy as np
+from streams import RingBuffer
+
+# --- STRIP-CHART STORAGE ---
+
+class StripBuffer:
+    """
+    Fixed-capacity (t, y) history of one plotted curve.
+
+    Samples go into two ring buffers at a write cursor; nothing is reallocated
+    after construction. `window()` hands out the visible part in chronological
+    order: a view when it is contiguous, otherwise one unwrap copy into
+    arrays that are reused on every frame.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.t = RingBuffer(capacity)
+        self.y = RingBuffer(capacity)
+        self._out_t = np.empty(capacity)
+        self._out_y = np.empty(capacity)
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, t, values):
+        self.t.append(t)
+        self.y.append(values)
+
+    def latest_time(self):
+        return float(self.t.last()) if len(self.t) else None
+
+    def window(self, seconds):
+        """Returns (t, y) of the samples in the last `seconds` before the newest one."""
+        t = self.t.latest(out=self._out_t)
+        y = self.y.latest(out=self._out_y)
+        if len(t) == 0:
+            return t, y
+        start = np.searchsorted(t, t[-1] - seconds, side="right")
+        return t[start:], y[start:]
+
+    def clear(self):
+        self.t.clear()
+        self.y.clear()
+
+# --- DISPLAY DECIMATION ---
+
+def minmax_bins(t, y, width):
+    """
+    Min/max of `y` per time bin of `width` seconds (bins aligned to t = 0).
+    `t` must be ascending; a 2-D `y` (samples x channels) is binned per
+    column. Returns (bin ids, ymin, ymax); NaN samples are ignored and an
+    all-NaN bin stays NaN (drawn as a gap).
+    """
+    ids = np.floor(t / width).astype(np.int64)
+    starts = np.flatnonzero(np.diff(ids, prepend=ids[0] - 1))
+    return ids[starts], np.fmin.reduceat(y, starts), np.fmax.reduceat(y, starts)
+
+class MinMaxDecimator:
+    """
+    Incremental min/max decimation of one curve for display.
+
+    Bins are aligned to absolute time, so scrolling never moves a bin: each
+    append only merges into the still-open last bin and adds new ones. The
+    plotted points (min and max at every bin centre, about 2 per pixel) are
+    written into preallocated arrays. With `channels` set, `y` is 2-D and all
+    channels share one binning pass.
+    """
+    def __init__(self, channels=None):
+        self.width = None # Bin width (s); None until built
+        self.channels = channels
+        self._resize(0)
+
+    def _resize(self, n_bins):
+        capacity = n_bins + 4
+        row = () if self.channels is None else (self.channels,)
+        self.ids = RingBuffer(capacity, dtype=np.int64, fill=0)
+        self.lo = RingBuffer(capacity, width=self.channels)
+        self.hi = RingBuffer(capacity, width=self.channels)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._lo = np.empty((capacity,) + row)
+        self._hi = np.empty((capacity,) + row)
+        self._x = np.empty(2 * capacity)
+        self._y = np.empty((2 * capacity,) + row)
+
+    def rebuild(self, t, y, width, n_bins):
+        """Full recompute from raw samples (first use, or after a resize/zoom)."""
+        self.width = width
+        if self.ids.capacity != n_bins + 4:
+            self._resize(n_bins)
+        self.ids.clear()
+        self.lo.clear()
+        self.hi.clear()
+        self.append(t, y)
+
+    def append(self, t, y):
+        if len(t) == 0:
+            return
+        ids, lo, hi = minmax_bins(np.asarray(t, dtype=np.float64), np.asarray(y, dtype=np.float64), self.width)
+        if len(self.ids) and ids[0] == self.ids.last():
+            # First new bin continues the open one
+            self.lo.set_last(np.fmin(self.lo.last(), lo[0]))
+            self.hi.set_last(np.fmax(self.hi.last(), hi[0]))
+            ids, lo, hi = ids[1:], lo[1:], hi[1:]
+        self.ids.append(ids)
+        self.lo.append(lo)
+        self.hi.append(hi)
+
+    def points(self, t_start):
+        """Interleaved (x, y) of the bins from `t_start` on: min then max at each bin centre."""
+        ids = self.ids.latest(out=self._ids)
+        first = np.searchsorted(ids, np.floor(t_start / self.width))
+        ids = ids[first:]
+        n = len(ids)
+        centre = (ids + 0.5) * self.width
+        x, y = self._x[:2 * n], self._y[:2 * n]
+        x[0::2] = centre
+        x[1::2] = centre
+        y[0::2] = self.lo.latest(out=self._lo)[first:]
+        y[1::2] = self.hi.latest(out=self._hi)[first:]
+        return x, y
+
+# --- Y AUTO-RANGE ---
+
+class RollingMinMax:
+    """
+    Min and max of a sliding time window, updated in O(1) amortized per
+    sample with two monotonic deques (NaN samples are skipped).
+    """
+    def __init__(self):
+        self._min = deque() # (t, y) with increasing y
+        self._max = deque() # (t, y) with decreasing y
+
+    def append(self, t, values):
+        lo, hi = self._min, self._max
+        for ti, yi in zip(np.asarray(t, dtype=float).tolist(), np.asarray(values, dtype=float).tolist()):
+            if yi != yi: # NaN
+                continue
+            while lo and lo[-1][1] >= yi:
+                lo.pop()
+            lo.append((ti, yi))
+            while hi and hi[-1][1] <= yi:
+                hi.pop()
+            hi.append((ti, yi))
+
+    def expire(self, t_start):
+        """Drops samples older than t_start."""
+        for q in (self._min, self._max):
+            while q and q[0][0] < t_start:
+                q.popleft()
+
+    def bounds(self):
+        """(min, max) of the window, or None when it holds no samples."""
+        if not self._min:
+            return None
+        return self._min[0][1], self._max[0][1]
+
+    def clear(self):
+        self._min.clear()
+        self._max.clear()
+
+class AxisRange:
+    """
+    Explicit y-range with hysteresis: grows as soon as data leaves it, but
+    only shrinks once the data uses less than `shrink_below` of it, so the
+    axis (and its tick layout) stays put for most frames.
+    """
+    def __init__(self, margin=0.1, shrink_below=0.5):
+        self.margin = margin
+        self.shrink_below = shrink_below
+        self.range = None
+
+    def update(self, lo, hi):
+        """Feeds the data bounds; returns the new (lo, hi) range if it changed, else None."""
+        span = hi - lo
+        if self.range is not None:
+            r0, r1 = self.range
+            if r0 <= lo and hi <= r1 and span >= self.shrink_below * (r1 - r0):
+                return None
+        pad = self.margin * span if span > 0 else max(abs(hi) * 0.05, 1e-3)
+        self.range = (lo - pad, hi + pad)
+        return self.range
+
+    def clear(self):
+        self.range = None
+
+# --- SESSION HISTORY ---
+
+class SpillArray:
+    """
+    Append-only 1-D array, in memory or backed by a memory-mapped file.
+    Capacity doubles when full, so appends are amortised O(1); with a
+    `path` only the pages being touched stay resident.
+    """
+    def __init__(self, path=None, dtype=np.float64, capacity=1 << 16):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self._size = 0
+        self._data = self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        if self.path is None:
+            return np.empty(capacity, dtype=self.dtype)
+        if self._size:
+            # Remap larger; numpy extends the file, existing data stays in place
+            self._data.flush()
+            return np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity,))
+        return np.memmap(self.path, dtype=self.dtype, mode="w+", shape=(capacity,))
+
+    def __len__(self):
+        return self._size
+
+    def append(self, values):
+        values = np.asarray(values, dtype=self.dtype).ravel()
+        n = len(values)
+        if self._size + n > len(self._data):
+            capacity = max(2 * len(self._data), self._size + n)
+            if self.path is None:
+                grown = self._allocate(capacity)
+                grown[:self._size] = self._data[:self._size]
+                self._data = grown
+            else:
+                self._data = self._allocate(capacity)
+        self._data[self._size:self._size + n] = values
+        self._size += n
+
+    def view(self):
+        return self._data[:self._size]
+
+    def clear(self):
+        self._size = 0
+
+    def close(self):
+        """Releases the mapping and deletes the backing file."""
+        if self.path is not None:
+            self._data = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass # Still mapped by a live view (Windows); the temp directory goes on exit
+
+def _pair_reduce(lo, hi, mean):
+    """Merges consecutive pairs of bins (NaN-aware)."""
+    lo = np.fmin(lo[0::2], lo[1::2])
+    hi = np.fmax(hi[0::2], hi[1::2])
+    m = mean.reshape(-1, 2)
+    finite = np.isfinite(m)
+    count = finite.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(finite, m, 0.0).sum(axis=1) / count
+    return lo, hi, mean
+
+class HistoryPyramid:
+    """
+    Whole-session history of one curve with min/max/mean pyramids.
+
+    Raw samples are kept once; level k holds one (min, max, mean) bin per
+    2**k raw samples, from `base_level` up. Levels are extended
+    incrementally as complete bins become available, so appends cost a
+    few small vectorized reductions. `query()` picks the coarsest level that
+    still gives about `n_points` bins over the requested time range, so any
+    zoom over hours of data touches O(n_points) values. With `directory`
+    set, every column is a memory-mapped file and RAM use stays bounded.
+    """
+    def __init__(self, directory=None, name="curve", base_level=4):
+        self.directory = directory
+        self.name = name
+        self.base_level = base_level
+        self.t = self._column("t")
+        self.y = self._column("y")
+        self.levels = [] # [(lo, hi, mean)] for levels base_level, base_level + 1, ...
+
+    def _column(self, suffix, capacity=1 << 16):
+        path = None if self.directory is None else os.path.join(self.directory, f"{self.name}.{suffix}")
+        return SpillArray(path, capacity=capacity)
+
+    def __len__(self):
+        return len(self.t)
+
+    def append(self, t, y):
+        self.t.append(t)
+        self.y.append(y)
+        self._extend_levels()
+
+    def _extend_levels(self):
+        # Base level straight from the raw samples
+        size = 1 << self.base_level
+        if not self.levels:
+            if len(self.y) < size:
+                return
+            self.levels.append(tuple(self._column(f"l{self.base_level}.{c}", 1 << 10) for c in ("lo", "hi", "mean")))
+        lo, hi, mean = self.levels[0]
+        done, total = len(lo) * size, len(self.y) // size * size
+        if total > done:
+            block = self.y.view()[done:total].reshape(-1, size)
+            finite = np.isfinite(block)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                lo.append(np.fmin.reduce(block, axis=1))
+                hi.append(np.fmax.reduce(block, axis=1))
+                mean.append(np.where(finite, block, 0.0).sum(axis=1) / finite.sum(axis=1))
+
+        # Each further level pairs up the complete bins of the one below
+        k = 0
+        while len(self.levels[k][0]) >= 2:
+            below = self.levels[k]
+            if k + 1 == len(self.levels):
+                level = self.base_level + k + 1
+                self.levels.append(tuple(self._column(f"l{level}.{c}", 1 << 10) for c in ("lo", "hi", "mean")))
+            above = self.levels[k + 1]
+            done, total = 2 * len(above[0]), len(below[0]) // 2 * 2
+            if total > done:
+                merged = _pair_reduce(*(c.view()[done:total] for c in below))
+                for column, values in zip(above, merged):
+                    column.append(values)
+            k += 1
+
+    def query(self, t0, t1, n_points):
+        """
+        Returns (x, y, level) to draw [t0, t1] with about 2 * n_points values.
+        Level 0 is raw samples; otherwise interleaved min/max at bin centres.
+        """
+        t = self.t.view()
+        i0, i1 = np.searchsorted(t, [t0, t1])
+        i0 = max(i0 - 1, 0) # Keep the line continuous into the left edge
+        count = i1 - i0
+        if count <= 2 * n_points or not self.levels:
+            return np.array(t[i0:i1]), np.array(self.y.view()[i0:i1]), 0
+        k = int(np.clip(np.ceil(np.log2(count / n_points)) - self.base_level, 0, len(self.levels) - 1))
+        size = 1 << (self.base_level + k)
+        lo, hi, _ = self.levels[k]
+        b0, b1 = i0 // size, min(-(-i1 // size), len(lo))
+        starts = np.arange(b0, b1) * size
+        centre = 0.5 * (t[starts] + t[np.minimum(starts + size, len(t)) - 1])
+        x = np.repeat(centre, 2)
+        y = np.column_stack([lo.view()[b0:b1], hi.view()[b0:b1]]).ravel()
+        # Samples after the last complete bin (the live edge)
+        tail = b1 * size
+        if tail < i1:
+            x = np.concatenate([x, t[tail:i1]])
+            y = np.concatenate([y, self.y.view()[tail:i1]])
+        return x, y, self.base_level + k
+
+    def mean_level(self, level):
+        """(t, mean) of a pyramid level, e.g. for a smoothed overview."""
+        size = 1 << level
+        mean = self.levels[level - self.base_level][2].view()
+        return self.t.view()[np.arange(len(mean)) * size], mean
+
+    def clear(self):
+        self.close()
+        self.__init__(self.directory, self.name, self.base_level)
+
+    def close(self):
+        columns = [self.t, self.y] + [c for level in self.levels for c in level]
+        for column in columns:
+            column.close()
+
+
+#Test output
+if __name__ == "__main__":
+    buf = StripBuffer(capacity=8)
+    for k in range(5):
+        t = np.arange(3 * k, 3 * k + 3) / 10.0
+        buf.append(t, t * 2)
+    t, y = buf.window(seconds=0.45)
+    assert np.allclose(t, [1.0, 1.1, 1.2, 1.3, 1.4]), t
+    assert np.allclose(y, 2 * t)
+    # Wrapped windows reuse the same output arrays
+    assert np.shares_memory(t, buf._out_t) or np.shares_memory(t, buf.t._data)
+    buf.clear()
+    assert len(buf) == 0 and buf.latest_time() is None
+
+    # Incremental decimation matches a full recompute
+    fs, window, n_bins = 1000, 300.0, 1000
+    t = np.arange(int(fs * 400)) / fs
+    y = np.sin(t) + 0.1 * np.random.default_rng(0).standard_normal(len(t))
+    y[5000:5100] = np.nan
+    dec = MinMaxDecimator()
+    dec.rebuild(t[:33], y[:33], window / n_bins, n_bins)
+    for i in range(33, len(t), 33):
+        dec.append(t[i:i + 33], y[i:i + 33])
+    x_inc, y_inc = dec.points(t[-1] - window)
+    ref = MinMaxDecimator()
+    mask = t > t[-1] - window
+    ref.rebuild(t[mask], y[mask], window / n_bins, n_bins)
+    x_ref, y_ref = ref.points(t[-1] - window)
+    # (the first bin straddles the window start, so only the reference cuts it)
+    assert np.allclose(x_inc, x_ref) and np.allclose(y_inc[2:], y_ref[2:], equal_nan=True)
+    assert len(x_inc) <= 2 * (n_bins + 1)
+
+    # Cost per 30 FPS frame with a 5 minute window at 1000 Hz
+    import time
+    strip = StripBuffer(int(fs * window))
+    strip.append(t[:int(fs * window)], y[:int(fs * window)])
+    dec.rebuild(*strip.window(window), window / n_bins, n_bins)
+    start = time.perf_counter()
+    frames = 300
+    for k in range(frames):
+        chunk = slice(int(fs * window) + 33 * k, int(fs * window) + 33 * (k + 1))
+        strip.append(t[chunk], y[chunk])
+        dec.append(t[chunk], y[chunk])
+        dec.points(strip.latest_time() - window)
+    per_frame = (time.perf_counter() - start) / frames * 1000
+    print(f"Decimated frame: {per_frame:.3f} ms ({len(x_inc)} points for {int(fs * window)} samples)")
+
+    # Rolling min/max matches a rescan of the window; the axis range only moves with hysteresis
+    mm, axis = RollingMinMax(), AxisRange()
+    moves = 0
+    for i in range(0, 60000, 33):
+        mm.append(t[i:i + 33], y[i:i + 33])
+        end = t[min(i + 33, 60000) - 1]
+        mm.expire(end - 15.0)
+        inside = y[(t >= end - 15.0) & (t <= end)]
+        assert mm.bounds() == (np.nanmin(inside), np.nanmax(inside))
+        r = axis.update(*mm.bounds())
+        moves += r is not None
+        assert axis.range[0] <= mm.bounds()[0] and mm.bounds()[1] <= axis.range[1]
+    print(f"Y range moved on {moves} of {60000 // 33 + 1} frames")
+    assert moves < 60000 // 33 // 10
+
+    # History pyramid: incremental build equals a one-shot build, queries stay small
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        hist = HistoryPyramid(directory=tmp, name="test")
+        for i in range(0, len(t), 1000):
+            hist.append(t[i:i + 1000], y[i:i + 1000])
+        flat = HistoryPyramid()
+        flat.append(t, y)
+        for a, b in zip(hist.levels, flat.levels):
+            for ca, cb in zip(a, b):
+                assert np.allclose(ca.view(), cb.view(), equal_nan=True)
+        assert np.isclose(np.nanmax(hist.levels[-1][1].view()), np.nanmax(y[:len(hist.levels[-1][1]) << (hist.base_level + len(hist.levels) - 1)]))
+
+        start = time.perf_counter()
+        for k in range(100):
+            x, yq, level = hist.query(k, 400.0, 1000)
+        per_query = (time.perf_counter() - start) / 100 * 1000
+        assert len(x) <= 4000, len(x)
+        x, yq, level = hist.query(5.01, 5.09, 1000)
+        assert level == 0 and np.isnan(yq).all()
+        print(f"History query: {per_query:.3f} ms, {len(hist.levels)} levels over {len(hist)} samples")
+        hist.close()
+    print("All checks passed!")
@@ -1,6 +1,10 @@
 import numpy as np
-import neurokit2 as nk
 from PySide6.QtCore import QObject
+from kernels import ema
+from streams import ChannelBlock, fill_missing, leading_missing
+from startup import lazy_import
+
+nk = lazy_import("neurokit2")
 
 class PPGProcessor(QObject):
     """
@@ -15,22 +19,25 @@ class PPGProcessor(QObject):
         self.current_bpm = 0.0
         self.smoothed_bpm = 0.0
 
-    def process_batch(self, packets: list) -> list[float]:
+    def process_batch(self, block: ChannelBlock) -> list[float]:
         """
-        Takes a list of SensorPackets and returns list of Heart Rate values.
+        Takes a block of the cardiac channel and returns list of Heart Rate values.
         
         Args:
-            packets (list): A list of SensorPacket objects containing raw data.
+            block (ChannelBlock): New samples of the "cardiac" channel at its native rate.
             
         Returns:
-            list[float]: A list of Heart Rate (BPM) values.
+            list[float]: A list of Heart Rate (BPM) values, one per block row.
+            Lost rows are NaN.
         """
-        new_values = []
-        for p in packets:
-            val = 0.0
-            if p.cardiac:
-                val = float(p.cardiac.ir_value)
-            new_values.append(val)
+        # Lost IR samples are held at the last value so the PPG filters stay continuous
+        last = self.buffer[-1] if self.buffer else np.nan
+        ir = fill_missing(block.column("ir_value"), block.usable, last)
+        # Rows lost before the first sample of the session stay out of the buffer
+        skip = leading_missing(ir)
+        new_values = ir[skip:].tolist()
+        if not new_values:
+            return [np.nan] * len(block)
         
         self.buffer.extend(new_values)
         
@@ -47,16 +54,15 @@ class PPGProcessor(QObject):
             bpm_curve = [self.current_bpm] * len(new_values)
             
         # Apply smoothing to avoid square wave steps
-        smoothed_curve = []
         alpha = 0.05 # Smoothing factor
-        
-        for val in bpm_curve:
-            if self.smoothed_bpm == 0.0 and val > 0:
-                self.smoothed_bpm = val
-            self.smoothed_bpm = self.smoothed_bpm * (1 - alpha) + val * alpha
-            smoothed_curve.append(self.smoothed_bpm)
-            
-        return smoothed_curve
+        smoothed_curve, self.smoothed_bpm = ema(bpm_curve, alpha, self.smoothed_bpm)
+
+        if skip:
+            smoothed_curve = np.concatenate([np.full(skip, np.nan), smoothed_curve])
+        lost = ~block.usable
+        if lost.any():
+            smoothed_curve = np.where(lost, np.nan, smoothed_curve)
+        return smoothed_curve.tolist()
 
     def _compute_bpm_curve(self, num_new):
         try:
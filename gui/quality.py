@@ -0,0 +1,192 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PySide6.QtCore import QObject, Signal
+from events import SessionArray
+from kernels import confirm_peaks
+from streams import ChannelBlock, fill_missing
+
+# --- PPG SIGNAL QUALITY ---
+
+class PPGQuality(QObject):
+    """
+    Streaming signal-quality index (SQI) of the raw PPG, one score per second.
+
+    Each second is scored from four cheap, vectorized components, all in [0, 1]:
+      valid     - fraction of samples actually received
+      flat      - 1 - fraction of repeated samples (clipping / saturated ADC)
+      perfusion - AC/DC perfusion index relative to `min_perfusion` (%)
+      template  - mean correlation of the beats in that second with the
+                  average beat over the last `context_seconds`
+    The SQI is their product. HRV analysis asks `window_ok()` before running
+    the NeuroKit suite, so windows of bad signal are skipped up front.
+    """
+    # Emits (t, sqi) arrays for the seconds scored by the latest update
+    quality_updated = Signal(object, object)
+
+    def __init__(self, sampling_rate=20, context_seconds=8, min_sqi=0.5, min_perfusion=0.1, parent=None):
+        super().__init__(parent)
+        self.context_seconds = context_seconds
+        self.min_sqi = min_sqi
+        self.min_perfusion = min_perfusion
+        self.set_sampling_rate(sampling_rate)
+
+    def set_sampling_rate(self, rate):
+        self.sampling_rate = rate
+        self.segment = max(1, int(round(rate))) # Samples per scored second
+        self.reset()
+
+    def reset(self):
+        # Session-long quality trace (kept for the recordings)
+        self.t = SessionArray()
+        self.sqi = SessionArray()
+        self.beats = SessionArray() # Beats found per scored second
+        self.components = {}        # Components of the latest scored second, for tooltips
+        # Unscored tail and the context it is scored against
+        self._x = np.empty(0)
+        self._valid = np.empty(0, dtype=bool)
+        self._t = np.empty(0)
+        self._context = np.empty(0)
+
+    def update(self, block: ChannelBlock):
+        """Ingests a cardiac block; scores every second completed by it."""
+        self._x = np.concatenate([self._x, block.column("ir_value")])
+        self._valid = np.concatenate([self._valid, block.valid])
+        self._t = np.concatenate([self._t, block.t])
+        # A second is scored once the following second has arrived, so its
+        # beats are not cut off at the edge of the template windows
+        k = len(self._x) // self.segment - 1
+        if k <= 0:
+            return
+        n = k * self.segment
+        ahead = (k + 1) * self.segment
+        last = self._context[-1] if len(self._context) else np.nan
+        filled = fill_missing(self._x[:ahead], self._valid[:ahead], last)
+        context = np.concatenate([self._context, filled])
+        scores = self.score(self._x[:n], self._valid[:n], context, len(self._context))
+        t = self._t[:n]
+        self._context = context[:len(self._context) + n][-int(self.context_seconds * self.segment):]
+        self._x, self._valid, self._t = self._x[n:], self._valid[n:], self._t[n:]
+
+        seconds = t[::self.segment]
+        self.t.append(seconds)
+        self.sqi.append(scores["sqi"])
+        self.beats.append(scores["beats"])
+        self.components = {key: float(values[-1]) for key, values in scores.items()}
+        self.quality_updated.emit(seconds, scores["sqi"])
+
+    def score(self, x, valid, context, start=0):
+        """
+        Scores the whole seconds of `x` (raw, NaN where lost). `context` is the
+        forward-filled signal the beat template is built from; `x` starts at
+        index `start` of it.
+        """
+        seg = self.segment
+        k = len(x) // seg
+        xs = x.reshape(k, seg)
+        vs = valid.reshape(k, seg)
+
+        valid_frac = vs.mean(axis=1)
+
+        # Clipping / saturation shows up as runs of identical samples
+        same = np.zeros((k, seg), dtype=bool)
+        same[:, 1:] = np.diff(xs, axis=1) == 0
+        flat = 1.0 - same.sum(axis=1) / max(seg - 1, 1)
+
+        # Perfusion index (AC / DC, %); a zero-centred signal carries no DC to judge
+        with np.errstate(invalid="ignore", divide="ignore", all="ignore"):
+            ac = np.nanmax(xs, axis=1) - np.nanmin(xs, axis=1) if vs.any() else np.zeros(k)
+            dc = np.nanmean(xs, axis=1) if vs.any() else np.zeros(k)
+            pi = np.where(dc > 0, 100.0 * ac / dc, np.inf)
+        perfusion = np.clip(np.nan_to_num(pi / self.min_perfusion, nan=0.0), 0.0, 1.0)
+
+        template, beats = self._template_scores(context, start, k)
+        sqi = valid_frac * flat * perfusion * template
+        return {"sqi": sqi, "valid": valid_frac, "flat": flat, "perfusion": perfusion,
+                "template": template, "beats": beats}
+
+    def _template_scores(self, context, start, k):
+        """Per-second mean beat-to-template correlation for `k` seconds of `context` from `start`."""
+        seg = self.segment
+        zeros = np.zeros(k)
+        if not np.isfinite(context).any():
+            return zeros, zeros
+        x = np.nan_to_num(context, nan=float(np.nanmean(context)))
+
+        # Remove the baseline with a one-second moving mean (edges held, not zero-padded)
+        padded = np.pad(x, (seg // 2, seg - 1 - seg // 2), mode="edge")
+        detrended = x - np.convolve(padded, np.ones(seg) / seg, mode="valid")
+        peaks = confirm_peaks(detrended, 0.0, max(1, int(0.33 * self.sampling_rate)))
+        if len(peaks) < 3:
+            return zeros, zeros
+
+        half = max(1, int(np.median(np.diff(peaks))) // 2)
+        peaks = peaks[(peaks >= half) & (peaks < len(x) - half)]
+        if len(peaks) < 3:
+            return zeros, zeros
+        beats = sliding_window_view(detrended, 2 * half + 1)[peaks - half]
+        beats = beats - beats.mean(axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # Unit-norm beats and a median template, so one huge artefact can't dominate it
+            beats = beats / np.linalg.norm(beats, axis=1, keepdims=True)
+            template = np.nanmedian(beats, axis=0)
+            corr = beats @ template / np.linalg.norm(template)
+        corr = np.clip(np.nan_to_num(corr, nan=0.0), 0.0, 1.0)
+
+        # Attribute beats to the seconds being scored
+        second = (peaks - start) // seg
+        inside = (second >= 0) & (second < k)
+        counts = np.bincount(second[inside], minlength=k).astype(float)
+        sums = np.bincount(second[inside], weights=corr[inside], minlength=k)
+        # A second without a beat (slow heart rate) takes the context average
+        scores = np.where(counts > 0, sums / np.maximum(counts, 1), corr.mean())
+        return scores, counts
+
+    def window_ok(self, seconds, min_good_fraction=0.8, min_beats=6, max_bad_run=2):
+        """
+        Whether the last `seconds` of signal are worth an HRV analysis.
+        Returns (ok, reason) with reason describing the failing check.
+        """
+        n = int(seconds)
+        sqi = self.sqi.view()[-n:]
+        if len(sqi) < n:
+            return False, "Not enough scored signal for HRV computation."
+        good = np.count_nonzero(sqi >= self.min_sqi) / n
+        if good < min_good_fraction:
+            return False, f"PPG signal quality too low for HRV ({good * 100:.0f}% of window usable)."
+        # A long dropout corrupts the RR series even when the rest is clean
+        bad = np.concatenate([[0], (sqi < self.min_sqi).astype(np.int8), [0]])
+        edges = np.flatnonzero(np.diff(bad))
+        if len(edges) and (edges[1::2] - edges[::2]).max() > max_bad_run:
+            return False, "PPG signal dropout in HRV window."
+        if self.beats.view()[-n:].sum() < min_beats:
+            return False, "Not enough peaks detected for HRV computation."
+        return True, ""
+
+
+#Test output
+if __name__ == "__main__":
+    import neurokit2 as nk
+
+    fs = 20
+    ppg = 50000 + 1000 * nk.ppg_simulate(duration=60, sampling_rate=fs, heart_rate=70, random_state=1)
+    # Seconds 20-30: sensor saturated (clipped flat); 40-50: motion noise
+    ppg[20 * fs:30 * fs] = 262143
+    rng = np.random.default_rng(0)
+    ppg[40 * fs:50 * fs] += rng.normal(0, 3000, 10 * fs)
+
+    quality = PPGQuality(sampling_rate=fs)
+    t = np.arange(len(ppg)) / fs
+    for i in range(0, len(ppg), 7):
+        quality.update(ChannelBlock("cardiac", t[i:i + 7], np.column_stack([ppg[i:i + 7], np.zeros((len(ppg[i:i + 7]), 2))]),
+                                    np.ones(len(ppg[i:i + 7]), dtype=bool)))
+
+    sqi = quality.sqi.view()
+    print("SQI per second:", np.round(sqi, 2))
+    assert len(sqi) == 59
+    assert np.median(sqi[5:18]) > 0.8, "Clean signal should score high"
+    assert sqi[21:29].max() < 0.1, "Clipped signal should score ~0"
+    assert np.median(sqi[41:49]) < np.median(sqi[5:18]), "Noisy signal should score lower"
+    ok, _ = quality.window_ok(10)
+    assert ok, "Clean tail window should pass"
+    quality.reset()
+    print("All checks passed!")
@@ -11,6 +11,7 @@ from typing import Optional
 
 from PySide6.QtCore import QThread, Signal, QTimer
 from PySide6.QtWidgets import QApplication
+from procmetrics import register_thread
 
 # Check for correct serial library (pyserial vs serial)
 if not hasattr(serial, 'Serial'):
@@ -50,6 +51,14 @@ class SensorPacket:
     eda: Optional[EDAData] = None
     imu: Optional[IMUData] = None
     cardiac: Optional[CardiacData] = None
+    # Channels whose section was present in the frame but could not be parsed
+    missing: tuple = ()
+    # 16-bit frame counter (device "SEQ:" section, else the host's line counter)
+    seq: Optional[int] = None
+    # Monotonic (perf_counter) stage timestamps for latency instrumentation
+    t_read: float = 0.0     # Line read from the device
+    t_parsed: float = 0.0   # Parsed into this packet
+    t_queued: float = 0.0   # Handed to the processing worker
 
 # --- INGESTION NODE ---
 
@@ -67,10 +76,13 @@ class HardwareIngestionThread(QThread):
         self.port = port
         self.baudrate = baudrate
         self._running = True
+        self.packets_emitted = 0 # Cumulative, for the ingestion queue depth
         self.serial_conn = None
+        self._line_seq = -1 # Host-side frame counter for firmware without a SEQ section
+        self._device_seq = None # Last device SEQ; once seen, the host counter is never used
 
     def run(self):
-        
+        register_thread("ingest")
         try:
             # Open the serial port with a timeout so the thread can exit gracefully
             self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=0.1)
@@ -90,15 +102,24 @@ class HardwareIngestionThread(QThread):
                 
                 if not raw_line:
                     continue # Timeout reached, loop again
+                t_read = time.perf_counter()
 
                 decoded_line = raw_line.decode('utf-8', errors='ignore').strip()
                 
                 if not decoded_line:
                     continue
 
+                # Every line is a frame, even one too corrupted to parse, so
+                # the counter still exposes it as lost downstream
+                self._line_seq = (self._line_seq + 1) & 0xFFFF
+
                 # Parse and emit
                 packet = self._parse_telemetry(decoded_line)
                 if packet:
+                    packet.t_read = t_read
+                    packet.t_parsed = time.perf_counter()
+                    self._assign_seq(packet)
+                    self.packets_emitted += 1
                     self.packet_ready.emit(packet)
 
             except Exception as e:
@@ -109,45 +130,73 @@ class HardwareIngestionThread(QThread):
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
 
+    def _assign_seq(self, packet: SensorPacket):
+        """
+        Fills in packet.seq when the line carried no readable SEQ section.
+        Firmware that sends SEQ keeps its own counter: a line whose SEQ is
+        corrupt is taken as the frame after the last device SEQ, since the
+        host line counter runs on a different base and would look like a
+        counter reset plus thousands of lost frames.
+        """
+        if packet.seq is not None:
+            self._device_seq = packet.seq
+        elif self._device_seq is not None:
+            self._device_seq = packet.seq = (self._device_seq + 1) & 0xFFFF
+        else:
+            packet.seq = self._line_seq
+
     def _parse_telemetry(self, line: str) -> Optional[SensorPacket]:
         """
         Expects a unified string format: 
         "EDA:4095,3000.5|IMU:1.0,0.5,0.1,2.0,2.1,2.2,45.0,30.0,10.0|HR:80000,72.5,45.2"
+        optionally prefixed with the device frame counter: "SEQ:1234|EDA:..."
+
+        Any subset of the sections may be present. A section that is present
+        but corrupted is reported in `packet.missing` instead of being dropped
+        silently, so downstream streams can mark the sample as lost.
         """
-        try:
-            packet = SensorPacket(timestamp=time.time())
-            sections = line.split('|')
+        packet = SensorPacket(timestamp=time.time())
+        missing = []
 
-            for section in sections:
-                if section.startswith("EDA:"):
+        for section in line.split('|'):
+            try:
+                if section.startswith("SEQ:"):
+                    packet.seq = int(section[4:]) & 0xFFFF
+
+                elif section.startswith("EDA:"):
                     vals = section.replace("EDA:", "").split(',')
-                    if len(vals) == 2:
-                        packet.eda = EDAData(raw=float(vals[0]), smooth=float(vals[1]))
-                
+                    if len(vals) != 2:
+                        raise ValueError("EDA section length")
+                    packet.eda = EDAData(raw=float(vals[0]), smooth=float(vals[1]))
+
                 elif section.startswith("IMU:"):
                     vals = section.replace("IMU:", "").split(',')
-                    if len(vals) == 9:
-                        packet.imu = IMUData(
-                            ax=float(vals[0]), ay=float(vals[1]), az=float(vals[2]),
-                            gx=float(vals[3]), gy=float(vals[4]), gz=float(vals[5]),
-                            roll=float(vals[6]), pitch=float(vals[7]), yaw=float(vals[8])
-                        )
-                
+                    if len(vals) != 9:
+                        raise ValueError("IMU section length")
+                    packet.imu = IMUData(
+                        ax=float(vals[0]), ay=float(vals[1]), az=float(vals[2]),
+                        gx=float(vals[3]), gy=float(vals[4]), gz=float(vals[5]),
+                        roll=float(vals[6]), pitch=float(vals[7]), yaw=float(vals[8])
+                    )
+
                 elif section.startswith("HR:"):
                     vals = section.replace("HR:", "").split(',')
-                    if len(vals) == 3:
-                        packet.cardiac = CardiacData(
-                            ir_value=int(vals[0]), bpm=float(vals[1]), hrv=float(vals[2])
-                        )
-            
-            # Ensure we actually parsed something before returning
-            if packet.eda or packet.imu or packet.cardiac:
-                return packet
-            return None
-
-        except (ValueError, IndexError) as e:
-            # Fail silently on corrupted serial lines (common in live hardware streams)
-            return None
+                    if len(vals) != 3:
+                        raise ValueError("HR section length")
+                    packet.cardiac = CardiacData(
+                        ir_value=int(vals[0]), bpm=float(vals[1]), hrv=float(vals[2])
+                    )
+            except (ValueError, IndexError):
+                if section.startswith("SEQ"):
+                    continue # Filled in by _assign_seq
+                # Corrupted section (common in live hardware streams)
+                missing.append({"E": "eda", "I": "imu", "H": "cardiac"}[section[0]])
+
+        packet.missing = tuple(missing)
+        # Ensure we actually parsed (or at least recognised) something before returning
+        if packet.eda or packet.imu or packet.cardiac or packet.missing:
+            return packet
+        return None
 
     def stop(self):
         self._running = False
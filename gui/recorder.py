@@ -0,0 +1,317 @@
+import os
+import csv
+import time
+import queue
+import threading
+import numpy as np
+from PySide6.QtCore import QObject, QThread, Signal, Slot
+from streams import CHANNEL_FIELDS
+from backpressure import LEVELS
+from chunkstore import ChunkWriter, HRV_FIELDS
+from procmetrics import register_thread
+
+# --- SESSION RECORDER ---
+
+class SessionRecorder(QObject):
+    """
+    Writes the processed output of a session to CSV files in one directory:
+
+        eda.csv   t, eda, phasic, tonic
+        hr.csv    t, hr
+        imu.csv   t, ax ... yaw
+        hrv.csv   wall_time, rmssd, sdnn, ... (one row per hrv_computed)
+        gaps.csv  channel, start, duration, lost, interpolated
+        events.csv t, label
+        removed_events.csv t, label (flags deleted later; each cancels one events row)
+        modes.csv wall_time, level, mode, reason (backpressure mode changes)
+
+    Times are session seconds as produced by the stream router. Each frame
+    is written with one savetxt call per channel; files are opened lazily,
+    so channels that never arrive leave no file. Lives in the thread that
+    receives frame_ready (the GUI or the headless runner's main thread).
+    """
+    COLUMNS = {
+        "eda": ("t", "eda", "phasic", "tonic"),
+        "hr": ("t", "hr"),
+        "imu": ("t",) + CHANNEL_FIELDS["imu"],
+        "gaps": ("channel", "start", "duration", "lost", "interpolated"),
+        "events": ("t", "label"),
+        "removed_events": ("t", "label"),
+        "modes": ("wall_time", "level", "mode", "reason"),
+    }
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self._hrv_writer = None
+        self.frames_written = 0
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.csv")
+
+    def _file(self, name, header):
+        f = self._files.get(name)
+        if f is None:
+            f = open(self.path(name), "w", newline="")
+            f.write(",".join(header) + "\n")
+            self._files[name] = f
+        return f
+
+    def _write_rows(self, name, *columns):
+        rows = np.column_stack(columns)
+        if len(rows):
+            np.savetxt(self._file(name, self.COLUMNS[name]), rows, delimiter=",", fmt="%.6g")
+
+    @Slot(object)
+    def write_frame(self, frame):
+        """Appends one FrameResult's new samples."""
+        if frame.eda_t is not None:
+            self._write_rows("eda", frame.eda_t, frame.eda, frame.phasic, frame.tonic)
+        if frame.hr_t is not None:
+            self._write_rows("hr", frame.hr_t, frame.hr)
+        if frame.imu_t is not None:
+            self._write_rows("imu", frame.imu_t, frame.imu)
+        if frame.gaps:
+            writer = csv.writer(self._file("gaps", self.COLUMNS["gaps"]))
+            writer.writerows([g.channel, g.start, g.duration, g.lost, int(g.interpolated)] for g in frame.gaps)
+        self.frames_written += 1
+
+    @Slot(dict)
+    def write_hrv(self, metrics):
+        if self._hrv_writer is None:
+            keys = sorted(metrics)
+            self._hrv_writer = (csv.writer(self._file("hrv", ("wall_time",) + tuple(keys))), keys)
+        writer, keys = self._hrv_writer
+        writer.writerow([f"{time.time():.3f}"] + [metrics.get(key, "") for key in keys])
+
+    def write_event(self, t, label):
+        csv.writer(self._file("events", self.COLUMNS["events"])).writerow([f"{t:.3f}", label])
+
+    def remove_event(self, t, label):
+        """Records that the flag written as (t, label) was deleted."""
+        csv.writer(self._file("removed_events", self.COLUMNS["removed_events"])).writerow([f"{t:.3f}", label])
+
+    def write_mode(self, change):
+        """Logs a backpressure ModeChange; the samples themselves are never thinned."""
+        csv.writer(self._file("modes", self.COLUMNS["modes"])).writerow(
+            [f"{change.wall_time:.3f}", change.new, LEVELS[change.new].name, change.reason])
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._hrv_writer = None
+
+
+# --- CHUNKED RECORDER ---
+
+class ChunkedRecorder(QThread):
+    """
+    Records a session as a chunked columnar journal (chunkstore) from a
+    writer thread of its own.
+
+    The write_* methods only put references on a queue, so they are safe
+    and cheap from any thread: the processing worker hands over every
+    tick's routed raw blocks and derived channels (see
+    ProcessingWorker.attach_recorder), the GUI its events and mode changes.
+    The writer thread encodes full chunks as they fill and writes the
+    partial ones and fsyncs once per `flush_interval_s`, so a crash loses
+    at most that much; every `commit_every` flushes the index is committed,
+    which bounds how much recovery has to scan. close() is non-blocking;
+    wait() for the final commit.
+    """
+    error_occurred = Signal(str)
+
+    def __init__(self, directory, meta=None, chunk_rows=4096, flush_interval_s=1.0, commit_every=10, parent=None):
+        super().__init__(parent)
+        self.directory = directory
+        self.flush_interval_s = flush_interval_s
+        self.commit_every = commit_every
+        self.writer = ChunkWriter(directory, meta, chunk_rows)
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock() # Orders put() against close()
+        self._closed = False
+        self.items_queued = 0
+        self.items_written = 0
+        self.start()
+
+    @property
+    def path(self):
+        return self.writer.directory
+
+    @property
+    def backlog(self):
+        """Items queued but not written yet."""
+        return self.items_queued - self.items_written
+
+    def _put(self, item):
+        with self._lock:
+            if self._closed:
+                return
+            self.items_queued += 1
+            self._queue.put(item)
+
+    # --- Any thread ---
+    def write_frame(self, frame):
+        """Queues one FrameResult: its routed raw blocks, frame timestamps and derived channels."""
+        for name, block in frame.blocks.items():
+            self._put((name, [block.t] + list(block.values.T) + [block.valid]))
+        if frame.packet_wall is not None:
+            self._put(("packets", [frame.packet_wall, frame.packet_seq]))
+        if frame.eda_t is not None:
+            self._put(("eda_derived", [frame.eda_t, frame.eda, frame.phasic, frame.tonic]))
+        if frame.hr_t is not None:
+            self._put(("hr", [frame.hr_t, frame.hr]))
+        if frame.gaps:
+            g = frame.gaps
+            self._put(("gaps", [np.array([x.start for x in g]), np.array([x.duration for x in g]),
+                                np.array([x.lost for x in g]), np.array([x.interpolated for x in g]),
+                                [x.channel for x in g]]))
+
+    @Slot(dict)
+    def write_hrv(self, metrics):
+        self._put(("hrv", [np.array([time.time()])] + [np.array([metrics.get(k, np.nan)]) for k in HRV_FIELDS]))
+
+    @Slot(object, object)
+    def write_rri(self, t, rri_ms):
+        self._put(("rri", [np.asarray(t, dtype=float), np.asarray(rri_ms, dtype=float)]))
+
+    @Slot(object, object)
+    def write_quality(self, t, sqi):
+        self._put(("sqi", [np.asarray(t, dtype=float), np.asarray(sqi, dtype=float)]))
+
+    def write_event(self, t, label):
+        self._put(("events", [np.array([t]), [label]]))
+
+    def remove_event(self, t, label):
+        """Records that the flag written as (t, label) was deleted."""
+        self._put(("removed_events", [np.array([t]), [label]]))
+
+    def write_mode(self, change):
+        self._put(("modes", [np.array([change.wall_time]), np.array([change.new]),
+                             [LEVELS[change.new].name], [change.reason]]))
+
+    def flush(self):
+        # A marker, not an item: it is never written, so it is not counted in the backlog
+        with self._lock:
+            if not self._closed:
+                self._queue.put(None) # Handled by the writer thread's next flush
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(StopIteration)
+
+    # --- Writer thread ---
+    def run(self):
+        register_thread("writer")
+        writer = self.writer
+        next_flush = time.monotonic() + self.flush_interval_s
+        flushes = 0
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+                except queue.Empty:
+                    item = None
+                if item is StopIteration:
+                    break
+                if item is not None:
+                    writer.append(*item)
+                    self.items_written += 1
+                if item is None or time.monotonic() >= next_flush:
+                    # Batched: one fsync per interval, however many chunks were written
+                    flushes += 1
+                    if flushes % self.commit_every:
+                        writer.flush(sync=True)
+                    else:
+                        writer.flush()
+                        writer.commit()
+                    next_flush = time.monotonic() + self.flush_interval_s
+        except (OSError, ValueError) as e:
+            self.error_occurred.emit(f"Recording stopped: {e}")
+            with self._lock:
+                self._closed = True
+        finally:
+            try:
+                writer.close()
+            except OSError as e:
+                self.error_occurred.emit(f"Recording not finalized: {e}")
+
+
+#Test output
+if __name__ == "__main__":
+    import tempfile
+    from worker import FrameResult
+    from streams import GapRecord
+    from backpressure import ModeChange
+
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = SessionRecorder(os.path.join(tmp, "session"))
+        for k in range(10):
+            t = np.arange(k * 20, (k + 1) * 20) / 20.0
+            frame = FrameResult(eda_t=t, eda=np.sin(t), phasic=np.cos(t), tonic=np.zeros(20),
+                                imu_t=t, imu=np.ones((20, 9)))
+            if k == 3:
+                frame.gaps = [GapRecord("frames", 3.2, 0.1, 2, True)]
+            recorder.write_frame(frame)
+        recorder.write_hrv({"rmssd": 42.0, "sdnn": 50.0})
+        recorder.write_event(1.5, "Task Start")
+        recorder.write_mode(ModeChange(time.time(), 0, 1, "backlog 400 ms, duty 130%"))
+        recorder.close()
+
+        eda = np.loadtxt(recorder.path("eda"), delimiter=",", skiprows=1)
+        assert eda.shape == (200, 4) and np.allclose(eda[:, 0], np.arange(200) / 20.0)
+        assert np.loadtxt(recorder.path("imu"), delimiter=",", skiprows=1).shape == (200, 10)
+        assert not os.path.exists(recorder.path("hr")), "Channels without data leave no file"
+        with open(recorder.path("hrv")) as f:
+            assert f.readline().strip() == "wall_time,rmssd,sdnn"
+        with open(recorder.path("gaps")) as f:
+            assert len(f.read().splitlines()) == 2
+        with open(recorder.path("modes")) as f:
+            assert f.read().splitlines()[1].split(",")[1:3] == ["1", "reduced display"]
+
+        # Chunked recorder: 8 devices at 1000 Hz, 33 ms ticks, fed faster than real time
+        from streams import ChannelBlock
+        from chunkstore import ChunkReader
+        recorders = [ChunkedRecorder(os.path.join(tmp, f"device{d}"), flush_interval_s=0.2) for d in range(8)]
+        fs, n, ticks = 1000, 33, 600
+        put_ms = []
+        start = time.perf_counter()
+        for k in range(ticks):
+            t = (k * n + np.arange(n)) / fs
+            blocks = {name: ChannelBlock(name, t, np.random.rand(n, len(fields)), np.ones(n, dtype=bool))
+                      for name, fields in CHANNEL_FIELDS.items()}
+            frame = FrameResult(eda_t=t, eda=t, phasic=t, tonic=t, hr_t=t, hr=t, blocks=blocks,
+                                packet_wall=t + 1.7e9, packet_seq=np.arange(n))
+            for recorder in recorders:
+                t0 = time.perf_counter()
+                recorder.write_frame(frame)
+                put_ms.append((time.perf_counter() - t0) * 1000)
+        recorders[0].write_event(1.5, "Task Start")
+        recorders[0].write_rri(np.array([0.8, 1.6]), np.array([np.nan, 800.0]))
+        for _ in range(5):
+            recorders[0].flush()
+        for recorder in recorders:
+            recorder.close()
+        for recorder in recorders:
+            recorder.wait()
+            assert recorder.backlog == 0
+        elapsed = time.perf_counter() - start
+        print(f"write_frame: {np.median(put_ms) * 1000:.0f} us median, {max(put_ms):.2f} ms max; "
+              f"{ticks * n / fs:.1f} s of 8 devices at {fs} Hz written in {elapsed:.2f} s")
+        reader = ChunkReader(recorders[0].path)
+        assert reader.complete and reader.rows("cardiac") == ticks * n == reader.rows("packets")
+        assert np.allclose(reader.read("eda_derived", ["t"])["t"], np.arange(ticks * n) / fs)
+        assert list(reader.read("events")["label"]) == ["Task Start"]
+        assert np.array_equal(reader.read("rri")["rri"], [np.nan, 800.0], equal_nan=True)
+        reader.close()
+    print("All checks passed!")
@@ -0,0 +1,173 @@
+import os
+import time
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QObject, QTimer, QRectF
+from PySide6.QtGui import QPolygonF
+
+# Opt-in OpenGL viewport for the plots (needs PyOpenGL):
+#   WEARABLE_EDA_OPENGL=1 (env var)
+USE_OPENGL = bool(os.environ.get("WEARABLE_EDA_OPENGL"))
+
+def set_antialias(item, enabled):
+    """Switches antialiasing of one curve (PlotDataItem or PlotCurveItem)."""
+    if isinstance(item, pg.PlotDataItem):
+        item.opts["antialias"] = enabled
+        item = item.curve
+    item.opts["antialias"] = enabled
+    item.update()
+
+# --- APPEND-ONLY SCATTER ---
+
+class PointCloudItem(pg.GraphicsObject):
+    """
+    Scatter of same-styled points that only ever grows (e.g. a session's
+    Poincare plot). Points are written into a preallocated QPolygonF whose
+    capacity doubles when full, bounds are kept incrementally, and paint is
+    a single drawPoints call - unlike ScatterPlotItem.addPoints, which
+    reallocates its per-point records on every append.
+    """
+    def __init__(self, size=6, color="#007ACC", capacity=4096):
+        super().__init__()
+        self._pen = pg.mkPen(color, width=size)
+        self._pen.setCapStyle(Qt.RoundCap)
+        self._pen.setCosmetic(True)
+        self._poly = QPolygonF()
+        self._poly.reserve(capacity)
+        self._bounds = QRectF()
+
+    def __len__(self):
+        return len(self._poly)
+
+    def append(self, x, y):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n0, k = len(self._poly), len(x)
+        if k == 0:
+            return
+        if n0 + k > self._poly.capacity():
+            self._poly.reserve(max(2 * self._poly.capacity(), n0 + k))
+        self._poly.resize(n0 + k)
+        points = pg.functions.ndarray_from_qpolygonf(self._poly)
+        points[n0:, 0] = x
+        points[n0:, 1] = y
+        new = QRectF(x.min(), y.min(), x.max() - x.min(), y.max() - y.min())
+        self.prepareGeometryChange()
+        self._bounds = new if n0 == 0 else self._bounds.united(new)
+        self.update()
+
+    def clear(self):
+        self.prepareGeometryChange()
+        self._poly.resize(0)
+        self._bounds = QRectF()
+        self.update()
+
+    def dataBounds(self, axis, frac=1.0, orthoRange=None):
+        if not len(self._poly):
+            return None
+        b = self._bounds
+        return (b.left(), b.right()) if axis == 0 else (b.top(), b.bottom())
+
+    def boundingRect(self):
+        # Pad by the point size in data units so edge points are not clipped
+        px = self.pixelLength(pg.Point(1, 0)) or 0.0
+        py = self.pixelLength(pg.Point(0, 1)) or 0.0
+        w = self._pen.widthF()
+        return self._bounds.adjusted(-w * px, -w * py, w * px, w * py)
+
+    def paint(self, p, *args):
+        if len(self._poly):
+            p.setPen(self._pen)
+            p.drawPoints(self._poly)
+
+# --- RENDER SCHEDULER ---
+
+class RenderScheduler(QObject):
+    """
+    Drives plot redraws instead of a fixed 30 FPS timer.
+
+    Plots append incoming data without drawing and mark themselves dirty;
+    each tick redraws only dirty plots, and only while `is_visible()` says
+    they can be seen. The tick interval adapts to the measured render cost
+    so drawing never takes more than `max_duty` of the GUI thread. While data
+    streams curves are drawn without antialiasing (cheap); when paused it is
+    switched back on and everything is redrawn once at full quality.
+
+    Plots need `render() -> bool` (True if something was drawn), `curves()`
+    and `mark_dirty()`. Plots that are hidden (e.g. on an inactive tab) are
+    skipped and stay dirty until shown.
+    """
+    def __init__(self, plots, is_visible, min_interval=33, max_interval=250, max_duty=0.25, latency=None,
+                 parent=None):
+        super().__init__(parent)
+        self.latency = latency   # Optional LatencyMonitor for the render / end_to_end stages
+        self.pending_since = None # perf_counter() read time of the oldest data not yet drawn
+        self.plots = list(plots)
+        self.is_visible = is_visible
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_duty = max_duty
+        self.interval = min_interval
+        self.render_ms = 0.0     # Smoothed cost of a render that drew something
+        self.frames_drawn = 0
+        self.streaming = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.tick)
+        self._due = time.perf_counter()
+        self._schedule()
+
+    def data_arrived(self, t_read):
+        """Notes data read at `t_read` (perf_counter) that the next drawn frame will show."""
+        if t_read and self.pending_since is None:
+            self.pending_since = t_read
+
+    def add_plot(self, plot):
+        self.plots.append(plot)
+        for curve in plot.curves():
+            set_antialias(curve, not self.streaming)
+
+    def set_streaming(self, streaming):
+        """Cheap rendering while data streams, antialiased when paused."""
+        if streaming == self.streaming:
+            return
+        self.streaming = streaming
+        for plot in self.plots:
+            for curve in plot.curves():
+                set_antialias(curve, not streaming)
+            plot.mark_dirty()
+
+    def set_min_interval(self, ms):
+        """Raises (or restores) the shortest tick interval, e.g. to draw at a lower rate under load."""
+        self.min_interval = ms
+        self.interval = int(min(max(self.interval, ms), self.max_interval))
+
+    def tick(self):
+        if self.is_visible():
+            start = time.perf_counter()
+            drawn = [plot.render() for plot in self.plots if plot.isVisibleTo(plot.window())]
+            if any(drawn):
+                end = time.perf_counter()
+                cost = (end - start) * 1000
+                self.render_ms += 0.1 * (cost - self.render_ms)
+                self.frames_drawn += 1
+                if self.latency is not None:
+                    self.latency.record("render", cost)
+                    if self.pending_since is not None:
+                        self.latency.record("end_to_end", (end - self.pending_since) * 1000)
+                self.pending_since = None
+                # Keep drawing below max_duty of the GUI thread
+                self.interval = int(min(max(self.min_interval, self.render_ms / self.max_duty), self.max_interval))
+        self._schedule()
+
+    def _schedule(self):
+        # Ticks on a fixed cadence: time spent in the tick and in the paint
+        # that follows it is taken off the wait; a late tick never bursts
+        now = time.perf_counter()
+        self._due = max(self._due + self.interval / 1000, now)
+        self._timer.start(int((self._due - now) * 1000))
+
+    def stop(self):
+        self._timer.stop()
@@ -0,0 +1,97 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+import numpy as np
+
+# --- LIVE RENDER BENCHMARK ---
+# Drives a BioSignalPlot the way the dashboard does (one push + render per
+# 33 ms frame) with a 1000 Hz channel and reports the time per frame for
+# each live view window. Multi-minute windows hold hundreds of thousands of
+# samples and only stay inside the frame budget because render() draws the
+# min/max decimation instead of the raw trace:
+#
+#   QT_QPA_PLATFORM=offscreen python render_bench.py --windows 15 60 300
+#
+# Each window runs in a fresh interpreter (as in startup_bench.py), so one
+# plot's state never carries over into the next measurement. Exits with
+# status 1 when a window is over budget.
+
+BUDGET_MS = 33.0 # One frame at 30 FPS
+FRAME_S = 0.033
+
+def bench_window(plot, fs, window, frames):
+    """Fills `window` seconds at `fs`, then times `frames` push+render frames. Returns (ms/frame, points drawn)."""
+    plot.reset_data()
+    plot.set_sampling_rate(fs)
+    plot.set_window_seconds(window)
+    chunk = int(round(fs * FRAME_S))
+    n = int(fs * window) + chunk * frames
+    t = np.arange(n) / fs
+    rng = np.random.default_rng(0)
+    y1 = np.sin(2 * np.pi * 0.1 * t) + 0.05 * rng.standard_normal(n)
+    y2 = 70 + 5 * np.sin(2 * np.pi * 0.02 * t)
+    fill = int(fs * window)
+    plot.push_data_batch(t[:fill], y1[:fill], t[:fill], y2[:fill])
+    plot.render()
+    start = time.perf_counter()
+    for k in range(frames):
+        s = slice(fill + chunk * k, fill + chunk * (k + 1))
+        plot.push_data_batch(t[s], y1[s], t[s], y2[s])
+        plot.render()
+    per_frame = (time.perf_counter() - start) / frames * 1000
+    return per_frame, len(plot.curve1.getData()[0])
+
+def run_window(fs, window, frames):
+    """Child process: benchmarks one window and prints the result as JSON."""
+    from PySide6.QtWidgets import QApplication
+    from main import BioSignalPlot
+
+    app = QApplication.instance() or QApplication([])
+    plot = BioSignalPlot("Bench", "EDA", "uS", "Heart Rate", "BPM")
+    plot.resize(1200, 400)
+    plot.show()
+    app.processEvents()
+    per_frame, points = bench_window(plot, fs, window, frames)
+    # The decimated trace is bounded by the plot width, not by the window
+    assert points <= 2 * (plot._pixel_bins() + 2), points
+    print(json.dumps({"window": window, "ms": per_frame, "points": points}), flush=True)
+    os._exit(0) # Skip Qt teardown; the result is out
+
+def run_once(fs, window, frames, timeout=600):
+    script = os.path.abspath(__file__)
+    out = subprocess.run([sys.executable, script, "--child", "--rate", str(fs), "--windows", str(window),
+                          "--frames", str(frames)], capture_output=True, text=True, timeout=timeout,
+                         cwd=os.path.dirname(script))
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"render benchmark printed no result (exit {out.returncode}):\n{out.stderr[-2000:]}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure live plot render time per frame against its budget.")
+    parser.add_argument("--rate", type=float, default=1000.0, help="Channel rate (Hz)")
+    parser.add_argument("--windows", type=float, nargs="+", default=[15.0, 60.0, 300.0], help="Live view windows (s)")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        run_window(args.rate, args.windows[0], args.frames)
+
+    failed = []
+    for window in args.windows:
+        result = run_once(args.rate, window, args.frames)
+        samples = int(args.rate * window)
+        print(f"{window:>6.0f} s @ {args.rate:.0f} Hz: {result['ms']:7.2f} ms/frame "
+              f"({result['points']} points for {samples} samples)")
+        if result["ms"] > BUDGET_MS:
+            failed.append((window, result["ms"]))
+    for window, per_frame in failed:
+        print(f"OVER BUDGET: {window:.0f} s window {per_frame:.2f} ms > {BUDGET_MS:.0f} ms")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+import os
+import csv
+import time
+import shutil
+import itertools
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+from chunkstore import ChunkReader, ChunkWriter, ChunkFormatError, STREAMS, HRV_FIELDS, is_session
+from plotdata import minmax_bins
+
+# --- RECORDED SESSION VIEW ---
+# Opens a recorded session for review in the live-view widgets without
+# loading it: the chunk index says which chunks cover a time range, the
+# memory-mapped segments give their bytes, and only the columns being drawn
+# are decoded, only for the range on screen. Ranges too wide to decode are
+# drawn from per-chunk min/max summaries that a background thread fills in.
+# RAM use depends on the screen, not on the session length.
+
+NATIVE_DIR = "native" # Chunked copy of a CSV session, made on first open
+SIGNAL_STREAMS = ("eda", "cardiac", "imu", "eda_derived", "hr") # Timed in session seconds
+# CSV files of a SessionRecorder session -> chunk streams
+CSV_STREAMS = {"eda": "eda_derived", "hr": "hr", "imu": "imu", "hrv": "hrv", "gaps": "gaps", "events": "events",
+               "removed_events": "removed_events", "modes": "modes"}
+
+class ChunkOverview:
+    """
+    Per-chunk min/max of the float columns of one stream, in index order.
+    build() fills it in chunk by chunk (from any thread); chunks not
+    summarized yet are NaN.
+    """
+    def __init__(self, reader, stream):
+        self.reader = reader
+        self.stream = stream
+        schema = reader.schema[stream]
+        self.columns = [name for name, dtype in schema[1:] if dtype == "f8"]
+        self.entries = reader.chunks(stream)
+        self.lo = np.full((len(self.columns), len(self.entries)), np.nan)
+        self.hi = np.full((len(self.columns), len(self.entries)), np.nan)
+        self.done = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def build(self, stop=None):
+        """Summarizes the remaining chunks; returns False if `stop()` ended it early (call again to resume)."""
+        for k in range(self.done, len(self.entries)):
+            if stop is not None and stop():
+                return False
+            for c, values in enumerate(self.reader.read_chunk(self.stream, self.entries[k], self.columns)):
+                if len(values):
+                    self.lo[c, k] = np.fmin.reduce(values)
+                    self.hi[c, k] = np.fmax.reduce(values)
+            self.done = k + 1
+        return True
+
+class SessionCurve:
+    """
+    One column of a recorded stream as a BioSignalPlot history source (the
+    HistoryPyramid.query interface). Ranges covering at most `max_rows` rows
+    are decoded from their chunks; wider ones come from the stream's
+    ChunkOverview, one min/max pair per chunk or group of chunks.
+    """
+    def __init__(self, overview, column, max_rows=1 << 18):
+        self.overview = overview
+        self.reader = overview.reader
+        self.stream = overview.stream
+        self.column = column
+        self.t_column = self.reader.schema[self.stream][0][0]
+        self.max_rows = max_rows
+        self._row = overview.columns.index(column)
+
+    def __len__(self):
+        return int(self.overview.entries["rows"].sum())
+
+    def query(self, t0, t1, n_points):
+        """
+        Returns (x, y, level) to draw [t0, t1] with about 2 * n_points values.
+        Level 0 is raw samples, 1 min/max bins of decoded samples, 2 min/max per chunk.
+        """
+        entries = self.overview.entries
+        k0 = int(np.searchsorted(entries["t_last"], t0))
+        k1 = int(np.searchsorted(entries["t_first"], t1, side="right"))
+        if k1 <= k0:
+            return np.array([]), np.array([]), 0
+        if entries["rows"][k0:k1].sum() <= self.max_rows:
+            parts = [self.reader.read_chunk(self.stream, e, [self.t_column, self.column]) for e in entries[k0:k1]]
+            t = np.concatenate([p[0] for p in parts])
+            y = np.concatenate([p[1] for p in parts])
+            i0, i1 = np.searchsorted(t, [t0, t1])
+            # One sample beyond each edge keeps the line continuous
+            t, y = t[max(i0 - 1, 0):i1 + 1], y[max(i0 - 1, 0):i1 + 1]
+            if len(t) <= 2 * n_points:
+                return t, y, 0
+            width = (t1 - t0) / n_points
+            ids, lo, hi = minmax_bins(t, y, width)
+            return np.repeat((ids + 0.5) * width, 2), np.column_stack([lo, hi]).ravel(), 1
+
+        lo = self.overview.lo[self._row, k0:k1]
+        hi = self.overview.hi[self._row, k0:k1]
+        centre = 0.5 * (entries["t_first"][k0:k1] + entries["t_last"][k0:k1])
+        if len(centre) > n_points:
+            size = -(-len(centre) // n_points)
+            starts = np.arange(0, len(centre), size)
+            lo, hi = np.fmin.reduceat(lo, starts), np.fmax.reduceat(hi, starts)
+            centre = centre[np.minimum(starts + size // 2, len(centre) - 1)]
+        return np.repeat(centre, 2), np.column_stack([lo, hi]).ravel(), 2
+
+class OverviewBuilder(QThread):
+    """Fills in ChunkOverviews in the background; `progress` (fraction done) every `notify_s` and at the end."""
+    progress = Signal(float)
+
+    def __init__(self, overviews, notify_s=0.5, parent=None):
+        super().__init__(parent)
+        self.overviews = list(overviews)
+        self.notify_s = notify_s
+
+    def fraction(self):
+        total = sum(len(o) for o in self.overviews)
+        return sum(o.done for o in self.overviews) / total if total else 1.0
+
+    def run(self):
+        for overview in self.overviews:
+            finished = False
+            while not finished:
+                deadline = time.monotonic() + self.notify_s
+                finished = overview.build(lambda: self.isInterruptionRequested() or time.monotonic() > deadline)
+                if self.isInterruptionRequested():
+                    return
+                self.progress.emit(self.fraction())
+
+class RecordedSession:
+    """
+    An opened session directory: plot sources for its signal columns and
+    the small streams (beats, HRV, events) for seeding the other views.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.reader = ChunkReader(directory)
+        self.meta = self.reader.meta
+        self._overviews = {}
+
+    @property
+    def name(self):
+        directory = self.directory.rstrip(os.sep)
+        if os.path.basename(directory) == NATIVE_DIR:
+            directory = os.path.dirname(directory)
+        return os.path.basename(directory)
+
+    def has(self, stream):
+        return stream in self.reader.schema and len(self.reader.chunks(stream)) > 0
+
+    def span(self):
+        """(first, last) session time over the signal streams, or None if there are none."""
+        entries = [self.reader.chunks(s) for s in SIGNAL_STREAMS if self.has(s)]
+        if not entries:
+            return None
+        entries = np.concatenate(entries)
+        return float(np.nanmin(entries["t_first"])), float(np.nanmax(entries["t_last"]))
+
+    def rate(self, stream):
+        """Average sampling rate of a signal stream (Hz)."""
+        entries = self.reader.chunks(stream)
+        duration = float(entries["t_last"][-1] - entries["t_first"][0])
+        return (int(entries["rows"].sum()) - 1) / duration if duration > 0 else 0.0
+
+    def curve(self, stream, column):
+        overview = self._overviews.get(stream)
+        if overview is None:
+            overview = self._overviews[stream] = ChunkOverview(self.reader, stream)
+        return SessionCurve(overview, column)
+
+    def window(self, stream, columns, t0, t1):
+        """{column: array} of `stream` with t0 <= t <= t1; float channels are NaN where not valid."""
+        names = [c for c, _ in self.reader.schema[stream]]
+        data = self.reader.read(stream, [names[0]] + list(columns) + (["valid"] if "valid" in names else []), t0, t1)
+        keep = (data[names[0]] >= t0) & (data[names[0]] <= t1)
+        out = {name: values[keep] for name, values in data.items()}
+        if "valid" in out:
+            invalid = out.pop("valid") == 0
+            for name in columns:
+                if out[name].dtype.kind == "f" and invalid.any():
+                    out[name] = np.where(invalid, np.nan, out[name])
+        return out
+
+    def table(self, stream, columns=None):
+        """A whole (small) stream, or None if the session has no data in it."""
+        return self.reader.read(stream, columns) if self.has(stream) else None
+
+    def events(self):
+        """[(t, label)] of the session's flags, without the ones deleted during recording."""
+        if not self.has("events"):
+            return []
+        table = self.table("events")
+        removed = []
+        if self.has("removed_events"):
+            gone = self.table("removed_events")
+            removed = list(zip(gone["t"].tolist(), gone["label"]))
+        events = []
+        for event in zip(table["t"].tolist(), table["label"]):
+            if event in removed:
+                removed.remove(event)
+            else:
+                events.append(event)
+        return events
+
+    def overview_builder(self, parent=None):
+        """OverviewBuilder for the curves handed out so far."""
+        return OverviewBuilder(self._overviews.values(), parent=parent)
+
+    def close(self):
+        self.reader.close()
+
+def _csv_blocks(path, rows):
+    """(header, float rows) of a numeric CSV, `rows` lines at a time."""
+    with open(path, newline="") as f:
+        header = f.readline().strip().split(",")
+        while True:
+            lines = list(itertools.islice(f, rows))
+            if not lines:
+                return
+            yield header, np.loadtxt(lines, delimiter=",", ndmin=2)
+
+def _float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return np.nan
+
+def import_csv(directory, block_rows=1 << 16):
+    """
+    Converts a SessionRecorder CSV session into a chunked session in its
+    NATIVE_DIR subdirectory and returns that path. Numeric files are read
+    `block_rows` lines at a time; the copy only appears once complete.
+    """
+    target = os.path.join(directory, NATIVE_DIR)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    writer = ChunkWriter(tmp, meta={"imported_from": "csv"})
+    try:
+        for name, stream in CSV_STREAMS.items():
+            path = os.path.join(directory, f"{name}.csv")
+            if not os.path.exists(path):
+                continue
+            columns = STREAMS[stream]
+            if name in ("eda", "hr", "imu"):
+                for header, rows in _csv_blocks(path, block_rows):
+                    cols = [rows[:, header.index(c)] for c, _ in columns if c != "valid"]
+                    if columns[-1][0] == "valid":
+                        cols.append(np.isfinite(rows).all(axis=1).astype(np.uint8))
+                    writer.append(stream, cols)
+                continue
+            with open(path, newline="") as f:
+                records = list(csv.DictReader(f))
+            if records:
+                writer.append(stream, [[r.get(c, "") for r in records] if dtype == "str" else
+                                       np.array([_float(r.get(c, "")) for r in records]).astype(dtype)
+                                       for c, dtype in columns])
+    except (OSError, ValueError, KeyError) as e:
+        writer.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise ChunkFormatError(f"{directory}: CSV import failed: {e!r}") from e
+    writer.close()
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return target
+
+def open_session(path):
+    """
+    Opens a recorded session from its directory or any file in it. A CSV
+    session is converted on its first open (import_csv). Raises
+    ChunkFormatError if `path` holds neither.
+    """
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    for candidate in (directory, os.path.join(directory, NATIVE_DIR)):
+        if is_session(candidate):
+            return RecordedSession(candidate)
+    if any(os.path.exists(os.path.join(directory, f"{name}.csv")) for name in CSV_STREAMS):
+        return RecordedSession(import_csv(directory))
+    raise ChunkFormatError(f"{directory}: no recorded session")
+
+
+#Test output
+if __name__ == "__main__":
+    import tempfile
+    import tracemalloc
+    from recorder import SessionRecorder
+    from worker import FrameResult
+
+    fs, hours = 1000, 4
+    n = hours * 3600 * fs
+    with tempfile.TemporaryDirectory() as tmp:
+        # 4 h at 1000 Hz, written as the recorder does: ~1 s chunks (one flush per second)
+        path = os.path.join(tmp, "long")
+        writer = ChunkWriter(path, meta={"frame_rate": fs})
+        rng = np.random.default_rng(0)
+        noise = np.round(rng.normal(0, 2, (16, fs)))
+        counts = np.round(rng.normal(0, 50, (16, 9, fs)))
+        ones = np.ones(fs, dtype=np.uint8)
+        start = time.perf_counter()
+        for k in range(0, n, fs):
+            t = np.arange(k, k + fs) / fs
+            eda = (np.round(2000 + 300 * np.sin(t / 600)) + noise[k // fs % 16]) / 1000
+            writer.append("eda_derived", [t, eda, eda - 1.9, np.full(fs, 1.9)])
+            writer.append("hr", [t, np.full(fs, 60 + 10 * np.sin(k / fs / 900))])
+            writer.append("imu", [t] + list(counts[k // fs % 16]) + [ones])
+            writer.append("rri", [t[:1], np.array([1000.0])])
+            writer.flush()
+        writer.close()
+        size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        print(f"Wrote {hours} h at {fs} Hz ({size / 1e6:.0f} MB) in {time.perf_counter() - start:.0f} s")
+
+        # Opening and drawing the last 15 s of every view; timed, then again for the allocations
+        def open_views():
+            session = open_session(os.path.join(path, "session.json"))
+            first, last = session.span()
+            curves = [session.curve("eda_derived", c) for c in ("eda", "phasic", "tonic")] + [session.curve("hr", "hr")]
+            views = [c.query(last - 15, last, 1000) for c in curves]
+            imu = session.window("imu", list(STREAMS["imu"][k][0] for k in range(1, 10)), last - 15, last)
+            return session, first, last, curves, views, imu, session.table("rri")
+
+        start = time.perf_counter()
+        session, first, last, curves, views, imu, rri = open_views()
+        elapsed = (time.perf_counter() - start) * 1000
+        session.close()
+        tracemalloc.start()
+        session, first, last, curves, views, imu, rri = open_views()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"Open + last 15 s of 4 curves, IMU and {len(rri['t'])} beats: {elapsed:.0f} ms, "
+              f"peak {peak / 1e6:.0f} MB allocated")
+        assert elapsed < 1000 and peak < 50e6
+        x, y, level = views[0]
+        assert level == 1 and x[0] >= last - 15.01 and len(x) <= 2002
+        assert len(imu["t"]) == 15 * fs + 1 and abs(session.rate("imu") - fs) < 1e-6
+        assert (first, last) == (0.0, (n - 1) / fs)
+
+        # The whole session: drawn from the chunk summaries, gaps until they are built
+        x, y, level = curves[0].query(first, last, 1000)
+        assert level == 2 and len(x) <= 2000 and np.isnan(y).all()
+        start = time.perf_counter()
+        builder = session.overview_builder()
+        builder.run() # In this thread
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        x, y, level = curves[0].query(first, last, 1000)
+        zoom_ms = (time.perf_counter() - start) * 1000
+        assert np.isfinite(y).all() and abs(np.nanmax(y) - np.nanmax(session.curve("eda_derived", "eda")
+                                                                       .query(0, 3600, 10 ** 7)[1])) < 0.02
+        print(f"Overview of {len(session._overviews)} streams built in {build_s:.1f} s; whole-session query {zoom_ms:.2f} ms")
+        session.close()
+
+        # CSV sessions are converted once
+        csv_dir = os.path.join(tmp, "csv")
+        recorder = SessionRecorder(csv_dir)
+        for k in range(5):
+            t = np.arange(k * 20, (k + 1) * 20) / 20.0
+            imu_rows = np.ones((20, 9))
+            imu_rows[3] = np.nan
+            recorder.write_frame(FrameResult(eda_t=t, eda=np.sin(t), phasic=np.cos(t), tonic=np.zeros(20),
+                                             hr_t=t, hr=np.full(20, 70.0), imu_t=t, imu=imu_rows))
+        recorder.write_hrv({"rmssd": 42.0, "sdnn": 50.0})
+        recorder.write_event(1.5, "Task Start")
+        recorder.write_event(3.0, "Oops")
+        recorder.remove_event(3.0, "Oops")
+        recorder.close()
+        session = open_session(recorder.path("eda"))
+        assert session.directory == os.path.join(csv_dir, NATIVE_DIR) and session.name == "csv"
+        eda = session.window("eda_derived", ["eda"], 0, 10)
+        assert len(eda["t"]) == 100 and np.allclose(eda["eda"], np.sin(eda["t"]), atol=1e-5)
+        assert np.isnan(session.window("imu", ["ax"], 0, 10)["ax"][3])
+        hrv = session.table("hrv")
+        assert hrv["rmssd"][0] == 42.0 and np.isnan(hrv["lf"][0])
+        assert session.events() == [(1.5, "Task Start")] and session.table("rri") is None
+        session.close()
+        mtime = os.path.getmtime(os.path.join(csv_dir, NATIVE_DIR, "session.json"))
+        open_session(csv_dir).close()
+        assert os.path.getmtime(os.path.join(csv_dir, NATIVE_DIR, "session.json")) == mtime
+    print("All checks passed!")
@@ -1,12 +1,16 @@
 import numpy as np
-import neurokit2 as nk
 from PySide6.QtCore import QThread, Signal, QTimer
 from PySide6.QtWidgets import QApplication
 import sys
 import time
+import random
 from dataclasses import dataclass
 from typing import Optional
 from rawdata import SensorPacket, EDAData, IMUData, CardiacData
+from procmetrics import register_thread
+from startup import lazy_import
+
+nk = lazy_import("neurokit2") # Used in run(), off the GUI thread
 
 # --- SIMULATION INGESTION NODE ---
 
@@ -18,10 +22,15 @@ class SimulationIngestionThread(QThread):
     packet_ready = Signal(SensorPacket)
     error_occurred = Signal(str)
 
-    def __init__(self, sampling_rate=20, parent=None):
+    def __init__(self, sampling_rate=20, channel_rates=None, loss_rate=0.0, parent=None):
         super().__init__(parent)
         self.sampling_rate = sampling_rate
+        # Optional native rate per channel ("eda", "imu", "cardiac"); a channel
+        # slower than the frame rate is only sent in every Nth frame
+        self.channel_rates = channel_rates or {}
+        self.loss_rate = loss_rate # Fraction of frames dropped on purpose (link-loss testing)
         self._running = True
+        self.packets_emitted = 0 # Cumulative, for the ingestion queue depth
         self.sim_duration = 120  # 2 minutes of data to loop through
 
     def _generate_data(self):
@@ -66,11 +75,15 @@ class SimulationIngestionThread(QThread):
         self.total_samples = num_samples
 
     def run(self):
+        register_thread("ingest")
         # Generate data in the background thread to avoid freezing the UI
         self._generate_data()
         
         index = 0
+        seq = 0
         sleep_ms = int(1000 / self.sampling_rate)
+        steps = {name: max(1, round(self.sampling_rate / rate))
+                 for name, rate in self.channel_rates.items() if rate}
 
         while self._running: 
             if index >= self.total_samples:
@@ -78,6 +91,7 @@ class SimulationIngestionThread(QThread):
 
             # Assemble data for the current time step into a SensorPacket
             try:
+                t_read = time.perf_counter()
                 cardiac = CardiacData(
                     ir_value=int(self.sim_ir_values[index] * 1000),
                     bpm=self.sim_bpm[index],
@@ -97,17 +111,24 @@ class SimulationIngestionThread(QThread):
 
                 packet = SensorPacket(
                     timestamp=time.time(),
-                    eda=eda,
-                    imu=imu,
-                    cardiac=cardiac
+                    seq=seq & 0xFFFF,
+                    eda=eda if index % steps.get("eda", 1) == 0 else None,
+                    imu=imu if index % steps.get("imu", 1) == 0 else None,
+                    cardiac=cardiac if index % steps.get("cardiac", 1) == 0 else None,
+                    t_read=t_read,
+                    t_parsed=time.perf_counter()
                 )
-                self.packet_ready.emit(packet)
+                # Optionally drop frames to exercise the packet-loss path
+                if not self.loss_rate or random.random() >= self.loss_rate:
+                    self.packets_emitted += 1
+                    self.packet_ready.emit(packet)
 
             except Exception as e:
                 self.error_occurred.emit(f"Simulation error: {e}")
                 # Don't stop for a single bad data point
                 
             index += 1
+            seq += 1
             self.msleep(sleep_ms)
 
     def stop(self):
@@ -0,0 +1,234 @@
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+from streams import RingBuffer
+from plotdata import MinMaxDecimator, AxisRange
+from render import USE_OPENGL
+
+# --- STACKED MULTI-CHANNEL PLOT ---
+
+class StackedChannelPlot(QWidget):
+    """
+    Live strip chart of many channels stacked in lanes (e.g. the 9 IMU fields).
+
+    All channels share one 2-D ring buffer and one min/max decimation pass.
+    Each group of channels (one colour) is a single PlotCurveItem: its lanes'
+    traces are concatenated and a `connect` array breaks the path between
+    lanes and at lost samples. Every lane is scaled into its own band from a
+    hysteresis range, so the nine IMU channels cost about as much to draw as
+    one curve. Drawn by the RenderScheduler like BioSignalPlot.
+
+    `groups` is a list of (label, colour, [channel indices]).
+    """
+    def __init__(self, title, channels, groups, window_seconds=15.0, fs=20.0):
+        super().__init__()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.channels = list(channels)
+        self.groups = [(label, list(idx)) for label, _, idx in groups]
+        self.window_seconds = window_seconds
+        n = len(self.channels)
+
+        self.plot_widget = pg.PlotWidget(title=title)
+        if USE_OPENGL:
+            self.plot_widget.useOpenGL(True)
+        self.plot_widget.showGrid(x=True, y=False, alpha=0.3)
+        self.plot_widget.setMouseEnabled(x=False, y=False)
+        self.plot_widget.hideButtons()
+        self.plot_widget.setLabel('bottom', "Time", units='s')
+        self.plot_widget.setYRange(0, n, padding=0)
+        # Lane k (top to bottom) occupies [n-1-k, n-k)
+        self.lane_base = (n - 1 - np.arange(n)).astype(float)
+        self.plot_widget.getAxis('left').setTicks([[(b + 0.5, name) for b, name in zip(self.lane_base, self.channels)], []])
+        legend = self.plot_widget.addLegend(offset=(-10, 10))
+        legend.setBrush(pg.mkBrush(255, 255, 255, 200))
+        self._curves = []
+        for label, color, _ in groups:
+            curve = pg.PlotCurveItem(pen=pg.mkPen(color, width=1), name=label)
+            self.plot_widget.addItem(curve)
+            self._curves.append(curve)
+        layout.addWidget(self.plot_widget)
+
+        self.ranges = [AxisRange(margin=0.05) for _ in self.channels]
+        self.dec = MinMaxDecimator(channels=n)
+        self.bin_pixels = 1 # Pixels per decimation bin; raised by the backpressure policy
+        self.dirty = False
+        self.set_sampling_rate(fs)
+
+    def set_sampling_rate(self, fs):
+        self.fs = float(fs)
+        capacity = max(1, int(self.window_seconds * self.fs))
+        n = len(self.channels)
+        self.t = RingBuffer(capacity)
+        self.y = RingBuffer(capacity, width=n)
+        self._out_t = np.empty(capacity)
+        self._out_y = np.empty((capacity, n))
+        self._allocate_draw(0)
+        self.dec.width = None
+
+    def set_window_seconds(self, seconds):
+        """Changes the visible time span; the newest rows that still fit are kept."""
+        t, y = self.t.latest(), self.y.latest()
+        self.window_seconds = float(seconds)
+        self.set_sampling_rate(self.fs)
+        self.t.append(t) # Only the newest rows that fit are kept
+        self.y.append(y)
+        self.mark_dirty()
+
+    def _allocate_draw(self, points):
+        """Per-lane point capacity of the preallocated drawing arrays."""
+        n = len(self.channels)
+        self._points = points
+        self._scaled = np.empty((points, n))
+        self._lane_x = np.empty((n, points))
+        self._lane_y = np.empty((n, points))
+        self._lane_connect = np.zeros((n, points), dtype=bool)
+
+    def push_data_batch(self, t, values):
+        """Adds rows of all channels (samples x channels); drawn on the next render()."""
+        if t is None or len(t) == 0:
+            return
+        self.t.append(t)
+        self.y.append(values)
+        if self.dec.width is not None:
+            self.dec.append(t, values)
+        self.dirty = True
+
+    def latest_time(self):
+        return float(self.t.last()) if len(self.t) else 0.0
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def set_bin_pixels(self, pixels):
+        self.bin_pixels = pixels
+        self.mark_dirty()
+
+    def curves(self):
+        return tuple(self._curves)
+
+    def reset_data(self):
+        self.t.clear()
+        self.y.clear()
+        self.dec.width = None
+        for axis_range in self.ranges:
+            axis_range.clear()
+        for curve in self._curves:
+            curve.setData([], [])
+        self.dirty = False
+
+    def render(self):
+        """Redraws all lanes if new data arrived. Returns True if anything was drawn."""
+        if not self.dirty or not len(self.t):
+            return False
+        self.dirty = False
+        window = self.window_seconds
+        t = self.t.latest(out=self._out_t)
+        end = t[-1]
+        start = np.searchsorted(t, end - window, side="right")
+        t = t[start:]
+
+        # One decimation pass for all channels; raw rows are only unwrapped when needed
+        n_bins = max(100, int(self.plot_widget.plotItem.vb.width()) // self.bin_pixels)
+        width = window / n_bins
+        if len(t) > 2 * n_bins:
+            if self.dec.width != width:
+                self.dec.rebuild(t, self.y.latest(out=self._out_y)[start:], width, n_bins)
+            x, y = self.dec.points(t[0])
+        else:
+            self.dec.width = None
+            x, y = t, self.y.latest(out=self._out_y)[start:]
+        m = len(x)
+        if m > self._points:
+            self._allocate_draw(max(m, 2 * n_bins + 8))
+
+        # Per-lane scaling from hysteresis ranges over what is drawn
+        lo = np.fmin.reduce(y, axis=0)
+        hi = np.fmax.reduce(y, axis=0)
+        r0 = np.empty(len(self.channels))
+        r1 = np.empty(len(self.channels))
+        for k, axis_range in enumerate(self.ranges):
+            if np.isfinite(lo[k]):
+                axis_range.update(lo[k], hi[k])
+            r0[k], r1[k] = axis_range.range if axis_range.range is not None else (0.0, 1.0)
+        scaled = self._scaled[:m]
+        np.subtract(y, r0, out=scaled)
+        scaled *= 0.9 / (r1 - r0)
+        scaled += self.lane_base + 0.05
+        finite = np.isfinite(y)
+        np.copyto(scaled, self.lane_base + 0.5, where=~finite) # Hidden by the connect array
+
+        lane_x = self._lane_x[:, :m]
+        lane_y = self._lane_y[:, :m]
+        connect = self._lane_connect[:, :m]
+        lane_x[:] = x
+        lane_y[:] = scaled.T
+        # Segment i -> i+1 is drawn when both ends exist; never across lanes
+        connect[:, :-1] = (finite[:-1] & finite[1:]).T
+        connect[:, -1] = False
+        for curve, (_, idx) in zip(self._curves, self.groups):
+            # Fancy indexing copies the group's lanes into one contiguous trace
+            curve.setData(lane_x[idx].ravel(), lane_y[idx].ravel(), connect=connect[idx].ravel())
+        self.plot_widget.setXRange(end - window, end, padding=0)
+        return True
+
+
+#Test output
+if __name__ == "__main__":
+    import time
+    from PySide6.QtWidgets import QApplication
+    from plotdata import StripBuffer, MinMaxDecimator as Decimator
+
+    app = QApplication([])
+    fs, window = 1000, 15.0
+    names = ["ax", "ay", "az", "gx", "gy", "gz", "roll", "pitch", "yaw"]
+    plot = StackedChannelPlot("IMU", names, [("Accel", "#07294D", [0, 1, 2]), ("Gyro", "#D9534F", [3, 4, 5]),
+                                              ("Orientation", "#2E8B57", [6, 7, 8])], window, fs)
+    plot.resize(800, 400)
+    t = np.arange(int(fs * 60)) / fs
+    rng = np.random.default_rng(0)
+    y = np.column_stack([np.sin(t * (k + 1)) * (k + 1) + 0.1 * rng.standard_normal(len(t)) for k in range(9)])
+    y[20000:20050, 4] = np.nan
+
+    chunk = 33
+    plot.push_data_batch(t[:int(fs * window)], y[:int(fs * window)])
+    plot.render()
+    start = time.perf_counter()
+    frames = 100
+    for k in range(frames):
+        s = slice(int(fs * window) + chunk * k, int(fs * window) + chunk * (k + 1))
+        plot.push_data_batch(t[s], y[s])
+        plot.render()
+    stacked_ms = (time.perf_counter() - start) / frames * 1000
+
+    # Lanes stay inside their bands, and lanes are never joined
+    for curve, (_, idx) in zip(plot.curves(), plot.groups):
+        cx, cy = curve.getData()
+        m = len(cx) // len(idx)
+        for j, k in enumerate(idx):
+            lane = cy[j * m:(j + 1) * m]
+            assert np.all((lane >= plot.lane_base[k]) & (lane <= plot.lane_base[k] + 1)), names[k]
+
+    # Reference: one channel drawn the way BioSignalPlot does it
+    single = pg.PlotWidget()
+    single.resize(800, 400)
+    curve = single.plot()
+    buf, dec = StripBuffer(int(fs * window)), Decimator()
+    buf.append(t[:int(fs * window)], y[:int(fs * window), 0])
+    start = time.perf_counter()
+    for k in range(frames):
+        s = slice(int(fs * window) + chunk * k, int(fs * window) + chunk * (k + 1))
+        buf.append(t[s], y[s, 0])
+        x1, y1 = buf.window(window)
+        if dec.width is None:
+            dec.rebuild(x1, y1, window / 600, 600)
+        else:
+            dec.append(t[s], y[s, 0])
+        curve.setData(*dec.points(x1[0]), connect="finite")
+        single.setXRange(x1[-1] - window, x1[-1], padding=0)
+    single_ms = (time.perf_counter() - start) / frames * 1000
+    print(f"9 channels @ {fs} Hz: {stacked_ms:.2f} ms/frame, 1 channel: {single_ms:.2f} ms/frame")
+    plot.reset_data()
+    assert not plot.render()
+    print("All checks passed!")
@@ -0,0 +1,130 @@
+import sys
+import json
+import time
+import importlib
+import threading
+from PySide6.QtCore import QObject, QEvent, QTimer, Signal
+
+# --- DEFERRED IMPORTS & STARTUP PROFILE ---
+# NeuroKit2 (with pandas, scipy, sklearn and matplotlib behind it) takes
+# several seconds to import, longer than building the whole window. The
+# processing modules bind it through lazy_import(), so it is loaded on
+# first use, and the GUI preloads it in the background once the window
+# has painted.
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            # The import lock makes concurrent first uses wait for one import
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attr)
+
+    @property
+    def loaded(self):
+        return self._module is not None or self._name in sys.modules
+
+def lazy_import(name):
+    return LazyModule(name)
+
+# Modules behind the processing pipeline, preloaded after the first paint
+SCIENTIFIC_STACK = ("neurokit2",)
+
+def preload(modules=SCIENTIFIC_STACK, done=None):
+    """Imports `modules` on a daemon thread; calls done() from that thread when finished."""
+    def run():
+        for name in modules:
+            importlib.import_module(name)
+        if done is not None:
+            done()
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+class StartupProfile(QObject):
+    """
+    Startup milestones in seconds since `t0` (perf_counter at the top of
+    main.py): imports, window built, first paint, and scientific stack
+    loaded. `first_paint` is emitted once, after the first paint event of
+    the watched widget has been handled.
+    """
+    first_paint = Signal()
+    preloaded = Signal()
+
+    def __init__(self, t0, parent=None):
+        super().__init__(parent)
+        self.t0 = t0
+        self.marks = {}
+        self._lock = threading.Lock() # Marks can come from the preload thread
+
+    def mark(self, name):
+        with self._lock:
+            self.marks[name] = time.perf_counter() - self.t0
+
+    def watch_first_paint(self, widget):
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and "first_paint" not in self.marks:
+            obj.removeEventFilter(self)
+            # Queued, so the mark lands after this paint has been drawn
+            QTimer.singleShot(0, self._on_first_paint)
+        return False
+
+    def _on_first_paint(self):
+        self.mark("first_paint")
+        self.first_paint.emit()
+
+    def preload_after_first_paint(self, modules=SCIENTIFIC_STACK):
+        self.first_paint.connect(lambda: preload(modules, done=self._on_preloaded))
+
+    def _on_preloaded(self):
+        # Preload thread; `preloaded` is queued to the receivers' thread
+        self.mark("scientific_stack")
+        self.preloaded.emit()
+
+    def to_json(self):
+        with self._lock:
+            return json.dumps({name: round(t, 4) for name, t in self.marks.items()})
+
+
+#Test output
+if __name__ == "__main__":
+    from PySide6.QtWidgets import QApplication, QLabel
+
+    # Nothing is imported until the first attribute access
+    name = "xml.dom.minidom"
+    lazy = lazy_import(name)
+    assert name not in sys.modules and not lazy.loaded
+    assert lazy.parseString("<a/>").documentElement.tagName == "a"
+    assert lazy.loaded and name in sys.modules
+
+    # Concurrent first uses share one import
+    lazy_json = lazy_import("json")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy_json.dumps([1]))) for _ in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert results == ["[1]"] * 8
+
+    app = QApplication([])
+    profile = StartupProfile(time.perf_counter())
+    label = QLabel("startup")
+    profile.watch_first_paint(label)
+    profile.preload_after_first_paint(("email.mime.text",))
+    profile.preloaded.connect(app.quit)
+    label.show()
+    QTimer.singleShot(5000, app.quit)
+    app.exec()
+    assert "first_paint" in profile.marks, "No paint event seen"
+    assert profile.marks["scientific_stack"] >= profile.marks["first_paint"]
+    assert "email.mime.text" in sys.modules
+    print(profile.to_json())
+    print("All checks passed!")
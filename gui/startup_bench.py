@@ -0,0 +1,78 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import datetime
+import statistics
+import subprocess
+
+# --- STARTUP BENCHMARK ---
+# Launches `main.py --startup-benchmark` in fresh interpreters and reports
+# the median of each startup milestone (seconds since the top of main.py):
+#
+#   imports           module imports done
+#   window_built      MainWindow constructed
+#   first_paint       dashboard painted
+#   scientific_stack  NeuroKit2 preloaded in the background
+#   process           wall time from launch to the end of the preload
+#
+# Exits with status 1 when a milestone is over its budget, and appends the
+# run to a CSV history with --history so trends are visible:
+#
+#   python startup_bench.py --runs 5 --history startup_history.csv
+
+# Budgets (s) for a lab PC; first paint used to wait for the NeuroKit import (~4 s)
+BUDGET = {"imports": 1.0, "window_built": 1.5, "first_paint": 2.0}
+MILESTONES = ("imports", "window_built", "first_paint", "scientific_stack", "process")
+
+def run_once(timeout=120):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, script, "--startup-benchmark"], capture_output=True, text=True,
+                         timeout=timeout, cwd=os.path.dirname(script))
+    wall = time.perf_counter() - start
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith("{"):
+            marks = json.loads(line)
+            marks["process"] = wall
+            return marks
+    raise RuntimeError(f"main.py printed no startup profile (exit {out.returncode}):\n{out.stderr[-2000:]}")
+
+def benchmark(runs):
+    results = [run_once() for _ in range(runs)]
+    return {name: statistics.median(r[name] for r in results) for name in MILESTONES if all(name in r for r in results)}
+
+def over_budget(medians, budget=BUDGET):
+    return {name: (medians[name], limit) for name, limit in budget.items() if medians.get(name, 0) > limit}
+
+def append_history(path, medians):
+    new = not os.path.exists(path)
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(("date",) + MILESTONES)
+        writer.writerow([datetime.datetime.now().isoformat(timespec="seconds")] +
+                        [f"{medians[name]:.3f}" if name in medians else "" for name in MILESTONES])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure GUI startup time against its budget.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--history", default=None, help="CSV file to append the medians to")
+    args = parser.parse_args(argv)
+
+    medians = benchmark(args.runs)
+    for name in MILESTONES:
+        if name in medians:
+            limit = BUDGET.get(name)
+            print(f"{name:<17}{medians[name]:>7.3f} s" + (f"  (budget {limit:.1f} s)" if limit else ""))
+    if args.history:
+        append_history(args.history, medians)
+    failed = over_budget(medians)
+    for name, (value, limit) in failed.items():
+        print(f"OVER BUDGET: {name} {value:.3f} s > {limit:.1f} s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+import numpy as np
+from dataclasses import dataclass
+
+# Fields carried by each channel, in SensorPacket attribute order
+CHANNEL_FIELDS = {
+    "eda": ("raw", "smooth"),
+    "imu": ("ax", "ay", "az", "gx", "gy", "gz", "roll", "pitch", "yaw"),
+    "cardiac": ("ir_value", "bpm", "hrv"),
+}
+
+# --- RING BUFFER ---
+
+class RingBuffer:
+    """
+    Fixed-capacity circular buffer of rows (1-D values or fixed-width rows).
+    Appends write in place; nothing is reallocated after construction.
+    """
+    def __init__(self, capacity, width=None, dtype=np.float64, fill=np.nan):
+        shape = (capacity,) if width is None else (capacity, width)
+        self._data = np.full(shape, fill, dtype=dtype)
+        self.capacity = capacity
+        self._head = 0 # Next write position
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, rows):
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        n = len(rows)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the newest `capacity` rows survive
+            self._data[:] = rows[-self.capacity:]
+            self._head = 0
+            self._size = self.capacity
+            return
+        first = min(n, self.capacity - self._head)
+        self._data[self._head:self._head + first] = rows[:first]
+        self._data[:n - first] = rows[first:]
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def latest(self, n=None, out=None):
+        """
+        Returns the newest `n` rows (default: all) in chronological order.
+        A contiguous range is returned as a view; a wrapped range is copied
+        once, into `out` when given.
+        """
+        n = self._size if n is None else min(n, self._size)
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._data[start:start + n]
+        if out is None:
+            out = np.empty((n,) + self._data.shape[1:], dtype=self._data.dtype)
+        else:
+            out = out[:n]
+        first = self.capacity - start
+        out[:first] = self._data[start:]
+        out[first:] = self._data[:n - first]
+        return out
+
+    def last(self):
+        return self._data[(self._head - 1) % self.capacity]
+
+    def set_last(self, row):
+        """Overwrites the newest row in place."""
+        self._data[(self._head - 1) % self.capacity] = row
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+# --- CHANNEL STREAMS ---
+
+@dataclass
+class ChannelBlock:
+    """
+    A run of consecutive samples of one channel.
+    Rows with valid == False were expected but lost; their values are NaN
+    unless the row is marked `interpolated` (a short gap filled in by the
+    router).
+    """
+    name: str
+    t: np.ndarray       # (n,) seconds on the session axis
+    values: np.ndarray  # (n, len(fields))
+    valid: np.ndarray   # (n,) bool
+    interpolated: np.ndarray = None # (n,) bool, subset of ~valid; all False when omitted
+
+    def __post_init__(self):
+        if self.interpolated is None:
+            self.interpolated = np.zeros(len(self.t), dtype=bool)
+
+    def __len__(self):
+        return len(self.t)
+
+    @property
+    def usable(self):
+        """Rows with a value to process: received or interpolated."""
+        return self.valid | self.interpolated
+
+    def column(self, field):
+        return self.values[:, CHANNEL_FIELDS[self.name].index(field)]
+
+def fill_missing(values, valid, last=np.nan):
+    """
+    Forward-fills rows where valid is False with the previous valid value
+    (`last` before the first one). Used to keep filters continuous; the
+    missing rows stay marked in the block itself.
+    """
+    if valid.all():
+        return values
+    idx = np.where(valid, np.arange(len(valid)), -1)
+    np.maximum.accumulate(idx, out=idx)
+    filled = values[np.maximum(idx, 0)].copy()
+    filled[idx < 0] = last
+    return filled
+
+def leading_missing(values):
+    """
+    Number of NaN rows before the first finite one (all rows if there is
+    none): what fill_missing could not fill because nothing preceded it.
+    """
+    finite = np.flatnonzero(~np.isnan(values))
+    return int(finite[0]) if len(finite) else len(values)
+
+@dataclass
+class GapRecord:
+    """A run of lost frames (frame level) or samples (channel level)."""
+    channel: str        # "frames" for the frame-level record
+    start: float        # Session time (s) of the first lost frame/sample
+    duration: float     # Seconds
+    lost: int           # Number of frames/samples
+    interpolated: bool  # True = filled by interpolation, False = discontinuity (left NaN)
+
+@dataclass
+class LossStats:
+    frames_received: int = 0
+    frames_lost: int = 0
+    gaps: int = 0
+    discontinuities: int = 0
+    samples_interpolated: int = 0
+
+    @property
+    def loss_ratio(self):
+        total = self.frames_received + self.frames_lost
+        return self.frames_lost / total if total else 0.0
+
+class ChannelStream:
+    """Per-channel sample history at the channel's own native rate."""
+    def __init__(self, name, rate, history_seconds=60):
+        self.name = name
+        self.fields = CHANNEL_FIELDS[name]
+        self.rate = rate
+        self.history_seconds = history_seconds
+        capacity = int(history_seconds * rate)
+        self.t = RingBuffer(capacity)
+        self.values = RingBuffer(capacity, width=len(self.fields))
+        self.valid = RingBuffer(capacity, dtype=bool, fill=False)
+        self.samples_total = 0
+        self.samples_missing = 0
+        self.last_frame = None # Frame number of the newest sample
+        self.last_value = np.full(len(self.fields), np.nan) # Newest finite row, interpolation anchor
+
+    def append(self, block: ChannelBlock):
+        self.t.append(block.t)
+        self.values.append(block.values)
+        self.valid.append(block.valid)
+        self.samples_total += len(block)
+        self.samples_missing += int(len(block) - np.count_nonzero(block.valid))
+        finite = np.flatnonzero(np.isfinite(block.values).all(axis=1))
+        if len(finite):
+            self.last_value = block.values[finite[-1]].copy()
+
+    def fill_gaps(self, block, frames, frame_rate, max_interp_seconds):
+        """
+        Inserts rows for samples this channel should have sent but didn't.
+
+        Returns (block, gap records). Inserted rows are valid=False; gaps up
+        to `max_interp_seconds` are linearly interpolated so filters stay
+        continuous (and marked `interpolated`), longer ones are left NaN as
+        discontinuities.
+        """
+        step = frame_rate / self.rate # Frames per sample of this channel
+        prev = frames[0] - step if self.last_frame is None else self.last_frame
+        self.last_frame = frames[-1]
+        missing = np.rint(np.diff(np.concatenate([[prev], frames])) / step).astype(np.int64) - 1
+        np.maximum(missing, 0, out=missing)
+        if not missing.any():
+            return block, []
+
+        n = len(block)
+        pos = np.arange(n) + np.cumsum(missing) # Where the received rows land
+        total = n + int(missing.sum())
+        t = np.interp(np.arange(total), pos, block.t) # Frame clock is uniform per channel
+        # Rows inserted before pos[0] are extrapolated back from the first received one
+        head = pos[0]
+        if head:
+            t[:head] = block.t[0] - (head - np.arange(head)) * step / frame_rate
+        values = np.full((total, block.values.shape[1]), np.nan)
+        values[pos] = block.values
+        valid = np.zeros(total, dtype=bool)
+        valid[pos] = block.valid
+
+        gap_idx = np.flatnonzero(missing)
+        short = missing[gap_idx] / self.rate <= max_interp_seconds
+        gaps = [GapRecord(self.name, float(t[pos[i] - missing[i]]), missing[i] / self.rate, int(missing[i]), bool(sh))
+                for i, sh in zip(gap_idx, short)]
+
+        fill = np.zeros(total, dtype=bool)
+        if short.any():
+            # Mark the inserted rows of short gaps, then interpolate them per column
+            starts = pos[gap_idx[short]] - missing[gap_idx[short]]
+            lengths = missing[gap_idx[short]]
+            fill[np.repeat(starts - np.cumsum(np.concatenate([[0], lengths[:-1]])), lengths)
+                 + np.arange(lengths.sum())] = True
+            known = np.flatnonzero(np.isfinite(values).all(axis=1))
+            anchor_pos = np.concatenate([[-1], known])
+            for c in range(values.shape[1]):
+                anchor_val = np.concatenate([[self.last_value[c]], values[known, c]])
+                ok = np.isfinite(anchor_val)
+                if ok.sum() >= 1:
+                    values[fill, c] = np.interp(np.flatnonzero(fill), anchor_pos[ok], anchor_val[ok])
+            # Nothing to interpolate from (no finite value yet): still lost
+            fill &= np.isfinite(values).all(axis=1)
+        return ChannelBlock(self.name, t, values, valid, fill), gaps
+
+    def set_rate(self, rate):
+        self.__init__(self.name, rate, self.history_seconds)
+
+# Device frame counters are 16-bit and wrap around
+SEQ_MODULUS = 1 << 16
+
+class StreamRouter:
+    """
+    Demultiplexes SensorPackets into independent per-channel streams.
+
+    A packet only contributes a sample to the channels whose section it
+    carries, so a channel sent at a lower rate than the frame rate is never
+    padded. Frames are placed on the session clock by their sequence number
+    (1 / frame_rate per frame), so lost frames leave a gap in time instead
+    of shifting everything after them. Lost samples are re-inserted per
+    channel: short gaps are interpolated, long ones left NaN and logged as
+    discontinuities. Loss statistics are kept in `stats`.
+    """
+    def __init__(self, frame_rate, channel_rates=None, history_seconds=60, max_interp_seconds=0.25):
+        self.frame_rate = frame_rate
+        self.history_seconds = history_seconds
+        self.max_interp_seconds = max_interp_seconds
+        rates = channel_rates or {}
+        self.streams = {name: ChannelStream(name, rates.get(name, frame_rate), history_seconds)
+                        for name in CHANNEL_FIELDS}
+        self.frames = 0       # Frame number the next in-order frame will get
+        self._last_seq = None # Raw (wrapped) sequence number of the newest frame
+        self.stats = LossStats()
+        self.gaps = []        # Gap records not yet collected by take_gaps()
+
+    def _frame_numbers(self, packets):
+        """
+        Session frame numbers from the packets' sequence counters.
+        Detects lost frames, duplicates and counter resets in one pass.
+        """
+        seq = np.array([-1 if p.seq is None else p.seq for p in packets], dtype=np.int64)
+        if (seq < 0).any():
+            # No counter available: frames are assumed contiguous
+            self._last_seq = None
+            return self.frames + np.arange(len(packets)), np.ones(len(packets), dtype=bool)
+
+        prev = seq[0] - 1 if self._last_seq is None else self._last_seq
+        step = np.diff(np.concatenate([[prev], seq])) % SEQ_MODULUS
+        keep = step != 0 # Duplicated frame
+        reset = step > SEQ_MODULUS // 2 # Counter jumped backwards (device restart / reordering)
+        if reset.any():
+            self.stats.discontinuities += int(reset.sum())
+            print(f"[Ingestion] Sequence counter reset at frame {self.frames}")
+            step[reset] = 1
+        self._last_seq = int(seq[-1])
+        frames = self.frames - 1 + np.cumsum(np.where(keep, step, 0))
+
+        lost = step - 1
+        gap_idx = np.flatnonzero(keep & (lost > 0))
+        for i in gap_idx:
+            seconds = lost[i] / self.frame_rate
+            short = seconds <= self.max_interp_seconds
+            self.gaps.append(GapRecord("frames", (frames[i] - lost[i]) / self.frame_rate, seconds, int(lost[i]), bool(short)))
+            if not short:
+                self.stats.discontinuities += 1
+                print(f"[Ingestion] Discontinuity: {lost[i]} frames ({seconds:.2f} s) lost "
+                      f"at t={(frames[i] - lost[i]) / self.frame_rate:.2f} s")
+        self.stats.gaps += len(gap_idx)
+        self.stats.frames_lost += int(lost[gap_idx].sum())
+        return frames, keep
+
+    def route(self, packets) -> dict:
+        """Returns {channel: ChannelBlock} for the channels present in `packets`."""
+        if not packets:
+            return {}
+        frames, keep = self._frame_numbers(packets)
+        self.frames = int(frames[-1]) + 1
+        self.stats.frames_received += int(keep.sum())
+        blocks = {}
+        for name, fields in CHANNEL_FIELDS.items():
+            rows, idx, valid = [], [], []
+            for i, p in enumerate(packets):
+                if not keep[i]:
+                    continue
+                data = getattr(p, name)
+                if data is not None:
+                    rows.append([getattr(data, f) for f in fields])
+                    valid.append(True)
+                elif name in p.missing:
+                    # Section was sent but could not be parsed: mark it, don't invent a value
+                    rows.append([np.nan] * len(fields))
+                    valid.append(False)
+                else:
+                    continue
+                idx.append(i)
+            if rows:
+                stream = self.streams[name]
+                ch_frames = frames[idx]
+                block = ChannelBlock(name=name,
+                                     t=ch_frames / self.frame_rate,
+                                     values=np.asarray(rows, dtype=np.float64),
+                                     valid=np.asarray(valid, dtype=bool))
+                block, gaps = stream.fill_gaps(block, ch_frames, self.frame_rate, self.max_interp_seconds)
+                self.stats.samples_interpolated += sum(g.lost for g in gaps if g.interpolated)
+                self.gaps.extend(gaps)
+                stream.append(block)
+                blocks[name] = block
+        return blocks
+
+    def resync(self):
+        """
+        Forgets the sequence baseline after frames were dropped on purpose
+        (while paused): the next frame continues the session clock instead
+        of being counted as lost.
+        """
+        self._last_seq = None
+        for stream in self.streams.values():
+            stream.last_frame = None
+
+    def take_gaps(self):
+        """Returns and clears the gap records collected since the last call."""
+        gaps, self.gaps = self.gaps, []
+        return gaps
+
+    def set_rates(self, frame_rate, channel_rates=None):
+        self.__init__(frame_rate, channel_rates, self.history_seconds, self.max_interp_seconds)
+
+    def reset(self):
+        self.set_rates(self.frame_rate, {n: s.rate for n, s in self.streams.items()})
+
+
+#Test output
+if __name__ == "__main__":
+    import time
+    from rawdata import SensorPacket, EDAData, IMUData, CardiacData
+
+    # IMU every frame (100 Hz), EDA every 10th frame (10 Hz), one corrupted EDA section
+    packets = []
+    for i in range(100):
+        p = SensorPacket(timestamp=time.time(), imu=IMUData(*([float(i)] * 9)))
+        if i % 10 == 0:
+            p.eda = EDAData(raw=float(i), smooth=float(i))
+        if i == 50:
+            p.eda = None
+            p.missing = ("eda",)
+        packets.append(p)
+
+    router = StreamRouter(frame_rate=100, channel_rates={"eda": 10})
+    blocks = router.route(packets[:37])
+    blocks2 = router.route(packets[37:])
+    assert "cardiac" not in blocks
+    assert len(blocks["imu"]) + len(blocks2["imu"]) == 100
+    assert len(blocks["eda"]) + len(blocks2["eda"]) == 10
+    assert np.isclose(blocks2["eda"].t[0], 0.4)
+    assert not blocks2["eda"].valid[1] and np.isnan(blocks2["eda"].values[1]).all()
+    eda = router.streams["eda"]
+    assert eda.samples_total == 10 and eda.samples_missing == 1
+    assert np.allclose(fill_missing(blocks2["eda"].column("raw"), blocks2["eda"].valid)[:3], [40, 40, 60])
+    assert leading_missing(np.array([np.nan, np.nan, 1.0, np.nan])) == 2
+    assert leading_missing(np.full(3, np.nan)) == 3 and leading_missing(np.ones(3)) == 0
+
+    # Sequence numbers: 3 frames lost (short gap, interpolated), then 100 (discontinuity)
+    router = StreamRouter(frame_rate=100, max_interp_seconds=0.25)
+    seq = np.concatenate([np.arange(0, 10), np.arange(13, 20), np.arange(120, 130)])
+    packets = [SensorPacket(timestamp=0.0, eda=EDAData(raw=float(q), smooth=0.0), seq=int(q) % SEQ_MODULUS)
+               for q in seq]
+    block = router.route(packets[:12])["eda"]
+    block2 = router.route(packets[12:])["eda"]
+    raw = np.concatenate([block.column("raw"), block2.column("raw")])
+    assert len(raw) == 130
+    assert np.allclose(raw[:20], np.arange(20)) # Interpolated across the short gap
+    assert np.isnan(raw[20:120]).all()          # Long gap left as a discontinuity
+    interpolated = np.concatenate([block.interpolated, block2.interpolated])
+    assert np.array_equal(np.flatnonzero(interpolated), [10, 11, 12])
+    assert not np.concatenate([block.valid, block2.valid])[10:13].any()
+    usable = np.concatenate([block.usable, block2.usable])
+    assert usable[:20].all() and not usable[20:120].any()
+    assert np.isclose(block2.t[-1], 1.29)
+    assert router.stats.frames_lost == 103 and router.stats.discontinuities == 1
+    assert [g.interpolated for g in router.take_gaps() if g.channel == "frames"] == [True, False]
+
+    # Frames dropped while paused are not loss
+    router = StreamRouter(frame_rate=100)
+    router.route([SensorPacket(timestamp=0.0, eda=EDAData(raw=1.0, smooth=0.0), seq=q) for q in range(10)])
+    router.resync()
+    block = router.route([SensorPacket(timestamp=0.0, eda=EDAData(raw=1.0, smooth=0.0), seq=q) for q in range(70, 80)])["eda"]
+    assert router.stats.frames_lost == 0 and not router.take_gaps()
+    assert len(block) == 10 and block.valid.all() and np.isclose(block.t[0], 0.1)
+
+    # A corrupt device SEQ must not fall back to the host's line counter
+    from rawdata import HardwareIngestionThread
+    ingest = HardwareIngestionThread()
+    router = StreamRouter(frame_rate=20)
+    packets = []
+    for q in range(5000, 5010):
+        ingest._line_seq += 1
+        seq = "SEQ:x!" if q == 5005 else f"SEQ:{q}"
+        packet = ingest._parse_telemetry(f"{seq}|EDA:{q},{q}")
+        ingest._assign_seq(packet)
+        packets.append(packet)
+    assert [p.seq for p in packets] == list(range(5000, 5010))
+    block = router.route(packets)["eda"]
+    assert router.stats.frames_lost == 0 and router.stats.discontinuities == 0
+    assert len(block) == 10 and block.valid.all()
+
+    ring = RingBuffer(8)
+    ring.append(np.arange(5)); ring.append(np.arange(5, 11))
+    assert np.array_equal(ring.latest(), np.arange(3, 11))
+    print("All checks passed!")
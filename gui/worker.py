@@ -0,0 +1,301 @@
+import time
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from PySide6.QtCore import Qt, QObject, QThread, QTimer, Signal, Slot
+from streams import StreamRouter, LossStats
+from eda_process import EDAProcessor
+from ppg import PPGProcessor
+from hrv import HRVProcessor
+from events import EventAnalyzer
+from latency import LatencyMonitor
+from procmetrics import register_thread
+
+# --- PROCESSING WORKER ---
+
+@dataclass
+class FrameResult:
+    """Display-ready output of one processing tick. Arrays are None for channels without new data."""
+    packets: int = 0                    # Packets received since the last tick (also while paused)
+    eda_t: Optional[np.ndarray] = None
+    eda: Optional[np.ndarray] = None
+    phasic: Optional[np.ndarray] = None
+    tonic: Optional[np.ndarray] = None
+    hr_t: Optional[np.ndarray] = None
+    hr: Optional[np.ndarray] = None
+    imu_t: Optional[np.ndarray] = None
+    imu: Optional[np.ndarray] = None    # (n, 9) raw IMU rows, NaN where lost
+    loss: LossStats = field(default_factory=LossStats)
+    gaps: list = field(default_factory=list)
+    processing_ms: float = 0.0          # Time spent processing this frame
+    interval_ms: int = 0                # Tick interval this frame was produced at
+    # Routed raw channel blocks and per-packet host time / sequence number; only
+    # filled while a recorder is attached
+    blocks: dict = field(default_factory=dict)
+    packet_wall: Optional[np.ndarray] = None
+    packet_seq: Optional[np.ndarray] = None
+    lag_ms: float = 0.0                 # Age of the oldest packet when processing finished
+    t_read: float = 0.0                 # perf_counter() when the oldest packet was read (0 if none)
+    emitted_at: float = 0.0             # perf_counter() at emit, for queueing delay on the receiver
+
+class ProcessingWorker(QObject):
+    """
+    Owns the stream router and all signal processors and runs them in its
+    own thread, so a NeuroKit stall can never freeze the window.
+
+    Packets are queued into `submit` (connect the ingestion thread's
+    packet_ready to it). Every `interval_ms` the pending packets are routed,
+    processed and published as one FrameResult through `frame_ready`. The
+    GUI only draws what it receives.
+
+    The public methods below are safe to call from the GUI thread: each one
+    emits a private signal that Qt queues into the worker thread.
+    """
+    frame_ready = Signal(object)
+
+    _reset_requested = Signal()
+    _paused_requested = Signal(bool)
+    _configure_requested = Signal(object)
+    _event_added = Signal(int, float, str)
+    _event_removed = Signal(int)
+    _hrv_requested = Signal()
+    _degrade_requested = Signal(int, bool)
+    _recorder_attached = Signal(object)
+
+    def __init__(self, frame_rate=20, channel_rates=None, interval_ms=33, hrv_every_s=0.0, parent=None):
+        super().__init__(parent)
+        rates = channel_rates or {}
+        self.interval_ms = interval_ms
+        self.coalesce = 1 # Ticks merged into one by the backpressure policy
+        self.router = StreamRouter(frame_rate, rates)
+        self.eda_processor = EDAProcessor(self, sampling_rate=rates.get("eda", frame_rate))
+        self.ppg_processor = PPGProcessor(self, sampling_rate=rates.get("cardiac", frame_rate))
+        self.hrv_processor = HRVProcessor(sampling_rate=rates.get("cardiac", frame_rate), window_second=30,
+                                          update_every_s=hrv_every_s, parent=self)
+        self.event_analyzer = EventAnalyzer(self, eda_rate=rates.get("eda", frame_rate),
+                                            hr_rate=rates.get("cardiac", frame_rate))
+        self.hrv_processor.beats_detected.connect(self.event_analyzer.append_beats)
+        # Per-stage latency histograms; the GUI records render stages into the same monitor
+        self.latency = LatencyMonitor()
+
+        self.paused = True
+        self._pending = []
+        self._received = 0
+        self.packets_submitted = 0 # Cumulative, for the ingestion queue depth
+        self.pending_count = 0     # Packets waiting for the next tick; safe to read from any thread
+        self._timer = None
+        self.recorder = None # ChunkedRecorder fed from this thread
+
+        self._reset_requested.connect(self._on_reset)
+        self._paused_requested.connect(self._on_paused)
+        self._configure_requested.connect(self._on_configure)
+        self._event_added.connect(self._on_event_added)
+        self._event_removed.connect(self._on_event_removed)
+        self._hrv_requested.connect(self.hrv_processor.compute_hrv)
+        self._degrade_requested.connect(self._on_degrade)
+        self._recorder_attached.connect(self._on_recorder_attached)
+
+    # --- GUI-thread API ---
+    def reset(self):
+        self._reset_requested.emit()
+
+    def set_paused(self, paused):
+        self._paused_requested.emit(paused)
+
+    def configure(self, frame_rate=None, channel_rates=None, eda_window=None, ppg_window=None, hrv_window=None):
+        """Changes rates and/or processing windows; None leaves a setting as is."""
+        self._configure_requested.emit(dict(frame_rate=frame_rate, channel_rates=channel_rates,
+                                            eda_window=eda_window, ppg_window=ppg_window, hrv_window=hrv_window))
+
+    def add_event(self, event_id, time_s, label):
+        self._event_added.emit(event_id, time_s, label)
+
+    def remove_event(self, event_id):
+        self._event_removed.emit(event_id)
+
+    def request_hrv(self):
+        self._hrv_requested.emit()
+
+    def attach_recorder(self, recorder):
+        """Records every processed tick into `recorder` (a ChunkedRecorder) from the worker thread."""
+        self._recorder_attached.emit(recorder)
+
+    def detach_recorder(self):
+        """Stops recording after the ticks already queued; the recorder is closed by the worker."""
+        self._recorder_attached.emit(None)
+
+    def degrade(self, coalesce=1, hrv_extended=True):
+        """Merges `coalesce` ticks into one and switches extended HRV metrics; never drops packets."""
+        self._degrade_requested.emit(coalesce, hrv_extended)
+
+    # --- Worker thread ---
+    @Slot()
+    def start(self):
+        register_thread("worker")
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.tick)
+        self._timer.start(self.interval_ms * self.coalesce)
+
+    @Slot()
+    def stop(self):
+        if self._timer is not None:
+            self._timer.stop()
+
+    @Slot(object)
+    def submit(self, packet):
+        self._received += 1
+        self.packets_submitted += 1
+        if not self.paused:
+            packet.t_queued = time.perf_counter()
+            if packet.t_read:
+                self.latency.record("ingest", (packet.t_queued - packet.t_read) * 1000)
+                self.latency.record("parse", (packet.t_parsed - packet.t_read) * 1000)
+            self._pending.append(packet)
+            self.pending_count = len(self._pending)
+
+    @Slot()
+    def tick(self):
+        if not self._received:
+            return
+        packets, self._pending = self._pending, []
+        self.pending_count = 0
+        result = self.process(packets)
+        result.packets = self._received
+        result.interval_ms = self.interval_ms * self.coalesce
+        self._received = 0
+        if self.recorder is not None:
+            self.recorder.write_frame(result)
+        result.emitted_at = time.perf_counter()
+        self.frame_ready.emit(result)
+
+    def process(self, packets) -> FrameResult:
+        """Routes and processes one batch of packets."""
+        start = time.perf_counter()
+        result = FrameResult()
+        latency = self.latency
+        if packets:
+            latency.record("queue", [(start - p.t_queued) * 1000 for p in packets], items=len(packets))
+            result.t_read = min(p.t_read for p in packets)
+            blocks = self.router.route(packets)
+            if self.recorder is not None:
+                result.blocks = blocks
+                result.packet_wall = np.array([p.timestamp for p in packets])
+                result.packet_seq = np.array([-1 if p.seq is None else p.seq for p in packets])
+
+            # EDA & Decomposition
+            eda_block = blocks.get("eda")
+            if eda_block is not None:
+                t0 = time.perf_counter()
+                eda, phasic, tonic = self.eda_processor.process_batch(eda_block)
+                latency.record("eda", (time.perf_counter() - t0) * 1000, items=len(eda_block))
+                result.eda_t = eda_block.t
+                result.eda, result.phasic, result.tonic = np.asarray(eda), np.asarray(phasic), np.asarray(tonic)
+                # Event-locked analysis (resolves flags whose post-event window is now complete)
+                self.event_analyzer.append_phasic(result.phasic)
+
+            # PPG / Heart Rate + HRV
+            cardiac_block = blocks.get("cardiac")
+            if cardiac_block is not None:
+                result.hr_t = cardiac_block.t
+                t0 = time.perf_counter()
+                result.hr = np.asarray(self.ppg_processor.process_batch(cardiac_block))
+                t1 = time.perf_counter()
+                self.hrv_processor.process_block(cardiac_block)
+                latency.record("ppg", (t1 - t0) * 1000, items=len(cardiac_block))
+                latency.record("hrv", (time.perf_counter() - t1) * 1000, items=len(cardiac_block))
+                self.event_analyzer.append_hr(result.hr)
+
+            # Raw IMU, displayed as is
+            imu_block = blocks.get("imu")
+            if imu_block is not None:
+                result.imu_t, result.imu = imu_block.t, imu_block.values
+
+            result.lag_ms = (time.time() - packets[0].timestamp) * 1000
+        result.loss = dataclasses.replace(self.router.stats)
+        result.gaps = self.router.take_gaps()
+        result.processing_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    @Slot()
+    def _on_reset(self):
+        self._pending = []
+        self.pending_count = 0
+        self.latency.reset()
+        self.router.reset()
+        self.event_analyzer.reset()
+        self.hrv_processor.reset()
+
+    @Slot(int, bool)
+    def _on_degrade(self, coalesce, hrv_extended):
+        self.coalesce = coalesce
+        self.hrv_processor.extended = hrv_extended
+        if self._timer is not None:
+            self._timer.setInterval(self.interval_ms * coalesce)
+
+    @Slot(object)
+    def _on_recorder_attached(self, recorder):
+        # Direct connections: both signals are emitted in this thread and the
+        # recorder's write methods only queue
+        hrv, quality = self.hrv_processor.hrv_computed, self.hrv_processor.quality.quality_updated
+        rri = self.hrv_processor.rri_detected
+        old = self.recorder
+        if old is not None:
+            hrv.disconnect(old.write_hrv)
+            quality.disconnect(old.write_quality)
+            rri.disconnect(old.write_rri)
+            old.close()
+        self.recorder = recorder
+        if recorder is not None:
+            hrv.connect(recorder.write_hrv, Qt.DirectConnection)
+            quality.connect(recorder.write_quality, Qt.DirectConnection)
+            rri.connect(recorder.write_rri, Qt.DirectConnection)
+
+    @Slot(bool)
+    def _on_paused(self, paused):
+        if paused:
+            self._pending = []
+            self.pending_count = 0
+        elif self.paused:
+            # The packets dropped while paused are not loss
+            self.router.resync()
+        self.paused = paused
+
+    @Slot(object)
+    def _on_configure(self, settings):
+        rates = settings["channel_rates"]
+        if settings["frame_rate"] is not None:
+            self.router.set_rates(settings["frame_rate"], rates)
+            self.eda_processor.set_sampling_rate(rates["eda"])
+            self.ppg_processor.set_sampling_rate(rates["cardiac"])
+            self.hrv_processor.set_sampling_rate(rates["cardiac"])
+            self.event_analyzer.set_rates(rates["eda"], rates["cardiac"])
+        if settings["eda_window"] is not None:
+            self.eda_processor.set_window_seconds(settings["eda_window"])
+        if settings["ppg_window"] is not None:
+            self.ppg_processor.set_window_seconds(settings["ppg_window"])
+        if settings["hrv_window"] is not None:
+            self.hrv_processor.set_window_seconds(settings["hrv_window"])
+
+    @Slot(int, float, str)
+    def _on_event_added(self, event_id, time_s, label):
+        self.event_analyzer.add_event(time_s, label, event_id)
+
+    @Slot(int)
+    def _on_event_removed(self, event_id):
+        self.event_analyzer.remove_event(event_id)
+
+def start_worker_thread(worker, parent=None):
+    """Moves `worker` into a new QThread, starts it and returns the thread."""
+    return start_shared_worker_thread([worker], parent)
+
+def start_shared_worker_thread(workers, parent=None):
+    """Moves all `workers` into one new QThread (ticks run one after another), starts it and returns it."""
+    thread = QThread(parent)
+    for worker in workers:
+        worker.moveToThread(thread)
+        thread.started.connect(worker.start)
+        # finished is emitted from the thread itself: its timer must be stopped there
+        thread.finished.connect(worker.stop, Qt.DirectConnection)
+    thread.start()
+    return thread